@@ -0,0 +1,202 @@
+"""
+Benchmark suite for the biotools_statistics package, on synthetic registries (see synthetic_tools.py).
+
+Every benchmark is timed (the best of several runs) and its peak memory is traced in a separate run. The results are
+appended to a JSON lines file together with the current git commit, and compared with the latest results of an
+earlier commit, so the performance can be tracked across commits. No network access is needed.
+
+Usage: python benchmark.py [--tools 1000,10000] [--repeat 3] [--seed 0] [--only name,...] [--no-memory]
+                           [--output <results path>]
+    The results are kept in $XDG_CACHE_HOME/biotools_statistics/benchmark_results.jsonl by default.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from biotools_statistics import calculate_general_statistics, calculate_edam_term_statistics, \
+    calculate_all_edam_term_statistics, calculate_annotation_quality, find_generic_terms, EdamIndex, ToolSimilarity
+from biotools_statistics._utilities import clean_and_filter_tool_list, default_cache_dir
+from synthetic_tools import generate_tools, load_fixture_indexes
+
+# calculate_total_entries_over_time is in the older package in Mads/other, which has the same package name
+TIME_STATISTICS_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         "../other/biotools_statistics/time_statistics.py")
+UPPER_TIME_LIMIT: datetime = datetime(2030, 1, 1)
+# Outside of the repository, so running the benchmark leaves no files behind
+DEFAULT_OUTPUT_PATH: str = os.path.join(default_cache_dir(), "benchmark_results.jsonl")
+
+
+def _load_time_statistics():
+    """
+    Load the time statistics module of the package in Mads/other.
+
+    :return: The module.
+    """
+    spec = importlib.util.spec_from_file_location("time_statistics", TIME_STATISTICS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_benchmarks(tools: List[dict], indexes: Dict[str, EdamIndex]) -> Dict[str, Callable[[], object]]:
+    """
+    Get the benchmarks for a tool list.
+
+    :param tools: The raw tools.
+    :param indexes: The compiled EDAM indexes.
+    :return: The dictionary with the name and the function of every benchmark.
+    """
+    time_statistics = _load_time_statistics()
+    return {
+        "clean_and_filter_tool_list":
+            lambda: clean_and_filter_tool_list(raw_tools=tools, upper_time_limit=UPPER_TIME_LIMIT),
+        "calculate_general_statistics":
+            lambda: calculate_general_statistics(tools=tools, upper_time_limit=UPPER_TIME_LIMIT, offline=True),
+        "calculate_edam_term_statistics[topic]":
+            lambda: calculate_edam_term_statistics(tools=tools, term_type="topic", index_list=indexes["topic"],
+                                                   upper_time_limit=UPPER_TIME_LIMIT),
+        "calculate_all_edam_term_statistics":
+            lambda: calculate_all_edam_term_statistics(tools=tools, index_lists=indexes,
+                                                       upper_time_limit=UPPER_TIME_LIMIT),
+        "calculate_total_entries_over_time":
+            lambda: time_statistics.calculate_total_entries_over_time(tools=tools),
+        "calculate_annotation_quality":
+            lambda: calculate_annotation_quality(tools=tools, index_lists=indexes),
+        "find_generic_terms[roots]":
+            lambda: find_generic_terms(tools=tools),
+        "ToolSimilarity.top_k":
+            lambda: ToolSimilarity.from_tools(tools=tools, index_lists=indexes).top_k(k=10),
+    }
+
+
+def measure_time(function: Callable[[], object], repeat: int) -> float:
+    """
+    Measure the run time of a function.
+
+    :param function: The function.
+    :param repeat: The number of runs.
+    :return: The shortest run time in seconds.
+    """
+    durations: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def measure_peak_memory(function: Callable[[], object]) -> float:
+    """
+    Measure the peak memory allocated by a function.
+
+    :param function: The function.
+    :return: The peak traced memory in MiB.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def _git_commit() -> str:
+    """
+    Get the current git commit.
+
+    :return: The short commit hash (with "+" if there are uncommitted changes), or "unknown".
+    """
+    try:
+        commit: str = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                     check=True).stdout.strip()
+        changed: str = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                      text=True, check=True).stdout.strip()
+        return commit + ("+" if changed else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _read_results(path: str) -> List[dict]:
+    """
+    Read the earlier results.
+
+    :param path: The path to the JSON lines file.
+    :return: The results.
+    """
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r", encoding="utf8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _previous_result(results: List[dict], result: dict) -> Optional[dict]:
+    """
+    Find the latest result of the same benchmark and size for an earlier commit.
+
+    :param results: The earlier results.
+    :param result: The new result.
+    :return: The earlier result, or None if there is none.
+    """
+    for earlier in reversed(results):
+        if (earlier["benchmark"], earlier["tools"]) == (result["benchmark"], result["tools"]) \
+                and earlier["commit"] != result["commit"]:
+            return earlier
+    return None
+
+
+def _change(new: Optional[float], old: Optional[float]) -> str:
+    if new is None or not old:
+        return ""
+    return f"({(new - old) / old * 100:+.0f}%)"
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    argument_parser = argparse.ArgumentParser(description="Benchmark the biotools_statistics package.")
+    argument_parser.add_argument("--tools", default="1000,10000",
+                                 help="The comma separated sizes of the synthetic registries. Default: 1000,10000.")
+    argument_parser.add_argument("--repeat", type=int, default=3, help="The number of timed runs. Default: 3.")
+    argument_parser.add_argument("--seed", type=int, default=0, help="The seed of the synthetic tools. Default: 0.")
+    argument_parser.add_argument("--only", default=None, help="The comma separated benchmarks to run. Default: All.")
+    argument_parser.add_argument("--no-memory", action="store_true", help="Do not measure the peak memory.")
+    argument_parser.add_argument("--output", "--results", default=DEFAULT_OUTPUT_PATH,
+                                 help=f"The JSON lines file the results are added to. Default: {DEFAULT_OUTPUT_PATH}.")
+    arguments = argument_parser.parse_args()
+
+    indexes: Dict[str, EdamIndex] = load_fixture_indexes()
+    earlier_results: List[dict] = _read_results(path=arguments.output)
+    commit: str = _git_commit()
+
+    for tool_count in [int(size) for size in arguments.tools.split(",")]:
+        tools: List[dict] = list(generate_tools(tool_count=tool_count, seed=arguments.seed, indexes=indexes))
+        benchmarks: Dict[str, Callable[[], object]] = get_benchmarks(tools=tools, indexes=indexes)
+        names: List[str] = arguments.only.split(",") if arguments.only else list(benchmarks)
+
+        for name in names:
+            result: dict = {"commit": commit, "date": datetime.now().isoformat(timespec="seconds"),
+                            "benchmark": name, "tools": tool_count, "seed": arguments.seed,
+                            "seconds": measure_time(function=benchmarks[name], repeat=arguments.repeat),
+                            "peak_mib": None if arguments.no_memory else measure_peak_memory(function=benchmarks[name])}
+
+            previous: Optional[dict] = _previous_result(results=earlier_results, result=result)
+            memory: str = "" if result["peak_mib"] is None else f"{result['peak_mib']:9.1f} MiB"
+            print(f"{name:<40} {tool_count:>8} tools {result['seconds']:9.3f} s "
+                  f"{_change(result['seconds'], previous and previous['seconds']):>7} {memory} "
+                  f"{_change(result['peak_mib'], previous and previous['peak_mib']):>7}")
+
+            os.makedirs(os.path.dirname(os.path.abspath(arguments.output)), exist_ok=True)
+            with open(arguments.output, "a", encoding="utf8") as f:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,22 @@
 """
 The biotools_statistics package is a package for calculating different bio.tools statistics.
 """
-from .stats import calculate_general_statistics
+from .stats import calculate_general_statistics, calculate_general_statistics_over_time, update_general_statistics, \
+    calculate_grouped_general_statistics
+from .columnar import ColumnarRegistry, calculate_columnar_general_statistics
 
-from .edam_stats import calculate_edam_term_statistics
+from .edam_stats import calculate_edam_term_statistics, calculate_all_edam_term_statistics, update_edam_term_statistics
+from .edam_index import EdamIndex
+from .edam_owl import build_index_list, load_edam_index
+from .term_index import ToolTermIndex
+from .similarity import ToolSimilarity
+from .quality import calculate_annotation_quality
+from .generic_terms import find_generic_terms
+
+from .tool_loader import load_tools
+from .compact import CompactRecord, compact_tools, load_compact_tools
+from ._utilities import DatedTools
+from .query import ToolRegistry, field_in, added_between
+from .parallel import calculate_general_statistics_parallel, calculate_all_edam_term_statistics_parallel, \
+    calculate_annotation_quality_parallel
+from .profiling import StageProfiler
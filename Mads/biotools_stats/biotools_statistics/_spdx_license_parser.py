@@ -1,49 +1,139 @@
 """
 Utilities for the parsing the license list from SPDX.
+
+The license list is cached on disk, so it is only downloaded when the cached copy is older than the time to live.
+If the list cannot be downloaded (or offline mode is used), the cached copy or the snapshot bundled with the package
+is used instead.
 """
-from dataclasses import dataclass
-from typing import List, Dict
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, FrozenSet, NamedTuple, Optional
 import requests
 from requests import Response
 
+from ._utilities import default_cache_dir
+
+SPDX_LICENSE_LIST_URL: str = "https://raw.githubusercontent.com/spdx/license-list-data/master/json/licenses.json"
+BUNDLED_LICENSE_LIST: str = os.path.join(os.path.dirname(__file__), "data", "spdx_licenses.json")
+DEFAULT_CACHE_TTL: int = 7 * 24 * 60 * 60  # One week in seconds
+
+
+class LicenseFlags(NamedTuple):
+    osi_approved: bool
+    fsf_approved: bool
+    deprecated: bool
+
 
 @dataclass
 class LicensesData:
     licenses: Dict[str, str]
     licenses_list: List[str]
-    osi_approved_licenses: List[str]
-    fsf_approved_licenses: List[str]
-    deprecated_licenses: List[str]
+    osi_approved_licenses: FrozenSet[str]
+    fsf_approved_licenses: FrozenSet[str]
+    deprecated_licenses: FrozenSet[str]
+    license_flags: Dict[str, LicenseFlags] = field(default_factory=dict)
 
 
-def parse_license_list() -> LicensesData:
+def parse_license_list(offline: bool = False, cache_dir: Optional[str] = None,
+                       cache_ttl: int = DEFAULT_CACHE_TTL) -> LicensesData:
     """
-    Parse the licenses list from SPDXs GitHub repository
+    Parse the licenses list from SPDXs GitHub repository.
+
+    :param offline: Never download the list, only use the cached or bundled list. Default: False.
+    :param cache_dir: The directory for the cached list. Default: $XDG_CACHE_HOME/biotools_statistics.
+    :param cache_ttl: The number of seconds before the cached list is downloaded again. Default: One week.
     :return: The license data.
     """
-    resp: Response = requests.get("https://raw.githubusercontent.com/spdx/license-list-data/master/json/licenses.json")
-    resp.raise_for_status()
-    license_list = resp.json()["licenses"]
+    cache_file: str = os.path.join(cache_dir or default_cache_dir(), "spdx_licenses.json")
+
+    raw_license_list: Optional[dict] = None
+    if _is_fresh(path=cache_file, ttl=cache_ttl) or offline:
+        raw_license_list = _read_license_list(path=cache_file)
+    if raw_license_list is None and not offline:
+        raw_license_list = _download_license_list(cache_file=cache_file)
+    if raw_license_list is None:
+        # Fall back to a stale cached list, and finally to the bundled snapshot
+        raw_license_list = _read_license_list(path=cache_file) or _read_license_list(path=BUNDLED_LICENSE_LIST)
+
+    return _parse_licenses(license_list=raw_license_list["licenses"])
+
+
+def _parse_licenses(license_list: List[dict]) -> LicensesData:
+    """
+    Parse the licenses from the SPDX license list.
 
+    :param license_list: The "licenses" entry of the SPDX licenses.json.
+    :return: The license data.
+    """
     licenses: Dict[str, str] = {}
     licenses_list: List[str] = []
-    osi_licenses: List[str] = []
-    fsf_licenses: List[str] = []
-    deprecated_licenses: List[str] = []
+    license_flags: Dict[str, LicenseFlags] = {}
 
     for licens in license_list:
         license_id = licens["licenseId"]
 
         licenses[licens["name"]] = license_id
         licenses_list.append(license_id)
-
-        if "isOsiApproved" in licens and licens["isOsiApproved"]:
-            osi_licenses.append(license_id)
-        if "isFsfLibre" in licens and licens["isFsfLibre"]:
-            fsf_licenses.append(license_id)
-        if "isDeprecatedLicenseId" in licens and licens["isDeprecatedLicenseId"]:
-            deprecated_licenses.append(license_id)
+        license_flags[license_id] = LicenseFlags(osi_approved=bool(licens.get("isOsiApproved")),
+                                                 fsf_approved=bool(licens.get("isFsfLibre")),
+                                                 deprecated=bool(licens.get("isDeprecatedLicenseId")))
 
     return LicensesData(licenses=licenses, licenses_list=licenses_list,
-                        osi_approved_licenses=osi_licenses, fsf_approved_licenses=fsf_licenses,
-                        deprecated_licenses=deprecated_licenses)
+                        osi_approved_licenses=frozenset(k for k, v in license_flags.items() if v.osi_approved),
+                        fsf_approved_licenses=frozenset(k for k, v in license_flags.items() if v.fsf_approved),
+                        deprecated_licenses=frozenset(k for k, v in license_flags.items() if v.deprecated),
+                        license_flags=license_flags)
+
+
+def _is_fresh(path: str, ttl: int) -> bool:
+    """
+    Check whether a cached file exists and is younger than the time to live.
+
+    :param path: The path to the cached file.
+    :param ttl: The time to live in seconds.
+    :return: True if the file can be used without downloading it again.
+    """
+    return os.path.isfile(path) and time.time() - os.path.getmtime(path) < ttl
+
+
+def _read_license_list(path: str) -> Optional[dict]:
+    """
+    Read a license list from disk.
+
+    :param path: The path to the license list.
+    :return: The license list, or None if the file is missing or broken.
+    """
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _download_license_list(cache_file: str) -> Optional[dict]:
+    """
+    Download the license list and store it in the cache.
+
+    :param cache_file: The path to the cached list.
+    :return: The license list, or None if it could not be downloaded.
+    """
+    try:
+        resp: Response = requests.get(SPDX_LICENSE_LIST_URL, timeout=30)
+        resp.raise_for_status()
+        raw_license_list: dict = resp.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # Write to a temporary file first, so concurrent runs never read a partially written cache
+        temp_file: str = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf8") as f:
+            json.dump(raw_license_list, f)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass
+
+    return raw_license_list
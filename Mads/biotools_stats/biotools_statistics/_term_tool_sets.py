@@ -0,0 +1,133 @@
+"""
+Compact storage of the sets of tools annotated with each EDAM term.
+
+The tools are mapped to dense integer codes, and the strict and total tool sets of every term are stored as rows of
+packed bitmaps, so the counts are popcounts and the biotoolsIDs are only decoded when they are needed.
+"""
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# The number of set bits in every byte
+_POPCOUNT: np.ndarray = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+class TermToolSets:
+    """
+    The strict (only the term itself) and total (the term or one of its descendants) tool sets of the EDAM terms.
+    """
+
+    def __init__(self):
+        """
+        Create empty tool sets.
+        """
+        # The rows and the columns of the bitmaps, in the order the terms and tools were first added
+        self.term_ids: Dict[str, int] = {}
+        self.tool_ids: Dict[str, int] = {}
+        # The (term, tool) pairs added so far. The bitmaps are built from them when they are needed.
+        self._strict_pairs: Tuple[array, array] = (array("i"), array("i"))
+        self._total_pairs: Tuple[array, array] = (array("i"), array("i"))
+        # The bio.tools IDs by column, for decoding the bitmaps
+        self._tool_id_list: List[str] = []
+
+    def term_code(self, term_id: str) -> int:
+        """
+        Get the row of a term, adding the term if it is new.
+
+        :param term_id: The EDAM term ID.
+        :return: The row of the term.
+        """
+        return self.term_ids.setdefault(term_id, len(self.term_ids))
+
+    def tool_code(self, tool_id: str) -> int:
+        """
+        Get the column of a tool, adding the tool if it is new.
+
+        :param tool_id: The bio.tools ID.
+        :return: The column of the tool.
+        """
+        return self.tool_ids.setdefault(tool_id, len(self.tool_ids))
+
+    def add_strict(self, term_code: int, tool_code: int):
+        """
+        Add a tool to the strict (and total) set of a term.
+
+        :param term_code: The row of the term.
+        :param tool_code: The column of the tool.
+        """
+        self._strict_pairs[0].append(term_code)
+        self._strict_pairs[1].append(tool_code)
+        self.add_total(term_code=term_code, tool_code=tool_code)
+
+    def add_total(self, term_code: int, tool_code: int):
+        """
+        Add a tool to the total set of a term.
+
+        :param term_code: The row of the term.
+        :param tool_code: The column of the tool.
+        """
+        self._total_pairs[0].append(term_code)
+        self._total_pairs[1].append(tool_code)
+
+    def merge(self, other: "TermToolSets"):
+        """
+        Add the tool sets of other terms and tools (e.g. from another shard of the tools) as unions.
+
+        The terms and tools of the other tool sets that are new get the next rows and columns, so merging the tool
+        sets of consecutive shards in order gives the same rows and columns as adding all tools to one.
+
+        :param other: The other tool sets.
+        """
+        term_codes: np.ndarray = np.array([self.term_code(term_id=term_id) for term_id in other.term_ids],
+                                          dtype=np.int32)
+        tool_codes: np.ndarray = np.array([self.tool_code(tool_id=tool_id) for tool_id in other.tool_ids],
+                                          dtype=np.int32)
+        for pairs, other_pairs in ((self._strict_pairs, other._strict_pairs),
+                                   (self._total_pairs, other._total_pairs)):
+            pairs[0].frombytes(term_codes[np.frombuffer(other_pairs[0], dtype=np.int32)].tobytes())
+            pairs[1].frombytes(tool_codes[np.frombuffer(other_pairs[1], dtype=np.int32)].tobytes())
+
+    def bitmaps(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the bitmaps of the strict and total tool sets.
+
+        :return: The strict and the total bitmaps, with one row of packed bits (uint8) per term.
+        """
+        return self._pack(pairs=self._strict_pairs), self._pack(pairs=self._total_pairs)
+
+    def _pack(self, pairs: Tuple[array, array]) -> np.ndarray:
+        """
+        Pack (term, tool) pairs into a bitmap.
+
+        :param pairs: The term codes and the tool codes.
+        :return: The bitmap with one row of packed bits per term.
+        """
+        bits: np.ndarray = np.zeros((len(self.term_ids), (len(self.tool_ids) + 7) // 8), dtype=np.uint8)
+        terms: np.ndarray = np.frombuffer(pairs[0], dtype=np.int32)
+        tools: np.ndarray = np.frombuffer(pairs[1], dtype=np.int32)
+        np.bitwise_or.at(bits, (terms, tools >> 3), (0x80 >> (tools & 7)).astype(np.uint8))
+        return bits
+
+    @staticmethod
+    def counts(bits: np.ndarray) -> np.ndarray:
+        """
+        Count the tools in every row of a bitmap.
+
+        :param bits: The bitmap.
+        :return: The number of tools for every term.
+        """
+        return _POPCOUNT[bits].sum(axis=1, dtype=np.int64)
+
+    def decode(self, row: np.ndarray) -> List[str]:
+        """
+        Decode a row of a bitmap into the bio.tools IDs.
+
+        :param row: The row of packed bits.
+        :return: The bio.tools IDs in the set.
+        """
+        # The tools are only ever added, so the list is only outdated if it is too short
+        if len(self._tool_id_list) != len(self.tool_ids):
+            self._tool_id_list = list(self.tool_ids)
+        return [self._tool_id_list[code]
+                for code in np.flatnonzero(np.unpackbits(row, count=len(self._tool_id_list)))]
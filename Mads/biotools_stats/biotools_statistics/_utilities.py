@@ -3,25 +3,317 @@ Different utilities and helper methods.
 
 """
 import datetime
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
 
 import dateutil
 from dateutil import parser
+import numpy as np
 import pytz
 from boltons.iterutils import remap
 
+from .compact import CompactRecord
 
-def clean_and_filter_tool_list(raw_tools: list, upper_time_limit: datetime.datetime) -> list:
+_EPOCH: datetime.datetime = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
+_MICROSECOND: datetime.timedelta = datetime.timedelta(microseconds=1)
+
+EDAM_URI_PREFIX: str = "http://edamontology.org/"
+# Where a term can be used in a tool, and the term type of the slot
+SLOTS: Dict[str, str] = {"topic": "topic", "operation": "operation", "input_data": "data", "input_format": "format",
+                         "output_data": "data", "output_format": "format"}
+
+
+class TermUse(NamedTuple):
+    """
+    An EDAM term used in a tool.
+    """
+    # The slot (see SLOTS)
+    slot: str
+    # The position of the function in the tool, None for topics
+    function: Optional[int]
+    # The position of the input or output in the function, None for topics and operations
+    io: Optional[int]
+    # The term ID, e.g. "data_0006"
+    term_id: str
+
+
+def clean_and_filter_tool_list(raw_tools: Iterable[dict], upper_time_limit: datetime.datetime,
+                               cleaning: str = "copy") -> list:
     """
     Clean the list of tools.
 
-    :param raw_tools: The raw list of tools.
+    :param raw_tools: The raw list (or any iterable) of tools.
     :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
         Default: datetime.datetime.today()
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none". Default: "copy".
     :return: The cleaned list of tools.
     """
-    # Clean the list
-    drop_false = lambda path, key, value: bool(value)
-    unfiltered_tools = remap(raw_tools, visit=drop_false)
-    # Filter the tools according to the upper time limit
-    return [tool for tool in unfiltered_tools
-            if dateutil.parser.isoparse(tool["additionDate"]) < pytz.utc.localize(upper_time_limit)]
+    return list(iter_clean_and_filter_tools(raw_tools=raw_tools, upper_time_limit=upper_time_limit,
+                                            cleaning=cleaning))
+
+
+def iter_clean_and_filter_tools(raw_tools: Iterable[dict], upper_time_limit: datetime.datetime,
+                                cleaning: str = "copy") -> Iterator[dict]:
+    """
+    Filter and clean the tools one at a time, so the cleaned tools never have to be held in memory together.
+
+    The tools are filtered by the addition date before they are cleaned, so tools after the time limit are never
+    cleaned.
+
+    :param raw_tools: The raw iterable of tools.
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none". Default: "copy".
+    :return: The generator yielding the cleaned tools.
+    """
+    clean_tool: Callable[[dict], dict] = _get_cleaner(cleaning=cleaning)
+    # The time limit is converted once, and the tools are compared to it as integers
+    time_limit: int = to_timestamp(date=upper_time_limit)
+    if isinstance(raw_tools, DatedTools):
+        # The tools are already sorted by their parsed addition dates
+        for raw_tool in raw_tools.until(time_limit=time_limit):
+            yield clean_tool(raw_tool)
+        return
+    for raw_tool in raw_tools:
+        # Empty tools are dropped by the cleaning.
+        # Filter the tools according to the upper time limit (the addition date is never empty in bio.tools)
+        if raw_tool and addition_timestamp(tool=raw_tool) < time_limit:
+            yield clean_tool(raw_tool)
+
+
+def iter_clean_tools(raw_tools: Iterable[dict], cleaning: str = "copy") -> Iterator[dict]:
+    """
+    Clean the tools one at a time, by removing all empty values.
+
+    :param raw_tools: The raw iterable of tools.
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none". Default: "copy".
+    :return: The generator yielding the cleaned tools.
+    """
+    clean_tool: Callable[[dict], dict] = _get_cleaner(cleaning=cleaning)
+    for raw_tool in raw_tools:
+        # Empty tools are dropped by the cleaning
+        if raw_tool:
+            yield clean_tool(raw_tool)
+
+
+def iter_term_uses(tool: dict) -> Iterator[TermUse]:
+    """
+    Walk over the EDAM terms used in a tool: the topics, then for every function its operations, and the data and the
+    formats of its inputs, then of its outputs.
+
+    The empty values (and the terms without URI) are skipped, so the tool does not need to be cleaned. The positions
+    of the functions and the inputs and outputs are their positions in the given tool.
+
+    :param tool: The raw or cleaned tool.
+    :return: The generator yielding the uses of the terms.
+    """
+    for term in tool.get("topic") or ():
+        if term and term.get("uri"):
+            yield TermUse(slot="topic", function=None, io=None, term_id=term_id(term=term))
+    for function_position, function in enumerate(tool.get("function") or ()):
+        if not function:
+            continue
+        for term in function.get("operation") or ():
+            if term and term.get("uri"):
+                yield TermUse(slot="operation", function=function_position, io=None, term_id=term_id(term=term))
+        for io_type in ("input", "output"):
+            for io_position, io in enumerate(function.get(io_type) or ()):
+                if not io:
+                    continue
+                for slot, terms in ((f"{io_type}_data", [io.get("data")]), (f"{io_type}_format", io.get("format"))):
+                    for term in terms or ():
+                        if term and term.get("uri"):
+                            yield TermUse(slot=slot, function=function_position, io=io_position,
+                                          term_id=term_id(term=term))
+
+
+def extract_tool_terms(tool: dict, slots: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+    """
+    Extract the IDs of the EDAM terms used in a tool, in the order of iter_term_uses.
+
+    :param tool: The raw or cleaned tool.
+    :param slots: The key of every slot in the result, e.g. SLOTS to group the terms by term type. The slots that
+        are left out are skipped. Default: every slot by itself.
+    :return: The dictionary with the keys and the term IDs.
+    """
+    slots = slots if slots is not None else {slot: slot for slot in SLOTS}
+    terms: Dict[str, List[str]] = {key: [] for key in slots.values()}
+    for use in iter_term_uses(tool=tool):
+        key: Optional[str] = slots.get(use.slot)
+        if key is not None:
+            terms[key].append(use.term_id)
+    return terms
+
+
+def term_id(term: Union[dict, str]) -> str:
+    """
+    Get the ID of an EDAM term, e.g. "data_0006" for "http://edamontology.org/data_0006".
+
+    :param term: The annotated term ({"uri": ..., "term": ...}), or its URI or ID.
+    :return: The term ID.
+    """
+    uri: str = term if isinstance(term, str) else term["uri"]
+    return uri[len(EDAM_URI_PREFIX):] if uri.startswith(EDAM_URI_PREFIX) else uri
+
+
+def parse_addition_date(tool: dict) -> datetime.datetime:
+    """
+    Parse the addition date of a tool.
+
+    :param tool: The tool.
+    :return: The addition date.
+    """
+    return dateutil.parser.isoparse(tool["additionDate"])
+
+
+def addition_timestamp(tool: dict) -> int:
+    """
+    Parse the addition date of a tool into a timestamp.
+
+    The dates from bio.tools ("2015-02-16T10:06:57Z") are parsed with datetime.fromisoformat, which is much faster
+    than dateutil.parser.isoparse. Other ISO 8601 dates fall back to isoparse.
+
+    :param tool: The tool.
+    :return: The addition date in microseconds since the epoch (UTC).
+    """
+    addition_date: str = tool["additionDate"]
+    try:
+        date: datetime.datetime = datetime.datetime.fromisoformat(
+            addition_date[:-1] + "+00:00" if addition_date.endswith("Z") else addition_date)
+    except ValueError:
+        date = dateutil.parser.isoparse(addition_date)
+    return to_timestamp(date=date)
+
+
+def to_timestamp(date: datetime.datetime) -> int:
+    """
+    Convert a date into a timestamp.
+
+    :param date: The date. Dates without a time zone are in UTC, like the upper time limits.
+    :return: The date in microseconds since the epoch (UTC).
+    """
+    if date.tzinfo is None:
+        date = pytz.utc.localize(date)
+    return (date - _EPOCH) // _MICROSECOND
+
+
+def statistics_time_limit(statistics: dict) -> datetime.datetime:
+    """
+    Get the upper time limit of calculated statistics.
+
+    The date of the statistics is only precise to the second, so the timestamp is used if the statistics have it. For
+    statistics without the timestamp (e.g. saved by older versions), the tools added in the second of the time limit
+    are on the wrong side of it.
+
+    :param statistics: The statistics, with the date and the timestamp.
+    :return: The time limit, in the time zone of the date (or without time zone, like the date).
+    """
+    date: datetime.datetime = datetime.datetime.fromisoformat(statistics["date"])
+    if "timestamp" not in statistics:
+        return date
+    exact: datetime.datetime = _EPOCH + datetime.timedelta(microseconds=statistics["timestamp"])
+    return exact.replace(tzinfo=None) if date.tzinfo is None else exact.astimezone(date.tzinfo)
+
+
+class DatedTools:
+    """
+    Tools sorted by their addition dates, which are parsed only once.
+
+    The tools can be given to the statistics functions instead of the tool list. Filtering the tools for an upper
+    time limit is then a binary search, which makes calculating statistics for many time limits (or for many
+    collections) cheaper. The tools are given in the order of their addition dates, so the IDs in the EDAM term
+    statistics are in that order as well.
+    """
+
+    def __init__(self, raw_tools: Iterable[dict]):
+        """
+        Parse the addition dates and sort the tools.
+
+        :param raw_tools: The raw tools. Empty tools are left out.
+        """
+        tools: List[dict] = [raw_tool for raw_tool in raw_tools if raw_tool]
+        timestamps: np.ndarray = np.fromiter((addition_timestamp(tool=tool) for tool in tools), dtype=np.int64,
+                                             count=len(tools))
+        order: np.ndarray = np.argsort(timestamps, kind="stable")
+        self.tools: List[dict] = [tools[i] for i in order]
+        self.timestamps: np.ndarray = timestamps[order]
+
+    def count_until(self, time_limit: Union[int, datetime.datetime]) -> int:
+        """
+        Count the tools added before a time limit. They are the first tools.
+
+        :param time_limit: The upper time limit, as a date or a timestamp (see to_timestamp).
+        :return: The number of tools.
+        """
+        if isinstance(time_limit, datetime.datetime):
+            time_limit = to_timestamp(date=time_limit)
+        return int(np.searchsorted(self.timestamps, time_limit, side="left"))
+
+    def until(self, time_limit: Union[int, datetime.datetime]) -> List[dict]:
+        """
+        Get the tools added before a time limit.
+
+        :param time_limit: The upper time limit, as a date or a timestamp (see to_timestamp).
+        :return: The tools, in the order of their addition dates.
+        """
+        return self.tools[:self.count_until(time_limit=time_limit)]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.tools)
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+
+def default_cache_dir() -> str:
+    """
+    Get the default directory for the cached files (license list, EDAM indexes, ...).
+
+    :return: The path to the cache directory.
+    """
+    cache_home: str = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "biotools_statistics")
+
+
+def _get_cleaner(cleaning: str) -> Callable[[dict], dict]:
+    """
+    Get the function cleaning a single tool.
+
+    :param cleaning: The cleaning mode. "copy" creates cleaned copies and leaves the raw tools untouched, "in_place"
+        removes the empty values from the raw tools themselves, and "none" is for tools already known to be clean.
+        Compact records are clean and read-only, so they are never copied.
+    :return: The cleaning function.
+    """
+    cleaners: Dict[str, Callable[[dict], dict]] = {
+        "copy": lambda tool: tool if isinstance(tool, CompactRecord) else remap(tool, visit=_drop_false),
+        "in_place": _drop_false_in_place,
+        "none": lambda tool: tool,
+    }
+    if cleaning not in cleaners:
+        raise ValueError(f"The cleaning mode '{cleaning}' is not valid. Must be 'copy', 'in_place', or 'none'.")
+    return cleaners[cleaning]
+
+
+def _drop_false(path: tuple, key: Any, value: Any) -> bool:
+    """
+    The remap visit function keeping only the values that are not empty.
+    """
+    return bool(value)
+
+
+def _drop_false_in_place(value: Any) -> Any:
+    """
+    Remove the empty values from nested dicts and lists in place.
+
+    Like remap, the children are cleaned before the values are checked, so a dict or list that only contained empty
+    values is removed as well.
+
+    :param value: The value to clean.
+    :return: The cleaned value (the same object).
+    """
+    if isinstance(value, dict):
+        for key in list(value):
+            if not _drop_false_in_place(value[key]):
+                del value[key]
+    elif isinstance(value, list):
+        value[:] = [child for child in value if _drop_false_in_place(child)]
+    return value
@@ -0,0 +1,195 @@
+"""
+A columnar representation of a tool list, for calculating the general statistics without walking the tools.
+
+The tools are compiled once into flat numpy arrays, sorted by the addition date:
+- the addition dates, as microseconds since the epoch (UTC),
+- the length of every counted field (0 if the tool does not have the field),
+- the values of the fields with value statistics, as integer codes into a vocabulary, with the offsets of every
+  tool's values (so multi-valued fields like toolType or language are stored without nesting).
+
+The statistics for a time limit are then a binary search for the number of tools and a bincount for every field.
+A compiled registry is saved as a directory of .npy files, which are memory mapped when they are loaded.
+"""
+import json
+import os
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ._utilities import addition_timestamp, iter_clean_tools, to_timestamp
+from ._spdx_license_parser import parse_license_list, LicensesData
+from .stats import COUNTED_FIELDS, VALUE_FIELDS, GeneralStatisticsAggregator
+
+# The fields with value statistics. The license is a single value, which is classified when the statistics are made.
+_CODED_FIELDS: List[str] = list(VALUE_FIELDS) + ["license"]
+
+
+class ColumnarRegistry:
+    """
+    The compiled, columnar tool list. All arrays are ordered by the addition date of the tools.
+    """
+
+    def __init__(self, dates: np.ndarray, lengths: Dict[str, np.ndarray], offsets: Dict[str, np.ndarray],
+                 codes: Dict[str, np.ndarray], vocabularies: Dict[str, List[str]]):
+        """
+        Create the registry from its arrays. Use ColumnarRegistry.from_tools or ColumnarRegistry.load instead.
+
+        :param dates: The addition dates in microseconds since the epoch (int64), in ascending order.
+        :param lengths: The length of every counted field for every tool (int32).
+        :param offsets: The start of every tool's values in the codes, and the end of the last tool's (int64).
+        :param codes: The codes of the values of the fields with value statistics (int32).
+        :param vocabularies: The values of every code of the fields with value statistics.
+        """
+        self.dates: np.ndarray = dates
+        self.lengths: Dict[str, np.ndarray] = lengths
+        self.offsets: Dict[str, np.ndarray] = offsets
+        self.codes: Dict[str, np.ndarray] = codes
+        self.vocabularies: Dict[str, List[str]] = vocabularies
+
+    @classmethod
+    def from_tools(cls, tools: Iterable[dict], cleaning: str = "copy") -> "ColumnarRegistry":
+        """
+        Compile a tool list.
+
+        :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at
+            a time.
+        :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools
+            are already clean). Default: "copy".
+        :return: The compiled registry.
+        """
+        dates: array = array("q")
+        lengths: Dict[str, array] = {field: array("i") for field, _, _, _ in COUNTED_FIELDS}
+        offsets: Dict[str, array] = {field: array("q", [0]) for field in _CODED_FIELDS}
+        codes: Dict[str, array] = {field: array("i") for field in _CODED_FIELDS}
+        vocabulary_codes: Dict[str, Dict[str, int]] = {field: {} for field in _CODED_FIELDS}
+
+        for tool in iter_clean_tools(raw_tools=tools, cleaning=cleaning):
+            dates.append(addition_timestamp(tool=tool))
+            for field, _, count_key, _ in COUNTED_FIELDS:
+                # Only the entry counts need the real length, the other fields only need to be marked as present
+                lengths[field].append(0 if field not in tool else len(tool[field]) if count_key is not None else 1)
+
+            for field in _CODED_FIELDS:
+                if field in tool:
+                    values: Iterable[str] = ((tool[field],) if field == "license"
+                                             else VALUE_FIELDS[field][1](tool[field]))
+                    field_codes: Dict[str, int] = vocabulary_codes[field]
+                    codes[field].extend(field_codes.setdefault(value, len(field_codes)) for value in values)
+                offsets[field].append(len(codes[field]))
+
+        # Sort the tools by the addition date, keeping the order of tools added at the same time
+        order: np.ndarray = np.argsort(np.frombuffer(dates, dtype=np.int64), kind="stable")
+        sorted_offsets: Dict[str, np.ndarray] = {}
+        sorted_codes: Dict[str, np.ndarray] = {}
+        for field in _CODED_FIELDS:
+            sorted_offsets[field], sorted_codes[field] = _reorder_values(
+                offsets=np.frombuffer(offsets[field], dtype=np.int64),
+                codes=np.frombuffer(codes[field], dtype=np.int32), order=order)
+
+        return cls(dates=np.frombuffer(dates, dtype=np.int64)[order],
+                   lengths={field: np.frombuffer(field_lengths, dtype=np.int32)[order]
+                            for field, field_lengths in lengths.items()},
+                   offsets=sorted_offsets, codes=sorted_codes,
+                   vocabularies={field: list(field_codes) for field, field_codes in vocabulary_codes.items()})
+
+    def tool_count(self, upper_time_limit: datetime) -> int:
+        """
+        Get the number of tools added before a time limit. They are the first tools of the registry.
+
+        :param upper_time_limit: The upper time limit.
+        :return: The number of tools.
+        """
+        return int(np.searchsorted(self.dates, to_timestamp(date=upper_time_limit), side="left"))
+
+    def save(self, path: str):
+        """
+        Save the registry as a directory of .npy files.
+
+        :param path: The path to the directory.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "dates.npy"), self.dates)
+        for field, field_lengths in self.lengths.items():
+            np.save(os.path.join(path, f"{field}.lengths.npy"), field_lengths)
+        for field in _CODED_FIELDS:
+            np.save(os.path.join(path, f"{field}.offsets.npy"), self.offsets[field])
+            np.save(os.path.join(path, f"{field}.codes.npy"), self.codes[field])
+        with open(os.path.join(path, "vocabularies.json"), "w", encoding="utf8") as f:
+            json.dump(self.vocabularies, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ColumnarRegistry":
+        """
+        Load a registry saved with ColumnarRegistry.save.
+
+        :param path: The path to the directory.
+        :param mmap: Memory map the arrays instead of reading them. Default: True.
+        :return: The registry.
+        """
+        mmap_mode: Optional[str] = "r" if mmap else None
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        with open(os.path.join(path, "vocabularies.json"), "r", encoding="utf8") as f:
+            vocabularies: Dict[str, List[str]] = json.load(f)
+        return cls(dates=load_array("dates"),
+                   lengths={field: load_array(f"{field}.lengths") for field, _, _, _ in COUNTED_FIELDS},
+                   offsets={field: load_array(f"{field}.offsets") for field in _CODED_FIELDS},
+                   codes={field: load_array(f"{field}.codes") for field in _CODED_FIELDS},
+                   vocabularies=vocabularies)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def calculate_columnar_general_statistics(registry: ColumnarRegistry, upper_time_limit: datetime = datetime.today(),
+                                          offline: bool = False) -> dict:
+    """
+    Calculate the general statistics from a compiled registry.
+
+    :param registry: The compiled registry (ColumnarRegistry.from_tools or ColumnarRegistry.load).
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+        Default: datetime.datetime.today()
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :return: The dictionary with the statistics, identical to the result of calculate_general_statistics.
+    """
+    license_info: LicensesData = parse_license_list(offline=offline)
+    aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
+
+    tool_count: int = registry.tool_count(upper_time_limit=upper_time_limit)
+    aggregator.tool_count = tool_count
+    for field, _, count_key, _ in COUNTED_FIELDS:
+        field_lengths: np.ndarray = registry.lengths[field][:tool_count]
+        aggregator.has[field] = int(np.count_nonzero(field_lengths))
+        if count_key is not None:
+            aggregator.counts[field] = int(field_lengths.sum(dtype=np.int64))
+
+    for field in _CODED_FIELDS:
+        vocabulary: List[str] = registry.vocabularies[field]
+        value_counts: np.ndarray = np.bincount(registry.codes[field][:registry.offsets[field][tool_count]],
+                                               minlength=len(vocabulary))
+        aggregator.add_value_counts(field=field, value_counts=((vocabulary[code], int(value_counts[code]))
+                                                               for code in np.flatnonzero(value_counts)))
+
+    return aggregator.to_dict(date=upper_time_limit)
+
+
+def _reorder_values(offsets: np.ndarray, codes: np.ndarray, order: np.ndarray) -> tuple:
+    """
+    Reorder the values of the tools.
+
+    :param offsets: The offsets of every tool's values.
+    :param codes: The codes of the values.
+    :param order: The new order of the tools.
+    :return: The reordered offsets and codes.
+    """
+    value_counts: np.ndarray = np.diff(offsets)[order]
+    new_offsets: np.ndarray = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(value_counts, out=new_offsets[1:])
+    # The position of every value in the old codes: the old start of its tool plus its place among the tool's values
+    positions: np.ndarray = (np.repeat(offsets[:-1][order] - new_offsets[:-1], value_counts)
+                             + np.arange(new_offsets[-1], dtype=np.int64))
+    return new_offsets, codes[positions]
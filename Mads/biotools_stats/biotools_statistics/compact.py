@@ -0,0 +1,142 @@
+"""
+Compact in-memory tool records, for keeping a whole dump in memory.
+
+A dump loaded with json.load keeps every tool as nested dicts and lists, and repeats the same strings (tool types,
+EDAM URIs and term names, operating systems, ...) as separate objects. The compact records are built once per tool:
+- the dicts become read-only CompactRecord mappings, which store their values in a tuple and share the layout of
+  their keys with all records with the same keys,
+- the lists become tuples,
+- the short strings are interned, so every distinct value (and key) is stored once,
+- the empty values are removed, like the cleaning of the statistics.
+
+The records are read like cleaned tool dicts, so they can be given to all statistics functions. They are already
+clean, so cleaning="none" skips the cleaning, and the default cleaning "copy" passes them through unchanged.
+
+    tools = load_compact_tools("biotools.json")
+    calculate_general_statistics(tools=tools, cleaning="none")
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .tool_loader import load_tools
+
+# Longer strings (e.g. the descriptions) are rarely repeated, so they are not interned
+_MAX_INTERNED_LENGTH: int = 256
+
+
+class CompactRecord(Mapping):
+    """
+    A read-only mapping storing its values in a tuple, with the positions of the keys shared between records.
+    """
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, layout: Dict[str, int], values: tuple):
+        """
+        Create the record. Use compact_tools or load_compact_tools instead.
+
+        :param layout: The position of every key in the values. Shared by the records with the same keys.
+        :param values: The values.
+        """
+        self._layout: Dict[str, int] = layout
+        self._values: tuple = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._layout[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position: int = self._layout.get(key, -1)
+        return default if position < 0 else self._values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"CompactRecord({self.to_dict()!r})"
+
+    def __reduce__(self) -> tuple:
+        # The shared layout is rebuilt from the keys, e.g. when the records are sent to other processes
+        return _restore_record, (tuple(self._layout), self._values)
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record back to plain dicts and lists, e.g. for json.dumps.
+
+        :return: The dict.
+        """
+        return {key: _to_plain(value=value) for key, value in zip(self._layout, self._values)}
+
+
+def compact_tools(tools: Iterable[dict]) -> List[CompactRecord]:
+    """
+    Convert tools into compact records.
+
+    :param tools: The raw tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
+    :return: The list of the compact, cleaned tools.
+    """
+    compactor: _Compactor = _Compactor()
+    return [compactor.record(value=tool) for tool in tools]
+
+
+def load_compact_tools(path: str) -> List[CompactRecord]:
+    """
+    Load a dump as compact records, without loading the whole file as dicts first.
+
+    :param path: The path to the dump (see load_tools).
+    :return: The list of the compact, cleaned tools.
+    """
+    return compact_tools(tools=load_tools(path))
+
+
+class _Compactor:
+    """
+    Converts the tools, with the interned strings and the layouts shared by all tools of a dump.
+    """
+
+    def __init__(self):
+        self.strings: Dict[str, str] = {}
+        self.layouts: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+    def record(self, value: dict) -> CompactRecord:
+        items: List[Tuple[str, Any]] = []
+        for key, child in value.items():
+            child = self.value(value=child)
+            # Like the cleaning, the children are cleaned before checking whether the value is empty
+            if child:
+                items.append((self.string(value=key), child))
+        keys: Tuple[str, ...] = tuple(key for key, _ in items)
+        layout: Dict[str, int] = self.layouts.get(keys)
+        if layout is None:
+            layout = self.layouts.setdefault(keys, {key: position for position, key in enumerate(keys)})
+        return CompactRecord(layout=layout, values=tuple(child for _, child in items))
+
+    def value(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.string(value=value)
+        if isinstance(value, dict):
+            return self.record(value=value)
+        if isinstance(value, list):
+            return tuple(child for child in map(self.value, value) if child)
+        return value
+
+    def string(self, value: str) -> str:
+        if len(value) > _MAX_INTERNED_LENGTH:
+            return value
+        return self.strings.setdefault(value, value)
+
+
+def _restore_record(keys: Tuple[str, ...], values: tuple) -> CompactRecord:
+    return CompactRecord(layout={key: position for position, key in enumerate(keys)}, values=values)
+
+
+def _to_plain(value: Any) -> Any:
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_to_plain(value=child) for child in value]
+    return value
@@ -0,0 +1,120 @@
+"""
+The compiled index of EDAM terms, used for looking up the names, depths and ancestors of the terms.
+
+The index is built once from a bio.tools index list (https://bio.tools/api/o/index_EDAM_{term_type}), where each
+path is a "||"-joined string of term IDs from the root to the term, and can be saved to and loaded from disk.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class EdamIndex:
+    """
+    The compiled EDAM index, mapping every term ID to an integer code with its name, minimum depth and ancestors.
+
+    Terms which only occur in the paths of other terms get a code as well, with the name "" and the depth -1,
+    just like terms that are not in the index list.
+    """
+
+    def __init__(self, term_ids: List[str], names: List[str], depths: np.ndarray, ancestor_offsets: np.ndarray,
+                 ancestor_codes: np.ndarray):
+        """
+        Create the index from the compiled arrays. Use from_index_list or load to create an index.
+
+        :param term_ids: The term IDs, indexed by code.
+        :param names: The term names, indexed by code.
+        :param depths: The minimum depth of every term (0 is the root), indexed by code.
+        :param ancestor_offsets: The offsets of the ancestors of every term in ancestor_codes (length: terms + 1).
+        :param ancestor_codes: The codes of the ancestors (including the term itself) of all terms, in path order.
+        """
+        self.term_ids: List[str] = term_ids
+        self.names: List[str] = names
+        self.depths: np.ndarray = depths
+        self.ancestor_offsets: np.ndarray = ancestor_offsets
+        self.ancestor_codes: np.ndarray = ancestor_codes
+        self.codes: Dict[str, int] = {term_id: code for code, term_id in enumerate(term_ids)}
+        # Python lists of the ancestors, as they are looked up for every term of every tool
+        self._ancestors: List[List[int]] = [ancestor_codes[start:end].tolist()
+                                            for start, end in zip(ancestor_offsets[:-1], ancestor_offsets[1:])]
+
+    def __len__(self) -> int:
+        return len(self.term_ids)
+
+    def __contains__(self, term_id: str) -> bool:
+        return term_id in self.codes
+
+    @classmethod
+    def from_index_list(cls, index_list: dict) -> "EdamIndex":
+        """
+        Compile the index from a bio.tools index list.
+
+        :param index_list: The index list ({term ID: {"name": ..., "path": [{"key": "id||id||..."}, ...]}}).
+        :return: The compiled index.
+        """
+        codes: Dict[str, int] = {term_id: code for code, term_id in enumerate(index_list)}
+        term_ids: List[str] = list(index_list)
+        ancestors: List[List[int]] = []
+
+        for term_id in index_list:
+            branch_codes: Dict[int, None] = {}  # Ordered set of the codes, in the order of the paths
+            for path in index_list[term_id]["path"]:
+                for branch_term in path["key"].split("||"):
+                    if branch_term not in codes:
+                        codes[branch_term] = len(term_ids)
+                        term_ids.append(branch_term)
+                    branch_codes[codes[branch_term]] = None
+            ancestors.append(list(branch_codes))
+        # The terms only found in the paths have no ancestors
+        ancestors.extend([] for _ in range(len(term_ids) - len(ancestors)))
+
+        names: List[str] = [index_list[term_id]["name"] if term_id in index_list else "" for term_id in term_ids]
+        depths: np.ndarray = np.array([min(len(path["key"].split("||")) for path in index_list[term_id]["path"]) - 1
+                                       if term_id in index_list else -1 for term_id in term_ids], dtype=np.int32)
+        ancestor_offsets: np.ndarray = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum([len(term_ancestors) for term_ancestors in ancestors], out=ancestor_offsets[1:])
+        ancestor_codes: np.ndarray = np.fromiter((code for term_ancestors in ancestors for code in term_ancestors),
+                                                 dtype=np.int32, count=int(ancestor_offsets[-1]))
+
+        return cls(term_ids=term_ids, names=names, depths=depths, ancestor_offsets=ancestor_offsets,
+                   ancestor_codes=ancestor_codes)
+
+    def code(self, term_id: str) -> Optional[int]:
+        """
+        Get the code of a term.
+
+        :param term_id: The term ID.
+        :return: The code, or None if the term is unknown.
+        """
+        return self.codes.get(term_id)
+
+    def ancestors(self, code: int) -> List[int]:
+        """
+        Get the codes of the ancestors of a term, including the term itself.
+
+        :param code: The code of the term.
+        :return: The codes of the ancestors, in the order they appear in the paths.
+        """
+        return self._ancestors[code]
+
+    def save(self, path: str):
+        """
+        Save the index to disk as a .npz file.
+
+        :param path: The path to save the index to.
+        """
+        np.savez_compressed(path, term_ids=np.array(self.term_ids, dtype=str), names=np.array(self.names, dtype=str),
+                            depths=self.depths, ancestor_offsets=self.ancestor_offsets,
+                            ancestor_codes=self.ancestor_codes)
+
+    @classmethod
+    def load(cls, path: str) -> "EdamIndex":
+        """
+        Load an index saved with save.
+
+        :param path: The path to the saved index.
+        :return: The index.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(term_ids=data["term_ids"].tolist(), names=data["names"].tolist(), depths=data["depths"],
+                       ancestor_offsets=data["ancestor_offsets"], ancestor_codes=data["ancestor_codes"])
@@ -0,0 +1,134 @@
+"""
+Building the EDAM index lists locally from an EDAM OWL file, instead of fetching them from
+https://bio.tools/api/o/index_EDAM_{term_type}.
+
+The compiled indexes are cached on disk, keyed by the hash of the OWL file, so the OWL file is only parsed once.
+"""
+import hashlib
+import os
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Optional
+
+from ._utilities import default_cache_dir
+from .edam_index import EdamIndex
+
+_EDAM_URI: str = "http://edamontology.org/"
+_OWL: str = "{http://www.w3.org/2002/07/owl#}"
+_RDF: str = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+_RDFS: str = "{http://www.w3.org/2000/01/rdf-schema#}"
+
+
+def load_edam_index(owl_path: str, term_type: str, cache_dir: Optional[str] = None) -> EdamIndex:
+    """
+    Load the compiled index of a term type from an EDAM OWL file, using the cached index if there is one.
+
+    :param owl_path: The path to the EDAM OWL file.
+    :param term_type: The term type ("topic", "operation", "format" or "data").
+    :param cache_dir: The directory for the cached indexes. Default: $XDG_CACHE_HOME/biotools_statistics.
+    :return: The compiled index, which can be given to calculate_edam_term_statistics as the index list.
+    """
+    term_type = term_type.lower()
+    cache_path: str = os.path.join(cache_dir or default_cache_dir(),
+                                   f"edam_{_file_hash(path=owl_path)}_{term_type}.npz")
+    if os.path.isfile(cache_path):
+        return EdamIndex.load(cache_path)
+
+    index: EdamIndex = EdamIndex.from_index_list(build_index_list(owl_path=owl_path, term_type=term_type))
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # np.savez adds the .npz extension, so the temporary file must end with it as well
+        temp_path: str = f"{cache_path[:-len('.npz')]}.{os.getpid()}.tmp.npz"
+        index.save(temp_path)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+    return index
+
+
+def build_index_list(owl_path: str, term_type: str) -> dict:
+    """
+    Build the index list of a term type from an EDAM OWL file, in the shape of the bio.tools index list.
+
+    Deprecated terms are left out, and only the parents of the same term type are followed.
+
+    :param owl_path: The path to the EDAM OWL file.
+    :param term_type: The term type ("topic", "operation", "format" or "data").
+    :return: The index list ({term ID: {"name": ..., "path": [{"key": "root||...||term ID"}, ...]}}).
+    """
+    term_type = term_type.lower()
+    if term_type not in ["topic", "operation", "format", "data"]:
+        raise ValueError(f"The term type '{term_type}' is not valid. Must be 'Topic', 'Operation', 'Format', or"
+                         f"'Data'.")
+
+    names, parents = _parse_owl(owl_path=owl_path, prefix=f"{term_type}_")
+
+    paths: Dict[str, List[str]] = {}
+    return {term_id: {"name": names[term_id],
+                      "path": [{"key": path} for path in _get_paths(term_id=term_id, parents=parents, paths=paths)]}
+            for term_id in names}
+
+
+def _parse_owl(owl_path: str, prefix: str) -> tuple:
+    """
+    Parse the names and the parents of the (not deprecated) terms with the prefix.
+
+    :param owl_path: The path to the EDAM OWL file.
+    :param prefix: The term ID prefix, e.g. "topic_".
+    :return: The dictionaries with the term names and the term parents.
+    """
+    names: Dict[str, str] = {}
+    parents: Dict[str, List[str]] = {}
+
+    for _, element in ElementTree.iterparse(owl_path, events=("end",)):
+        if element.tag != f"{_OWL}Class":
+            continue
+        term_id: str = element.get(f"{_RDF}about", "").replace(_EDAM_URI, "")
+        deprecated = element.find(f"{_OWL}deprecated")
+        if term_id.startswith(prefix) and (deprecated is None or deprecated.text != "true"):
+            label = element.find(f"{_RDFS}label")
+            names[term_id] = label.text if label is not None else ""
+            # Only the direct superclasses, not the restrictions
+            parents[term_id] = [parent.get(f"{_RDF}resource").replace(_EDAM_URI, "")
+                                for parent in element.findall(f"{_RDFS}subClassOf")
+                                if parent.get(f"{_RDF}resource", "").startswith(_EDAM_URI + prefix)]
+        element.clear()
+
+    # Remove the parents that are deprecated
+    for term_id in parents:
+        parents[term_id] = [parent for parent in parents[term_id] if parent in names]
+
+    return names, parents
+
+
+def _get_paths(term_id: str, parents: Dict[str, List[str]], paths: Dict[str, List[str]],
+               visiting: frozenset = frozenset()) -> List[str]:
+    """
+    Get all the paths from the roots to a term.
+
+    :param term_id: The term ID.
+    :param parents: The parents of every term.
+    :param paths: The already computed paths of the terms.
+    :param visiting: The terms on the current path, to guard against cycles.
+    :return: The paths, as "||"-joined term IDs from the root to the term.
+    """
+    if term_id not in paths:
+        term_paths: List[str] = [f"{parent_path}||{term_id}"
+                                 for parent in parents[term_id] if parent not in visiting
+                                 for parent_path in _get_paths(term_id=parent, parents=parents, paths=paths,
+                                                               visiting=visiting | {term_id})]
+        paths[term_id] = term_paths or [term_id]
+    return paths[term_id]
+
+
+def _file_hash(path: str) -> str:
+    """
+    Hash the content of a file.
+
+    :param path: The path to the file.
+    :return: The first 16 characters of the SHA-256 hex digest.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()[:16]
@@ -2,229 +2,289 @@
 The scripts for calculating statistics for the EDAM terms for the terms.
 
 """
-import itertools
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from ._utilities import clean_and_filter_tool_list
+from ._utilities import SLOTS, extract_tool_terms, iter_clean_and_filter_tools, statistics_time_limit, to_timestamp
+from .edam_index import EdamIndex
+from ._term_tool_sets import TermToolSets
+from .profiling import DISABLED_PROFILER, StageProfiler
 
+TERM_TYPES: List[str] = ["topic", "operation", "format", "data"]
 
-def calculate_edam_term_statistics(tools: list, term_type: str, index_list: dict,
-                                   upper_time_limit: datetime = datetime.today(), output_ids: bool = False) -> dict:
+
+def calculate_edam_term_statistics(tools: Iterable[dict], term_type: str, index_list: Union[dict, EdamIndex],
+                                   upper_time_limit: datetime = datetime.today(), output_ids: bool = False,
+                                   cleaning: str = "copy", profiler: Optional[StageProfiler] = None) -> dict:
     """
     Calculate the statistics for EDAM terms.
 
-    :param tools: The tool list.
+    :param tools: The tool list. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
     :param term_type: The term type to calculate statistics for.
-    :param index_list: The index list for the terms.
+    :param index_list: The index list for the terms, or the index compiled from it with EdamIndex.from_index_list.
     :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
         Default: datetime.datetime.today().
     :param output_ids: Indicate whether the ids should be in the output. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :param profiler: The profiler recording the time of the stages of the calculation. Default: None (no timing).
     :return: The dictionary with the terms, the IDs and counts for strict (Only the specific term)
         and total (for parent terms).
     """
+    return calculate_all_edam_term_statistics(tools=tools, index_lists={term_type: index_list},
+                                              upper_time_limit=upper_time_limit, output_ids=output_ids,
+                                              cleaning=cleaning, profiler=profiler)
 
-    tools = clean_and_filter_tool_list(raw_tools=tools, upper_time_limit=upper_time_limit)
 
-    # Create the dictionary to hold the topic statistics with the default fields.
-    temp_statistics = defaultdict(
-        lambda: {"name": "", "depth": -1,
-                 "strict_ids": set(), "total_ids": set(),
-                 "strict_count": 0, "total_count": 0})
+def calculate_all_edam_term_statistics(tools: Iterable[dict], index_lists: Dict[str, Union[dict, EdamIndex]],
+                                       upper_time_limit: datetime = datetime.today(), output_ids: bool = False,
+                                       cleaning: str = "copy", max_workers: Optional[int] = None,
+                                       profiler: Optional[StageProfiler] = None) -> dict:
+    """
+    Calculate the statistics for several EDAM term types, cleaning and walking every tool only once.
 
-    term_type = term_type.lower()
+    :param tools: The tool list. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
+    :param index_lists: The index list (or compiled EdamIndex) for every term type to calculate statistics for,
+        e.g. {"topic": ..., "operation": ..., "format": ..., "data": ...}.
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+        Default: datetime.datetime.today().
+    :param output_ids: Indicate whether the ids should be in the output. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :param max_workers: The number of threads compiling the indexes and creating the statistics of the term types
+        concurrently. Default: None (no threads).
+    :param profiler: The profiler recording the time of the stages of the calculation. Default: None (no timing).
+    :return: The dictionary with the date and, for every term type, the terms with the IDs and counts for strict
+        (Only the specific term) and total (for parent terms).
+    """
+    profiler = profiler or DISABLED_PROFILER
+    term_types: List[str] = validate_term_types(term_types=list(index_lists))
+    with profiler.stage(name="compile_indexes") as stage:
+        indexes: List[EdamIndex] = _map(function=compile_index, items=list(index_lists.values()),
+                                        max_workers=max_workers)
+        stage.items += len(indexes)
+    tool_sets: List[TermToolSets] = [TermToolSets() for _ in term_types]
+
+    tools = profiler.iterate(name="clean_and_filter_tools",
+                             iterable=iter_clean_and_filter_tools(raw_tools=tools, upper_time_limit=upper_time_limit,
+                                                                  cleaning=cleaning))
+    with profiler.stage(name="add_terms") as stage:
+        add_tool_terms(tools=tools, term_types=term_types, tool_sets=tool_sets, indexes=indexes)
+        stage.items += len(tool_sets[0].tool_ids) if tool_sets else 0
+
+    with profiler.stage(name="create_statistics") as stage:
+        stage.items += sum(len(term_tool_sets.term_ids) for term_tool_sets in tool_sets)
+        return create_statistics(date=upper_time_limit, term_types=term_types, tool_sets=tool_sets,
+                                 indexes=indexes, output_ids=output_ids, max_workers=max_workers)
+
+
+def update_edam_term_statistics(statistics: dict, index_lists: Dict[str, Union[dict, EdamIndex]],
+                                added: Iterable[dict] = (), removed: Iterable[dict] = (),
+                                modified: Iterable[Tuple[dict, dict]] = (), upper_time_limit: Optional[datetime] = None,
+                                cleaning: str = "copy", max_workers: Optional[int] = None) -> dict:
+    """
+    Update already calculated EDAM term statistics with the tools that changed since, instead of recalculating them.
+
+    The previous statistics must contain the IDs (output_ids=True), since the tool sets of the terms are the state.
+    The removed tools (and the old versions of the modified tools) are removed from all tool sets, and the added
+    tools (and the new versions of the modified tools) are added. The result is identical to
+    calculate_all_edam_term_statistics with output_ids=True on the changed tool list, except that the IDs are in the
+    order the tools were added to the statistics.
+
+    :param statistics: The previous statistics (from calculate_edam_term_statistics or
+        calculate_all_edam_term_statistics), e.g. loaded from a JSON file.
+    :param index_lists: The index list (or compiled EdamIndex) for every term type in the statistics.
+    :param added: The tools added since the previous statistics.
+    :param removed: The tools removed since the previous statistics.
+    :param modified: The (old version, new version) pairs of the tools modified since the previous statistics.
+    :param upper_time_limit: The new upper time limit. All tools added before it, but not before the previous
+        time limit, must be in the added tools. Default: The time limit of the previous statistics.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :param max_workers: The number of threads compiling the indexes and creating the statistics of the term types
+        concurrently. Default: None (no threads).
+    :return: The dictionary with the date and the updated statistics (with the IDs) for every term type.
+    """
+    upper_time_limit = upper_time_limit or statistics_time_limit(statistics=statistics)
+    modified = list(modified)
 
-    tool_terms: dict = _extract_terms(tools=tools, term_type=term_type)
-    # Loop over the tools and the topics
-    for toolID in tool_terms:
-        for term in tool_terms[toolID]:
-            statistics = _add_terms(stats=temp_statistics, term=term, tool_id=toolID, index_list=index_list)
+    term_types: List[str] = validate_term_types(term_types=list(index_lists))
+    indexes: List[EdamIndex] = _map(function=compile_index, items=list(index_lists.values()),
+                                    max_workers=max_workers)
 
-    # Create the final statistics dict
-    statistics: dict = {}
-    statistics["date"] = upper_time_limit.isoformat(timespec="seconds")
-    statistics[term_type]: defaultdict = defaultdict(
-        lambda: {"name": "", "depth": -1,
-                 "strict_ids": [], "total_ids": [],
-                 "strict_count": 0, "total_count": 0})
-
-    # Loop over the statistics
-    for term_id in temp_statistics:
-        statistics[term_type][term_id]["name"] = temp_statistics[term_id]["name"]
-        statistics[term_type][term_id]["depth"] = temp_statistics[term_id]["depth"]
-        statistics[term_type][term_id]["total_count"] = len(temp_statistics[term_id]["total_ids"])
-        statistics[term_type][term_id]["strict_count"] = len(temp_statistics[term_id]["strict_ids"])
+    # A tool is in the statistics under its ID only, so removing the ID removes the whole contribution of the tool
+    removed_ids: Set[str] = {tool["biotoolsID"] for tool in list(removed) + [old_tool for old_tool, _ in modified]}
+    tool_sets: List[TermToolSets] = [_load_term_tool_sets(term_statistics=statistics[term_type],
+                                                          removed_ids=removed_ids)
+                                     for term_type in term_types]
 
-        if output_ids:
-            statistics[term_type][term_id]["total_ids"] = list(temp_statistics[term_id]["total_ids"])
-            statistics[term_type][term_id]["strict_ids"] = list(temp_statistics[term_id]["strict_ids"])
+    new_tools: List[dict] = list(added) + [new_tool for _, new_tool in modified]
+    tools = iter_clean_and_filter_tools(raw_tools=new_tools, upper_time_limit=upper_time_limit, cleaning=cleaning)
+    add_tool_terms(tools=tools, term_types=term_types, tool_sets=tool_sets, indexes=indexes)
 
-    return statistics
+    return create_statistics(date=upper_time_limit, term_types=term_types, tool_sets=tool_sets, indexes=indexes,
+                             output_ids=True, max_workers=max_workers)
 
 
-def _add_terms(stats: dict, term: dict, tool_id: str, index_list: dict) -> dict:
+def validate_term_types(term_types: List[str]) -> List[str]:
     """
-    Add term to the statistics.
+    Check the term types.
 
-    :param stats: The statistics dictionary.
-    :param term: The EDAM term.
-    :param tool_id: The bio.tools ID.
-    :param index_list: The index list.
-    :return: The statistics dictionary.
+    :param term_types: The term types.
+    :return: The lower case term types.
     """
-    # Get the term id
-    term_id = term["uri"].replace("http://edamontology.org/", "")
-    # Add to the id lists
-    stats[term_id]["strict_ids"].add(tool_id)
-    stats[term_id]["total_ids"].add(tool_id)
+    term_types = [term_type.lower() for term_type in term_types]
+    for term_type in term_types:
+        if term_type not in TERM_TYPES:
+            raise ValueError(f"The term type '{term_type}' is not valid. Must be 'Topic', 'Operation', 'Format', or"
+                             f"'Data'.")
+    return term_types
 
-    # Add topic name and depth if not added
-    stats = _add_term_info(stats=stats, term_id=term_id, index_list=index_list)
 
-    # Go through the branches
-    for branch_term in _get_branch_terms(term_id=term_id, term_index=index_list):
-        # Add topic name and depth if not added
-        stats = _add_term_info(stats=stats, term_id=branch_term, index_list=index_list)
-        stats[branch_term]["total_ids"].add(tool_id)
-
-    return stats
-
-
-def _get_branch_terms(term_id: str, term_index: dict) -> list:
+def add_tool_terms(tools: Iterable[dict], term_types: List[str], tool_sets: List[TermToolSets],
+                   indexes: List[EdamIndex]):
     """
-    Get the branch terms.
+    Add the terms of the tools to the tool sets of every term type.
 
-    :param term_id: The term ID.
-    :param term_index: The term index list.
-    :return: The list of branch terms.
+    :param tools: The cleaned tools.
+    :param term_types: The term types.
+    :param tool_sets: The tool sets of every term type.
+    :param indexes: The compiled EDAM index of every term type.
     """
-    terms: list = []
-    if term_id in term_index:
-        for branch in term_index[term_id]["path"]:
-            terms.extend(branch["key"].split("||"))
-    return terms
+    # Loop over the tools and their terms
+    for tool in tools:
+        tool_terms: Dict[str, List[str]] = extract_tool_terms(tool=tool, slots=SLOTS)
+        for term_type, term_tool_sets, index in zip(term_types, tool_sets, indexes):
+            tool_code: int = term_tool_sets.tool_code(tool_id=tool["biotoolsID"])
+            for term_id in tool_terms[term_type]:
+                _add_terms(tool_sets=term_tool_sets, term_id=term_id, tool_code=tool_code, index=index)
 
 
-def _add_term_info(stats: dict, term_id: str, index_list: dict) -> dict:
+def create_statistics(date: datetime, term_types: List[str], tool_sets: List[TermToolSets],
+                      indexes: List[EdamIndex], output_ids: bool, max_workers: Optional[int]) -> dict:
     """
-    Add term information, if none exists.
-
-    :param stats: The statistics dictionary.
-    :param term_id: The EDAM term.
-    :param index_list: The index list.
-    :return: The statistics dictionary.
+    Create the final statistics dict.
+
+    :param date: The upper time limit.
+    :param term_types: The term types.
+    :param tool_sets: The tool sets of every term type.
+    :param indexes: The compiled EDAM index of every term type.
+    :param output_ids: Indicate whether the ids should be in the output.
+    :param max_workers: The number of threads creating the statistics of the term types concurrently.
+    :return: The dictionary with the date and the statistics for every term type.
     """
-    if term_id in index_list:
-        if stats[term_id]["name"] == "":
-            stats[term_id]["name"] = index_list[term_id]["name"]
-
-            # Calculate the term depth
-            path_depths: list = []
-            for path in index_list[term_id]["path"]:
-                path_depths.append(len(path["key"].split("||")))
-            stats[term_id]["depth"] = min(path_depths) - 1  # Ensure topic is depth 0 = Root
+    statistics: dict = {}
+    statistics["date"] = date.isoformat(timespec="seconds")
+    # The exact time limit, for updating the statistics
+    statistics["timestamp"] = to_timestamp(date=date)
+    term_statistics: List[defaultdict] = _map(
+        function=lambda item: _create_term_statistics(tool_sets=item[0], index=item[1], output_ids=output_ids),
+        items=list(zip(tool_sets, indexes)), max_workers=max_workers)
+    for term_type, statistic in zip(term_types, term_statistics):
+        statistics[term_type] = statistic
 
-    return stats
+    return statistics
 
 
-def _extract_terms(tools: list, term_type: str) -> dict:
+def _load_term_tool_sets(term_statistics: dict, removed_ids: Set[str]) -> TermToolSets:
     """
-    Extract terms from the tools.
+    Load the tool sets of the terms from the statistics of one term type.
 
-    :param tools: The list of tools.
-    :param term_type: The term type.
-    :return: The dictionary with the tool ID and the terms.
+    :param term_statistics: The statistics of the terms, with the IDs.
+    :param removed_ids: The IDs of the tools to leave out.
+    :return: The tool sets.
     """
-    term_type = term_type.capitalize()
-
-    if term_type == "Topic":
-        return _extract_edam_topics(tools=tools)
-    elif term_type == "Operation":
-        return _extract_edam_operation(tools=tools)
-    elif term_type == "Format":
-        return _extract_edam_format(tools=tools)
-    elif term_type == "Data":
-        return _extract_edam_data(tools=tools)
-    else:
-        raise ValueError(f"The term type '{term_type}' is not valid. Must be 'Topic', 'Operation', 'Format', or"
-                         f"'Data'.")
-
-
-def _extract_edam_topics(tools: list) -> dict:
+    tool_sets: TermToolSets = TermToolSets()
+    for term_id, term_statistic in term_statistics.items():
+        if term_statistic["total_count"] != len(term_statistic["total_ids"]):
+            raise ValueError("The statistics must contain the IDs. Calculate them with output_ids=True.")
+        for tool_id in term_statistic["strict_ids"]:
+            if tool_id not in removed_ids:
+                tool_sets.add_strict(term_code=tool_sets.term_code(term_id=term_id),
+                                     tool_code=tool_sets.tool_code(tool_id=tool_id))
+        for tool_id in term_statistic["total_ids"]:
+            if tool_id not in removed_ids:
+                tool_sets.add_total(term_code=tool_sets.term_code(term_id=term_id),
+                                    tool_code=tool_sets.tool_code(tool_id=tool_id))
+    return tool_sets
+
+
+def compile_index(index_list: Union[dict, EdamIndex]) -> EdamIndex:
     """
-    Get the EDAM topics for each tool.
+    Compile the index list, unless it is already compiled.
 
-    :param tools: The list of tools.
-    :return: The dictionary with the tool id and the topics.
+    :param index_list: The index list or the compiled index.
+    :return: The compiled index.
     """
-    terms: defaultdict = defaultdict(lambda: [])
-
-    for tool in tools:
-        terms[tool["biotoolsID"]].extend([topic for topic in tool["topic"]])
-
-    return terms
+    return index_list if isinstance(index_list, EdamIndex) else EdamIndex.from_index_list(index_list)
 
 
-def _extract_edam_operation(tools: list) -> dict:
+def _map(function, items: list, max_workers: Optional[int]) -> list:
     """
-    Get the EDAM operation for each tool.
+    Apply a function to the items, concurrently if more than one worker is used.
 
-    :param tools: The list of tools.
-    :return: The dictionary with the tool id and the operations.
+    :param function: The function.
+    :param items: The items.
+    :param max_workers: The number of threads, or None for no threads.
+    :return: The results, in the order of the items.
     """
-    terms: defaultdict = defaultdict(lambda: [])
-
-    for tool in tools:
-        terms[tool["biotoolsID"]].extend(*[function["operation"] for function in tool["function"]])
-
-    return terms
+    if max_workers is None or max_workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, items))
 
 
-def _extract_edam_format(tools: list) -> dict:
+def _create_term_statistics(tool_sets: TermToolSets, index: EdamIndex, output_ids: bool) -> defaultdict:
     """
-    Get the EDAM format for each tool.
+    Create the statistics of the terms of one term type.
 
-    :param tools: The list of tools.
-    :return: The dictionary with the tool id and the formats.
+    :param tool_sets: The tool sets of the terms.
+    :param index: The compiled EDAM index.
+    :param output_ids: Indicate whether the ids should be in the output.
+    :return: The dictionary with the term IDs and their statistics.
     """
-    terms: defaultdict = defaultdict(lambda: [])
+    strict_bits, total_bits = tool_sets.bitmaps()
+    strict_counts, total_counts = tool_sets.counts(bits=strict_bits), tool_sets.counts(bits=total_bits)
 
-    for tool in tools:
-        terms[tool["biotoolsID"]].extend(itertools.chain(*_get_inputs_outputs_info(tool=tool, term_type="format")))
-    return terms
+    statistics: defaultdict = defaultdict(
+        lambda: {"name": "", "depth": -1,
+                 "strict_ids": [], "total_ids": [],
+                 "strict_count": 0, "total_count": 0})
 
+    # Loop over the statistics
+    for term_id, row in tool_sets.term_ids.items():
+        code: Optional[int] = index.code(term_id)
+        if code is not None:
+            statistics[term_id]["name"] = index.names[code]
+            statistics[term_id]["depth"] = int(index.depths[code])
+        statistics[term_id]["total_count"] = int(total_counts[row])
+        statistics[term_id]["strict_count"] = int(strict_counts[row])
 
-def _extract_edam_data(tools: list) -> dict:
-    """
-    Get the EDAM data for each tool.
+        if output_ids:
+            statistics[term_id]["total_ids"] = tool_sets.decode(row=total_bits[row])
+            statistics[term_id]["strict_ids"] = tool_sets.decode(row=strict_bits[row])
 
-    :param tools: The list of tools.
-    :return: The dictionary with the tool id and the topics.
-    """
-    terms: defaultdict = defaultdict(lambda: [])
-    for tool in tools:
-        terms[tool["biotoolsID"]].extend(_get_inputs_outputs_info(tool=tool, term_type="data"))
-    return terms
+    return statistics
 
 
-def _get_inputs_outputs_info(tool: dict, term_type: str) -> list:
+def _add_terms(tool_sets: TermToolSets, term_id: str, tool_code: int, index: EdamIndex):
     """
-    Get the inputs and outputs for a tool.
+    Add term to the statistics.
 
-    :param tool: The tool dict.
-    :param term_type: The term type.
-    :return: The list with the specific terms.
+    :param tool_sets: The tool sets of the terms.
+    :param term_id: The ID of the EDAM term.
+    :param tool_code: The code of the tool in the tool sets.
+    :param index: The compiled EDAM index.
     """
-    terms: list = []
+    # Add to the id sets
+    tool_sets.add_strict(term_code=tool_sets.term_code(term_id=term_id), tool_code=tool_code)
 
-    for function in tool["function"]:
-        if "input" in function:
-            for i in function["input"]:
-                if term_type in i:
-                    terms.append(i[term_type])
-        if "output" in function:
-            for o in function["output"]:
-                if term_type in o:
-                    terms.append(o[term_type])
+    # Go through the branches
+    code: Optional[int] = index.code(term_id)
+    if code is not None:
+        for branch_code in index.ancestors(code):
+            tool_sets.add_total(term_code=tool_sets.term_code(term_id=index.term_ids[branch_code]),
+                                tool_code=tool_code)
 
-    return list(terms)
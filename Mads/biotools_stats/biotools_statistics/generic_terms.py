@@ -0,0 +1,62 @@
+"""
+Finding the uses of too generic EDAM terms (e.g. data_0006 "Data") in the annotations of the tools.
+
+All generic terms are found in a single pass over the tools: every annotated term is looked up in the set of the
+generic terms, so checking many terms costs no more than checking one. The terms are read with iter_term_uses, like
+in the statistics and the term index, which skips the empty values, so the raw tools do not need to be cleaned
+(copied) first.
+
+    rows = find_generic_terms(tools=load_tools("biotools.json"), generic_terms=["data_0006", "format_1915"])
+    # The inputs and outputs with the generic data_0006, but with a format
+    [row for row in rows if row["slot"].endswith("_data") and row["hasFormat"]]
+"""
+from typing import Iterable, List, Set, Tuple, Union
+
+from ._utilities import TermUse, iter_term_uses, term_id
+
+# The roots of the EDAM sub-ontologies, the most generic terms
+ROOT_TERMS: List[str] = ["topic_0003", "operation_0004", "data_0006", "format_1915"]
+
+
+def find_generic_terms(tools: Iterable[dict],
+                       generic_terms: Union[str, Iterable[str]] = tuple(ROOT_TERMS)) -> List[dict]:
+    """
+    Find where the tools use generic EDAM terms, as topics, operations, or the data or formats of the inputs and
+    outputs of their functions.
+
+    :param tools: The raw (or cleaned) tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool
+        at a time.
+    :param generic_terms: The term ID (e.g. "data_0006") or URI, or several. Default: ROOT_TERMS.
+    :return: A row for every use of a generic term, in the order of the tools: the biotoolsID, the function (its
+        position in the tool, None for topics), the slot ("topic", "operation", "input_data", "input_format",
+        "output_data" or "output_format", see _utilities.SLOTS), the io (the position of the input or output in the
+        function, None otherwise), the term ID, and hasFormat (whether the input or output has formats, None for
+        topics and operations).
+    """
+    generic: Set[str] = {term_id(term=term)
+                         for term in ([generic_terms] if isinstance(generic_terms, str) else generic_terms)}
+    rows: List[dict] = []
+
+    for tool in tools:
+        if not tool:
+            continue
+        uses: List[TermUse] = list(iter_term_uses(tool=tool))
+        if not any(use.term_id in generic for use in uses):
+            continue
+        formatted_ios: Set[Tuple[int, str, int]] = {_io_key(use=use) for use in uses if use.slot.endswith("_format")}
+        for use in uses:
+            if use.term_id in generic:
+                rows.append({"biotoolsID": tool.get("biotoolsID"), "function": use.function, "slot": use.slot,
+                             "io": use.io, "term": use.term_id,
+                             "hasFormat": None if use.io is None else _io_key(use=use) in formatted_ios})
+    return rows
+
+
+def _io_key(use: TermUse) -> Tuple[int, str, int]:
+    """
+    Identify the input or output of a term use.
+
+    :param use: The use of a term in an input or output.
+    :return: The position of the function, the io type ("input" or "output") and the position of the io.
+    """
+    return use.function, use.slot.split("_", 1)[0], use.io
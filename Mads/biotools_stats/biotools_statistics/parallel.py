@@ -0,0 +1,185 @@
+"""
+Calculating the statistics of shards of the tools (e.g. the files of a large dump) in separate processes.
+
+Every process counts its shard into a partial aggregate, and the partial aggregates are merged: the counters of the
+general statistics are added, the tool sets of the EDAM terms are combined as unions, and the annotation quality rows
+are concatenated. The partial aggregates are merged in the order of the shards, so the results are identical to
+calculating the statistics of the concatenated shards in a single process.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from ._utilities import iter_clean_and_filter_tools
+from ._spdx_license_parser import parse_license_list, LicensesData
+from ._term_tool_sets import TermToolSets
+from .edam_index import EdamIndex
+from .edam_stats import add_tool_terms, compile_index, create_statistics, validate_term_types
+from .quality import aggregate_annotation_quality, compile_specificities, score_tools
+from .stats import GeneralStatisticsAggregator
+from .tool_loader import load_tools
+
+# A shard is the path to a file with tools (see load_tools), or the tools themselves
+Shard = Union[str, Iterable[dict]]
+
+
+def calculate_general_statistics_parallel(shards: List[Shard], upper_time_limit: datetime = datetime.today(),
+                                          offline: bool = False, cleaning: str = "copy",
+                                          max_workers: Optional[int] = None) -> dict:
+    """
+    Calculate the general statistics of shards of the tools in separate processes.
+
+    :param shards: The shards, as paths to files with tools (read by the processes themselves, which is the fastest)
+        or as lists of tools (which are sent to the processes).
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+        Default: datetime.datetime.today()
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none" (the tools are already clean).
+        Default: "copy".
+    :param max_workers: The number of processes. 1 calculates the shards in this process. Default: None (the number
+        of CPUs).
+    :return: The dictionary with the statistics, identical to calculate_general_statistics on all tools.
+    """
+    # The license list is parsed once and sent to the processes
+    license_info: LicensesData = parse_license_list(offline=offline)
+    aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
+
+    for shard_aggregator in _map_shards(function=partial(_count_general_shard, upper_time_limit=upper_time_limit,
+                                                         license_info=license_info, cleaning=cleaning),
+                                        shards=shards, max_workers=max_workers):
+        aggregator.merge(other=shard_aggregator)
+
+    return aggregator.to_dict(date=upper_time_limit)
+
+
+def calculate_all_edam_term_statistics_parallel(shards: List[Shard], index_lists: Dict[str, Union[dict, EdamIndex]],
+                                                upper_time_limit: datetime = datetime.today(),
+                                                output_ids: bool = False, cleaning: str = "copy",
+                                                max_workers: Optional[int] = None) -> dict:
+    """
+    Calculate the statistics for several EDAM term types of shards of the tools in separate processes.
+
+    :param shards: The shards, as paths to files with tools (read by the processes themselves, which is the fastest)
+        or as lists of tools (which are sent to the processes).
+    :param index_lists: The index list (or compiled EdamIndex) for every term type to calculate statistics for.
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+        Default: datetime.datetime.today().
+    :param output_ids: Indicate whether the ids should be in the output. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none" (the tools are already clean).
+        Default: "copy".
+    :param max_workers: The number of processes. 1 calculates the shards in this process. Default: None (the number
+        of CPUs).
+    :return: The dictionary with the date and the statistics of every term type, identical to
+        calculate_all_edam_term_statistics on all tools.
+    """
+    term_types: List[str] = validate_term_types(term_types=list(index_lists))
+    indexes: List[EdamIndex] = [compile_index(index_list=index_list) for index_list in index_lists.values()]
+    tool_sets: List[TermToolSets] = [TermToolSets() for _ in term_types]
+
+    for shard_tool_sets in _map_shards(function=partial(_count_edam_shard, term_types=term_types, indexes=indexes,
+                                                        upper_time_limit=upper_time_limit, cleaning=cleaning),
+                                       shards=shards, max_workers=max_workers):
+        for term_tool_sets, shard_term_tool_sets in zip(tool_sets, shard_tool_sets):
+            term_tool_sets.merge(other=shard_term_tool_sets)
+
+    return create_statistics(date=upper_time_limit, term_types=term_types, tool_sets=tool_sets, indexes=indexes,
+                             output_ids=output_ids, max_workers=None)
+
+
+def calculate_annotation_quality_parallel(shards: List[Shard], index_lists: Dict[str, Union[dict, EdamIndex]],
+                                          cleaning: str = "copy", max_workers: Optional[int] = None) -> dict:
+    """
+    Score the annotations of shards of the tools in separate processes.
+
+    :param shards: The shards, as paths to files with tools (read by the processes themselves, which is the fastest)
+        or as lists of tools (which are sent to the processes).
+    :param index_lists: The index list (or compiled EdamIndex) of every term type ("topic", "operation", "format"
+        and "data").
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none" (the tools are already clean).
+        Default: "copy".
+    :param max_workers: The number of processes. 1 scores the shards in this process. Default: None (the number of
+        CPUs).
+    :return: The dictionary with the scores, identical to calculate_annotation_quality on all tools.
+    """
+    # The specificities are calculated once and sent to the processes
+    specificities: Dict[str, Dict[str, float]] = compile_specificities(index_lists=index_lists)
+    rows: List[dict] = []
+    for shard_rows in _map_shards(function=partial(_score_shard, specificities=specificities, cleaning=cleaning),
+                                  shards=shards, max_workers=max_workers):
+        rows.extend(shard_rows)
+    return aggregate_annotation_quality(rows=rows)
+
+
+def _map_shards(function: Callable[[Shard], object], shards: List[Shard], max_workers: Optional[int]) -> Iterator:
+    """
+    Apply a function to the shards, in separate processes unless only one worker is used.
+
+    :param function: The function.
+    :param shards: The shards.
+    :param max_workers: The number of processes, or None for the number of CPUs.
+    :return: The iterator of the results, in the order of the shards.
+    """
+    if (max_workers is not None and max_workers <= 1) or len(shards) <= 1:
+        yield from map(function, shards)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(function, shards)
+
+
+def _iter_shard(shard: Shard) -> Iterable[dict]:
+    """
+    Get the tools of a shard.
+
+    :param shard: The path to the file with the tools, or the tools.
+    :return: The tools.
+    """
+    return load_tools(shard) if isinstance(shard, str) else shard
+
+
+def _count_general_shard(shard: Shard, upper_time_limit: datetime, license_info: LicensesData,
+                         cleaning: str) -> GeneralStatisticsAggregator:
+    """
+    Count the general statistics of a shard.
+
+    :param shard: The shard.
+    :param upper_time_limit: The upper time limit.
+    :param license_info: The license data.
+    :param cleaning: The cleaning mode.
+    :return: The partial aggregate of the shard.
+    """
+    aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
+    aggregator.add_tools(tools=iter_clean_and_filter_tools(raw_tools=_iter_shard(shard=shard),
+                                                           upper_time_limit=upper_time_limit, cleaning=cleaning))
+    return aggregator
+
+
+def _count_edam_shard(shard: Shard, term_types: List[str], indexes: List[EdamIndex], upper_time_limit: datetime,
+                      cleaning: str) -> List[TermToolSets]:
+    """
+    Collect the EDAM term tool sets of a shard.
+
+    :param shard: The shard.
+    :param term_types: The term types.
+    :param indexes: The compiled EDAM index of every term type.
+    :param upper_time_limit: The upper time limit.
+    :param cleaning: The cleaning mode.
+    :return: The partial tool sets of every term type.
+    """
+    tool_sets: List[TermToolSets] = [TermToolSets() for _ in term_types]
+    add_tool_terms(tools=iter_clean_and_filter_tools(raw_tools=_iter_shard(shard=shard),
+                                                     upper_time_limit=upper_time_limit, cleaning=cleaning),
+                   term_types=term_types, tool_sets=tool_sets, indexes=indexes)
+    return tool_sets
+
+
+def _score_shard(shard: Shard, specificities: Dict[str, Dict[str, float]], cleaning: str) -> List[dict]:
+    """
+    Score the annotations of the tools of a shard.
+
+    :param shard: The shard.
+    :param specificities: The specificity of the terms.
+    :param cleaning: The cleaning mode.
+    :return: The rows of the tools of the shard.
+    """
+    return score_tools(tools=_iter_shard(shard=shard), specificities=specificities, cleaning=cleaning)
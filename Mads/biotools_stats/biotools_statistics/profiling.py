@@ -0,0 +1,131 @@
+"""
+Optional timing of the stages of a statistics run (cleaning the tools, parsing the license list, counting, ...).
+
+A StageProfiler is given to the statistics functions as the profiler argument. The time of a stage excludes the
+time of the stages running inside it, so the time spent cleaning the tools lazily while they are counted is
+reported under the cleaning, not the counting. Without a profiler, the stages are not timed at all.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional
+
+
+class StageRecord:
+    """
+    The wall time, calls and processed items of a stage.
+    """
+    __slots__ = ("name", "seconds", "calls", "items")
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.seconds: float = 0.0
+        self.calls: int = 0
+        self.items: int = 0
+
+
+class StageProfiler:
+    """
+    Profiler recording the stages of statistics runs. The same profiler can be used for several runs, the stages
+    with the same name are added up.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float, int], None]] = None):
+        """
+        Create an empty profiler.
+
+        :param callback: The function called with the name, the seconds and the items every time a stage finishes.
+            Default: None.
+        """
+        self.callback: Optional[Callable[[str, float, int], None]] = callback
+        self._records: Dict[str, StageRecord] = {}
+        # The time spent in the inner stages of every running stage
+        self._inner_seconds: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+        Time a stage.
+
+        :param name: The name of the stage.
+        :return: The context manager giving the record of the stage, for adding the number of processed items.
+        """
+        record: StageRecord = self._record(name=name)
+        seconds: float = record.seconds
+        items: int = record.items
+        self._inner_seconds.append(0.0)
+        start: float = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._finish(record=record, seconds=time.perf_counter() - start)
+            record.calls += 1
+            if self.callback is not None:
+                self.callback(name, record.seconds - seconds, record.items - items)
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Time the production of the items of a (lazy) iterable, e.g. the cleaning of the tools.
+
+        :param name: The name of the stage.
+        :param iterable: The iterable.
+        :return: The iterator yielding the same items.
+        """
+        record: StageRecord = self._record(name=name)
+        record.calls += 1
+        iterator: Iterator = iter(iterable)
+        seconds: float = record.seconds
+        items: int = record.items
+        while True:
+            self._inner_seconds.append(0.0)
+            start: float = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                self._finish(record=record, seconds=time.perf_counter() - start)
+            record.items += 1
+            yield item
+        if self.callback is not None:
+            self.callback(name, record.seconds - seconds, record.items - items)
+
+    def report(self) -> dict:
+        """
+        Create the report of the stages.
+
+        :return: The dictionary with the total seconds and the seconds, calls and items of every stage, in the
+            order the stages first ran.
+        """
+        return {"total_seconds": sum(record.seconds for record in self._records.values()),
+                "stages": {name: {"seconds": record.seconds, "calls": record.calls, "items": record.items}
+                           for name, record in self._records.items()}}
+
+    def _record(self, name: str) -> StageRecord:
+        if name not in self._records:
+            self._records[name] = StageRecord(name=name)
+        return self._records[name]
+
+    def _finish(self, record: StageRecord, seconds: float):
+        """
+        Add the time of a finished stage, without the time of its inner stages, and add it to the outer stage.
+        """
+        record.seconds += seconds - self._inner_seconds.pop()
+        if self._inner_seconds:
+            self._inner_seconds[-1] += seconds
+
+
+class _DisabledProfiler:
+    """
+    The profiler used when no profiler is given, which does not time anything.
+    """
+
+    @staticmethod
+    def stage(name: str) -> ContextManager[StageRecord]:
+        return nullcontext(StageRecord(name=name))
+
+    @staticmethod
+    def iterate(name: str, iterable: Iterable) -> Iterable:
+        return iterable
+
+
+DISABLED_PROFILER: _DisabledProfiler = _DisabledProfiler()
@@ -0,0 +1,193 @@
+"""
+Scoring the quality of the EDAM annotations of the tools.
+
+Like the annotation quality evaluation in JavaVedran/biotoolsAnnotations, the quality is measured by how specific the
+terms are, relative to where they are in the EDAM hierarchy. The specificity of a term is its depth divided by the
+length of the longest path through it from the root to a leaf: 1 for the leaves, 0 for the roots (e.g. the generic
+data_0006 "Data"). Every tool gets the components, which are 0 if the annotation is missing:
+- topicSpecificity: the mean specificity of the topics,
+- operationSpecificity: the mean specificity of the operations,
+- ioCompleteness: the fraction of the functions with both inputs and outputs,
+- dataSpecificity: the mean specificity of the data of the inputs and outputs,
+- formatSpecificity: the mean specificity of the most specific format of every input and output (0 without formats).
+The score is the mean of the components. The terms that are not in the EDAM index are left out.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from ._utilities import SLOTS, iter_clean_tools, iter_term_uses
+from .edam_index import EdamIndex
+from .edam_stats import compile_index
+
+COMPONENTS: List[str] = ["topicSpecificity", "operationSpecificity", "ioCompleteness", "dataSpecificity",
+                         "formatSpecificity"]
+# The counts of every tool, which are summed for the collections
+COUNTS: List[str] = ["functionCount", "inputCount", "outputCount", "missingFormatCount", "genericDataCount",
+                     "unknownTermCount"]
+GENERIC_DATA: str = "data_0006"
+_TERM_TYPES: List[str] = ["topic", "operation", "data", "format"]
+
+
+def calculate_annotation_quality(tools: Iterable[dict], index_lists: Dict[str, Union[dict, EdamIndex]],
+                                 cleaning: str = "copy") -> dict:
+    """
+    Score the annotations of the tools.
+
+    :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
+    :param index_lists: The index list (or compiled EdamIndex) of every term type ("topic", "operation", "format"
+        and "data").
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :return: The dictionary with the score table ("tools": a row for every tool, in the order of the tools), the
+        aggregates of every collection ("collections", sorted) and of all tools ("total").
+    """
+    return aggregate_annotation_quality(rows=score_tools(tools=tools, specificities=compile_specificities(
+        index_lists=index_lists), cleaning=cleaning))
+
+
+def compile_specificities(index_lists: Dict[str, Union[dict, EdamIndex]]) -> Dict[str, Dict[str, float]]:
+    """
+    Calculate the specificity of the terms of every term type.
+
+    :param index_lists: The index list (or compiled EdamIndex) of every term type ("topic", "operation", "format"
+        and "data").
+    :return: The specificity of every term ID, for every term type.
+    """
+    specificities: Dict[str, Dict[str, float]] = {}
+    for term_type, index_list in index_lists.items():
+        if term_type.lower() not in _TERM_TYPES:
+            raise ValueError(f"The term type '{term_type}' is not valid. Must be one of {', '.join(_TERM_TYPES)}.")
+        index: EdamIndex = compile_index(index_list=index_list)
+        specificities[term_type.lower()] = dict(zip(index.term_ids, _specificity(index=index).tolist()))
+    missing: List[str] = [term_type for term_type in _TERM_TYPES if term_type not in specificities]
+    if missing:
+        raise ValueError(f"The index lists of {', '.join(missing)} are missing.")
+    return specificities
+
+
+def score_tools(tools: Iterable[dict], specificities: Dict[str, Dict[str, float]],
+                cleaning: str = "copy") -> List[dict]:
+    """
+    Score the annotations of the tools, without aggregating them.
+
+    :param tools: The list of tools.
+    :param specificities: The specificity of the terms (see compile_specificities).
+    :param cleaning: How to clean the tools. "copy", "in_place" or "none". Default: "copy".
+    :return: The row of every tool.
+    """
+    return [_score_tool(tool=tool, specificities=specificities)
+            for tool in iter_clean_tools(raw_tools=tools, cleaning=cleaning)]
+
+
+def aggregate_annotation_quality(rows: List[dict]) -> dict:
+    """
+    Aggregate the scores of the tools for every collection and for all tools.
+
+    :param rows: The rows of the tools (see score_tools).
+    :return: The dictionary with the rows ("tools") and the aggregates ("collections" and "total").
+    """
+    collection_rows: Dict[str, List[dict]] = {}
+    for row in rows:
+        for collection in dict.fromkeys(row["collectionID"]):
+            collection_rows.setdefault(collection, []).append(row)
+    return {"tools": rows,
+            "collections": {collection: _aggregate(rows=collection_rows[collection])
+                            for collection in sorted(collection_rows)},
+            "total": _aggregate(rows=rows)}
+
+
+def _score_tool(tool: dict, specificities: Dict[str, Dict[str, float]]) -> dict:
+    """
+    Score the annotation of a tool.
+
+    :param tool: The cleaned tool.
+    :param specificities: The specificity of the terms.
+    :return: The row of the tool.
+    """
+    row: dict = {"biotoolsID": tool["biotoolsID"], "collectionID": list(tool.get("collectionID", []))}
+    row.update(dict.fromkeys(COUNTS, 0))
+    row["functionCount"] = len(tool.get("function", []))
+    values: Dict[str, List[float]] = {"topic": [], "operation": [], "data": [], "format": []}
+    # The specificities of the formats of every input and output, by function, io type and position
+    io_formats: Dict[Tuple[int, str, int], List[float]] = {}
+    formatted_ios: Set[Tuple[int, str, int]] = set()
+
+    for use in iter_term_uses(tool=tool):
+        term_type: str = SLOTS[use.slot]
+        specificity: Optional[float] = specificities[term_type].get(use.term_id)
+        if specificity is None:
+            row["unknownTermCount"] += 1
+        if use.io is None:
+            if specificity is not None:
+                values[term_type].append(specificity)
+            continue
+        io_key: Tuple[int, str, int] = (use.function, use.slot.split("_", 1)[0], use.io)
+        format_values: List[float] = io_formats.setdefault(io_key, [])
+        if term_type == "data":
+            row["genericDataCount"] += use.term_id == GENERIC_DATA
+            if specificity is not None:
+                values["data"].append(specificity)
+        else:
+            formatted_ios.add(io_key)
+            if specificity is not None:
+                format_values.append(specificity)
+
+    for _, io_type, _ in io_formats:
+        row[f"{io_type}Count"] += 1
+    row["missingFormatCount"] = len(io_formats) - len(formatted_ios)
+    # An input or output without (known) formats counts as 0
+    values["format"] = [max(format_values, default=0.0) for format_values in io_formats.values()]
+    io_types: Dict[int, Set[str]] = {}
+    for function, io_type, _ in io_formats:
+        io_types.setdefault(function, set()).add(io_type)
+    complete_functions: int = sum(len(function_io_types) == 2 for function_io_types in io_types.values())
+
+    row["topicSpecificity"] = _mean(values=values["topic"])
+    row["operationSpecificity"] = _mean(values=values["operation"])
+    row["ioCompleteness"] = complete_functions / row["functionCount"] if row["functionCount"] else 0.0
+    row["dataSpecificity"] = _mean(values=values["data"])
+    row["formatSpecificity"] = _mean(values=values["format"])
+    row["score"] = sum(row[component] for component in COMPONENTS) / len(COMPONENTS)
+    return row
+
+
+def _aggregate(rows: List[dict]) -> dict:
+    """
+    Aggregate the rows of tools.
+
+    :param rows: The rows.
+    :return: The number of tools, the mean and the quartiles of the scores, the means of the components and the
+        sums of the counts.
+    """
+    aggregate: dict = {"toolCount": len(rows)}
+    scores: np.ndarray = np.array([row["score"] for row in rows], dtype=np.float64)
+    aggregate["meanScore"] = float(scores.mean()) if len(rows) else 0.0
+    aggregate["scoreQuartiles"] = np.percentile(scores, [25, 50, 75]).tolist() if len(rows) else [0.0, 0.0, 0.0]
+    for component in COMPONENTS:
+        aggregate[component] = float(np.mean([row[component] for row in rows])) if rows else 0.0
+    for count in COUNTS:
+        aggregate[count] = sum(row[count] for row in rows)
+    return aggregate
+
+
+def _specificity(index: EdamIndex) -> np.ndarray:
+    """
+    Calculate the specificity of the terms of an index: the depth divided by the length of the longest path from the
+    root through the term to a leaf.
+
+    :param index: The EDAM index.
+    :return: The specificity of every term, by code.
+    """
+    # The terms only occurring in the paths have the depth -1, and are treated like the roots
+    depths: np.ndarray = np.maximum(index.depths, 0).astype(np.int64)
+    # The height of a term is the largest depth difference to its descendants
+    terms: np.ndarray = np.repeat(np.arange(len(index)), np.diff(index.ancestor_offsets))
+    heights: np.ndarray = np.zeros(len(index), dtype=np.int64)
+    np.maximum.at(heights, index.ancestor_codes, np.maximum(depths[terms] - depths[index.ancestor_codes], 0))
+    lengths: np.ndarray = depths + heights
+    return np.divide(depths, lengths, out=np.zeros(len(index)), where=lengths > 0)
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
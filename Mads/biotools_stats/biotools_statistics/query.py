@@ -0,0 +1,248 @@
+"""
+A query layer for slicing a loaded dump, e.g. selecting the tools of a collection before calculating statistics.
+
+The registry indexes the tools once: a hash index from every value of the indexed fields to the positions of the
+tools, and the sorted addition dates for date ranges. The predicates are combined with & (and), | (or) and ~ (not),
+and are evaluated as boolean masks over the tools, so a query never walks the tools themselves.
+
+    registry = ToolRegistry(tools)
+    proteomics = registry.tools(field_in("collectionID", "Proteomics") & ~field_in("license", "Proprietary")
+                                & added_between(end=datetime(2021, 1, 1)))
+    calculate_general_statistics(tools=proteomics)
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from ._utilities import addition_timestamp, to_timestamp
+
+INDEXED_FIELDS: List[str] = ["biotoolsID", "collectionID", "toolType", "language", "license"]
+
+
+class ToolRegistry:
+    """
+    The loaded tools with the indexes for the queries.
+    """
+
+    def __init__(self, tools: Iterable[dict], fields: Optional[List[str]] = None):
+        """
+        Index the tools.
+
+        :param tools: The raw tools. Empty tools are left out.
+        :param fields: The fields with string values (or lists of strings) to index. The biotoolsIDs are indexed
+            case-insensitively. Default: INDEXED_FIELDS.
+        """
+        self.tools_list: List[dict] = [tool for tool in tools if tool]
+        self.fields: List[str] = list(fields or INDEXED_FIELDS)
+
+        positions: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.fields}
+        for position, tool in enumerate(self.tools_list):
+            for field in self.fields:
+                value: Union[str, List[str], None] = tool.get(field)
+                for key in ([value] if isinstance(value, str) else value or []):
+                    if key:
+                        field_key: str = key.lower() if field == "biotoolsID" else key
+                        positions[field].setdefault(field_key, []).append(position)
+        self.indexes: Dict[str, Dict[str, np.ndarray]] = {
+            field: {key: np.unique(np.array(key_positions, dtype=np.int64))
+                    for key, key_positions in field_positions.items()}
+            for field, field_positions in positions.items()}
+
+        timestamps: np.ndarray = np.fromiter((addition_timestamp(tool=tool) for tool in self.tools_list),
+                                             dtype=np.int64, count=len(self.tools_list))
+        self.date_order: np.ndarray = np.argsort(timestamps, kind="stable")
+        self.sorted_timestamps: np.ndarray = timestamps[self.date_order]
+
+    def select(self, predicate: Optional["Predicate"] = None) -> np.ndarray:
+        """
+        Select the positions of the tools matching a predicate.
+
+        :param predicate: The predicate. Default: None (all tools).
+        :return: The positions of the tools, in ascending order.
+        """
+        if predicate is None:
+            return np.arange(len(self.tools_list), dtype=np.int64)
+        return np.flatnonzero(predicate.mask(registry=self))
+
+    def tools(self, predicate: Optional["Predicate"] = None) -> Iterator[dict]:
+        """
+        Get the tools matching a predicate, e.g. for calculating their statistics.
+
+        :param predicate: The predicate. Default: None (all tools).
+        :return: The iterator of the (raw) tools, in the order of the dump.
+        """
+        return (self.tools_list[position] for position in self.select(predicate=predicate).tolist())
+
+    def ids(self, predicate: Optional["Predicate"] = None) -> np.ndarray:
+        """
+        Get the biotoolsIDs of the tools matching a predicate.
+
+        :param predicate: The predicate. Default: None (all tools).
+        :return: The array of biotoolsIDs, in the order of the dump.
+        """
+        return np.array([self.tools_list[position]["biotoolsID"]
+                         for position in self.select(predicate=predicate).tolist()], dtype=str)
+
+    def count(self, predicate: Optional["Predicate"] = None) -> int:
+        """
+        Count the tools matching a predicate.
+
+        :param predicate: The predicate. Default: None (all tools).
+        :return: The number of tools.
+        """
+        return len(self.tools_list) if predicate is None else int(np.count_nonzero(predicate.mask(registry=self)))
+
+    def values(self, field: str) -> List[str]:
+        """
+        Get the indexed values of a field, e.g. all collections.
+
+        :param field: The indexed field.
+        :return: The values, sorted.
+        """
+        return sorted(self._index(field=field))
+
+    def __len__(self) -> int:
+        return len(self.tools_list)
+
+    def _index(self, field: str) -> Dict[str, np.ndarray]:
+        if field not in self.indexes:
+            raise ValueError(f"The field '{field}' is not indexed. Must be one of {', '.join(self.fields)}.")
+        return self.indexes[field]
+
+    def _mask(self, positions: np.ndarray) -> np.ndarray:
+        mask: np.ndarray = np.zeros(len(self.tools_list), dtype=bool)
+        mask[positions] = True
+        return mask
+
+
+class Predicate(ABC):
+    """
+    A condition on the tools, which can be combined with & (and), | (or) and ~ (not).
+    """
+
+    @abstractmethod
+    def mask(self, registry: ToolRegistry) -> np.ndarray:
+        """
+        Evaluate the predicate.
+
+        :param registry: The registry.
+        :return: The boolean mask of the tools matching the predicate.
+        """
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return _Combined(predicates=[self, other], combine=np.logical_and)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return _Combined(predicates=[self, other], combine=np.logical_or)
+
+    def __invert__(self) -> "Predicate":
+        return _Not(predicate=self)
+
+
+def field_in(field: str, values: Union[str, Iterable[str]]) -> Predicate:
+    """
+    Match the tools with any of the values in a field (for list fields like collectionID: in any of the entries).
+
+    :param field: The indexed field.
+    :param values: The value, or several values. biotoolsIDs are matched case-insensitively.
+    :return: The predicate.
+    """
+    return _FieldIn(field=field, values=[values] if isinstance(values, str) else list(values))
+
+
+def added_between(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Predicate:
+    """
+    Match the tools added in a time range.
+
+    :param start: The first time of the range (inclusive). Default: None (no lower limit).
+    :param end: The end of the range (exclusive, like the upper time limit of the statistics).
+        Default: None (no upper limit).
+    :return: The predicate.
+    """
+    return _AddedBetween(start=start, end=end)
+
+
+class _FieldIn(Predicate):
+    """
+    Matches the tools with any of the values in an indexed field (see field_in).
+    """
+
+    def __init__(self, field: str, values: List[str]):
+        """
+        Create the predicate.
+
+        :param field: The indexed field.
+        :param values: The values.
+        """
+        self.field: str = field
+        self.values: List[str] = [value.lower() for value in values] if field == "biotoolsID" else values
+
+    def mask(self, registry: ToolRegistry) -> np.ndarray:
+        index: Dict[str, np.ndarray] = registry._index(field=self.field)
+        positions: List[np.ndarray] = [index[value] for value in self.values if value in index]
+        return registry._mask(positions=np.concatenate(positions) if positions else np.empty(0, dtype=np.int64))
+
+
+class _AddedBetween(Predicate):
+    """
+    Matches the tools added in a time range, with a binary search in the sorted addition dates (see added_between).
+    """
+
+    def __init__(self, start: Optional[datetime], end: Optional[datetime]):
+        """
+        Create the predicate.
+
+        :param start: The first time of the range (inclusive), or None.
+        :param end: The end of the range (exclusive), or None.
+        """
+        self.start: Optional[datetime] = start
+        self.end: Optional[datetime] = end
+
+    def mask(self, registry: ToolRegistry) -> np.ndarray:
+        first: int = 0 if self.start is None else int(np.searchsorted(registry.sorted_timestamps,
+                                                                      to_timestamp(date=self.start), side="left"))
+        last: int = len(registry) if self.end is None else int(np.searchsorted(registry.sorted_timestamps,
+                                                                               to_timestamp(date=self.end),
+                                                                               side="left"))
+        return registry._mask(positions=registry.date_order[first:max(first, last)])
+
+
+class _Combined(Predicate):
+    """
+    Combines the masks of several predicates, for & and |.
+    """
+
+    def __init__(self, predicates: List[Predicate], combine):
+        """
+        Create the predicate.
+
+        :param predicates: The predicates.
+        :param combine: The numpy function combining two masks in place, np.logical_and or np.logical_or.
+        """
+        self.predicates: List[Predicate] = predicates
+        self.combine = combine
+
+    def mask(self, registry: ToolRegistry) -> np.ndarray:
+        mask: np.ndarray = self.predicates[0].mask(registry=registry)
+        for predicate in self.predicates[1:]:
+            self.combine(mask, predicate.mask(registry=registry), out=mask)
+        return mask
+
+
+class _Not(Predicate):
+    """
+    Negates a predicate, for ~.
+    """
+
+    def __init__(self, predicate: Predicate):
+        """
+        Create the predicate.
+
+        :param predicate: The negated predicate.
+        """
+        self.predicate: Predicate = predicate
+
+    def mask(self, registry: ToolRegistry) -> np.ndarray:
+        return ~self.predicate.mask(registry=registry)
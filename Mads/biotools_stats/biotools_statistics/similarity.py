@@ -0,0 +1,257 @@
+"""
+Semantic similarity of the tools, from their EDAM annotations.
+
+Every tool is encoded as a sparse vector with a feature for every term of every slot (the topics, the operations,
+and the data and formats of the inputs and outputs, see _utilities.SLOTS). A term also sets the features of its
+ancestors, so tools annotated with related terms share features, and every feature is weighted by the information
+content of its term, so sharing a specific term counts more than sharing a general one. The similarity of two tools
+is the cosine of their vectors.
+
+The information content is the intrinsic information content of the term in the EDAM index,
+1 - log(descendants + 1) / log(terms), which is 0 for the root and 1 for the leaves.
+
+The similarities are calculated in blocks of rows. The features of many tools are multiplied as a dense matrix, and
+the other features through the tools of every feature (a sparse matrix product).
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ._utilities import SLOTS, extract_tool_terms, iter_clean_tools
+from .edam_index import EdamIndex
+from .edam_stats import compile_index
+
+
+class ToolSimilarity:
+    """
+    The weighted, normalized term vectors of the tools, as a sparse matrix in compressed row format.
+    """
+
+    def __init__(self, tool_ids: List[str], indptr: np.ndarray, features: np.ndarray, values: np.ndarray,
+                 feature_count: int):
+        """
+        Create the matrix from its arrays. Use ToolSimilarity.from_tools instead.
+
+        :param tool_ids: The bio.tools IDs, indexed by row.
+        :param indptr: The start of every row's entries, and the end of the last row's (length: tools + 1).
+        :param features: The sorted features of the entries of every row (int32).
+        :param values: The values of the entries (float32). Every row has the norm 1, or no entries.
+        :param feature_count: The number of features.
+        """
+        self.tool_ids: List[str] = tool_ids
+        self.indptr: np.ndarray = indptr
+        self.features: np.ndarray = features
+        self.values: np.ndarray = values
+        self.feature_count: int = feature_count
+        self.rows: Dict[str, int] = {tool_id: row for row, tool_id in enumerate(tool_ids)}
+
+    @classmethod
+    def from_tools(cls, tools: Iterable[dict], index_lists: Dict[str, Union[dict, EdamIndex]],
+                   cleaning: str = "copy") -> "ToolSimilarity":
+        """
+        Encode the tools.
+
+        :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at
+            a time.
+        :param index_lists: The index list (or compiled EdamIndex) of the term types to use ("topic", "operation",
+            "format" and "data"). The slots of other term types, and the terms missing from the index, are left out.
+        :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools
+            are already clean). Default: "copy".
+        :return: The encoded tools.
+        """
+        indexes: Dict[str, EdamIndex] = {term_type.lower(): compile_index(index_list=index_list)
+                                         for term_type, index_list in index_lists.items()}
+        # Only the slots of the term types with an index are encoded
+        slots: Dict[str, str] = {slot: slot for slot, term_type in SLOTS.items() if term_type in indexes}
+        slot_offsets: Dict[str, int] = {}
+        feature_weights: List[np.ndarray] = []
+        for slot in slots:
+            slot_offsets[slot] = sum(len(weights) for weights in feature_weights)
+            feature_weights.append(_information_content(index=indexes[SLOTS[slot]]))
+        weights: np.ndarray = np.concatenate(feature_weights) if feature_weights else np.empty(0, dtype=np.float32)
+
+        tool_ids: List[str] = []
+        row_lengths: List[int] = []
+        features: List[np.ndarray] = []
+        for tool in iter_clean_tools(raw_tools=tools, cleaning=cleaning):
+            tool_features: set = set()
+            for slot, term_ids in extract_tool_terms(tool=tool, slots=slots).items():
+                index: EdamIndex = indexes[SLOTS[slot]]
+                for term_id in term_ids:
+                    code: Optional[int] = index.code(term_id)
+                    if code is not None:
+                        tool_features.update(slot_offsets[slot] + ancestor for ancestor in index.ancestors(code))
+            row_features: np.ndarray = np.array(sorted(tool_features), dtype=np.int32)
+            # The root terms have no information content
+            row_features = row_features[weights[row_features] > 0]
+            tool_ids.append(tool["biotoolsID"])
+            row_lengths.append(len(row_features))
+            features.append(row_features)
+
+        indptr: np.ndarray = np.zeros(len(tool_ids) + 1, dtype=np.int64)
+        np.cumsum(row_lengths, out=indptr[1:])
+        all_features: np.ndarray = np.concatenate(features) if features else np.empty(0, dtype=np.int32)
+        values: np.ndarray = weights[all_features]
+        norms: np.ndarray = np.sqrt(np.bincount(np.repeat(np.arange(len(tool_ids)), row_lengths),
+                                                weights=values.astype(np.float64) ** 2, minlength=len(tool_ids)))
+        values = values / np.repeat(norms, row_lengths).astype(np.float32)
+        return cls(tool_ids=tool_ids, indptr=indptr, features=all_features, values=values.astype(np.float32),
+                   feature_count=len(weights))
+
+    def similarity(self, first_id: str, second_id: str) -> float:
+        """
+        Get the similarity of two tools.
+
+        :param first_id: The bio.tools ID of the first tool.
+        :param second_id: The bio.tools ID of the second tool.
+        :return: The similarity, between 0 (no shared features) and 1.
+        """
+        first: slice = self._entries(row=self._row(tool_id=first_id))
+        second: slice = self._entries(row=self._row(tool_id=second_id))
+        _, first_positions, second_positions = np.intersect1d(self.features[first], self.features[second],
+                                                              assume_unique=True, return_indices=True)
+        return float(np.dot(self.values[first][first_positions].astype(np.float64),
+                            self.values[second][second_positions]))
+
+    def similarity_blocks(self, chunk_size: int = 512,
+                          dense_fraction: float = 0.05) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Calculate the similarities of all pairs of tools, in blocks of rows.
+
+        :param chunk_size: The number of rows of a block. Default: 512.
+        :param dense_fraction: The features of at least this fraction of the tools are multiplied as a dense matrix.
+            Default: 0.05.
+        :return: The iterator of the first row of every block and the block (float32, rows x tools).
+        """
+        product: _BlockProduct = _BlockProduct(matrix=self, dense_fraction=dense_fraction)
+        for start in range(0, len(self), chunk_size):
+            yield start, product.block(start=start, end=min(start + chunk_size, len(self)))
+
+    def top_k(self, k: int = 10, chunk_size: int = 512,
+              dense_fraction: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the most similar tools of every tool.
+
+        :param k: The number of neighbours of every tool. At most the number of other tools. Default: 10.
+        :param chunk_size: The number of rows of a block. Default: 512.
+        :param dense_fraction: The features of at least this fraction of the tools are multiplied as a dense matrix.
+            Default: 0.05.
+        :return: The rows of the neighbours (int32, tools x k) and their similarities (float32, tools x k), the most
+            similar first.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        k = min(k, len(self) - 1)
+        neighbours: np.ndarray = np.zeros((len(self), max(k, 0)), dtype=np.int32)
+        similarities: np.ndarray = np.zeros((len(self), max(k, 0)), dtype=np.float32)
+        if k <= 0:
+            return neighbours, similarities
+
+        for start, block in self.similarity_blocks(chunk_size=chunk_size, dense_fraction=dense_fraction):
+            rows: np.ndarray = np.arange(len(block))
+            # A tool is not its own neighbour
+            block[rows, start + rows] = -np.inf
+            block_neighbours: np.ndarray = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            block_similarities: np.ndarray = np.take_along_axis(block, block_neighbours, axis=1)
+            order: np.ndarray = np.argsort(-block_similarities, axis=1, kind="stable")
+            neighbours[start:start + len(block)] = np.take_along_axis(block_neighbours, order, axis=1)
+            similarities[start:start + len(block)] = np.take_along_axis(block_similarities, order, axis=1)
+        return neighbours, similarities
+
+    def neighbours(self, tool_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the most similar tools of a single tool.
+
+        :param tool_id: The bio.tools ID of the tool.
+        :param k: The number of neighbours. Default: 10.
+        :return: The bio.tools IDs of the neighbours and their similarities, the most similar first.
+        """
+        row: int = self._row(tool_id=tool_id)
+        similarities: np.ndarray = _BlockProduct(matrix=self, dense_fraction=1.0).block(start=row, end=row + 1)[0]
+        similarities[row] = -np.inf
+        order: np.ndarray = np.argsort(-similarities, kind="stable")[:min(k, len(self) - 1)]
+        return [(self.tool_ids[neighbour], float(similarities[neighbour])) for neighbour in order.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.tool_ids)
+
+    def _row(self, tool_id: str) -> int:
+        if tool_id not in self.rows:
+            raise ValueError(f"The tool '{tool_id}' is not in the matrix.")
+        return self.rows[tool_id]
+
+    def _entries(self, row: int) -> slice:
+        return slice(self.indptr[row], self.indptr[row + 1])
+
+
+class _BlockProduct:
+    """
+    The product of blocks of rows of the matrix with the whole transposed matrix, split into a dense product for the
+    frequent features and a sparse product for the others.
+    """
+
+    def __init__(self, matrix: ToolSimilarity, dense_fraction: float):
+        self.tool_count: int = len(matrix)
+        self.indptr: np.ndarray = matrix.indptr
+        self.entry_rows: np.ndarray = np.repeat(np.arange(len(matrix), dtype=np.int64), np.diff(matrix.indptr))
+        tool_counts: np.ndarray = np.bincount(matrix.features, minlength=matrix.feature_count)
+        dense_features: np.ndarray = np.flatnonzero(tool_counts >= max(1.0, dense_fraction * len(matrix)))
+
+        # The dense matrix of the frequent features (tools x dense features)
+        dense_columns: np.ndarray = np.full(matrix.feature_count, -1, dtype=np.int64)
+        dense_columns[dense_features] = np.arange(len(dense_features))
+        entry_columns: np.ndarray = dense_columns[matrix.features]
+        is_dense: np.ndarray = entry_columns >= 0
+        self.dense: np.ndarray = np.zeros((len(matrix), len(dense_features)), dtype=np.float32)
+        self.dense[self.entry_rows[is_dense], entry_columns[is_dense]] = matrix.values[is_dense]
+
+        # The other features, with the rows of every feature (the transposed matrix in compressed row format)
+        self.sparse_features: np.ndarray = np.where(is_dense, -1, matrix.features)
+        self.values: np.ndarray = matrix.values
+        order: np.ndarray = np.argsort(self.sparse_features, kind="stable")[np.count_nonzero(is_dense):]
+        self.feature_rows: np.ndarray = self.entry_rows[order]
+        self.feature_values: np.ndarray = matrix.values[order]
+        self.feature_lengths: np.ndarray = tool_counts.copy()
+        self.feature_lengths[dense_features] = 0
+        self.feature_starts: np.ndarray = np.concatenate(([0], np.cumsum(self.feature_lengths)[:-1]))
+
+    def block(self, start: int, end: int) -> np.ndarray:
+        """
+        Calculate the similarities of a block of rows with all rows.
+
+        :param start: The first row of the block.
+        :param end: The end of the block (exclusive).
+        :return: The similarities (float32, rows x tools).
+        """
+        block: np.ndarray = self.dense[start:end] @ self.dense.T
+
+        entries: slice = slice(self.indptr[start], self.indptr[end])
+        is_sparse: np.ndarray = self.sparse_features[entries] >= 0
+        features: np.ndarray = self.sparse_features[entries][is_sparse]
+        lengths: np.ndarray = self.feature_lengths[features]
+        pair_count: int = int(lengths.sum())
+        if pair_count:
+            # Every entry of the block is paired with all entries of its feature
+            ends: np.ndarray = np.cumsum(lengths)
+            positions: np.ndarray = (np.repeat(self.feature_starts[features] - (ends - lengths), lengths)
+                                     + np.arange(pair_count))
+            pair_rows: np.ndarray = np.repeat(self.entry_rows[entries][is_sparse] - start, lengths)
+            pair_values: np.ndarray = (np.repeat(self.values[entries][is_sparse], lengths)
+                                       * self.feature_values[positions])
+            block += np.bincount(pair_rows * self.tool_count + self.feature_rows[positions], weights=pair_values,
+                                 minlength=(end - start) * self.tool_count).reshape(end - start, self.tool_count)
+        return block
+
+
+def _information_content(index: EdamIndex) -> np.ndarray:
+    """
+    Calculate the intrinsic information content of the terms of an index.
+
+    :param index: The EDAM index.
+    :return: The information content of every term (float32), by code.
+    """
+    # Every term is an ancestor of itself, so the count is the number of descendants plus one
+    subtree_sizes: np.ndarray = np.bincount(index.ancestor_codes, minlength=len(index))
+    if len(index) <= 1:
+        return np.zeros(len(index), dtype=np.float32)
+    return (1 - np.log(np.maximum(subtree_sizes, 1)) / np.log(len(index))).astype(np.float32)
@@ -2,423 +2,418 @@
 The script for calculating the different statistics for a given tool list.
 """
 from datetime import datetime
-from typing import Dict, Union, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-from ._utilities import clean_and_filter_tool_list
+from ._utilities import DatedTools, iter_clean_and_filter_tools, iter_clean_tools, statistics_time_limit, to_timestamp
 from ._spdx_license_parser import parse_license_list, LicensesData
-
-
-def calculate_general_statistics(tools: list, upper_time_limit: datetime = datetime.today()):
+from .profiling import DISABLED_PROFILER, StageProfiler
+
+# TODO: Consider non-hardcoded approach
+TOOL_TYPES: List[str] = ["Bioinformatics portal", "Command-line tool", "Database portal", "Desktop application",
+                         "Library", "Ontology", "Plug-in", "Script", "SPARQL endpoint", "Suite", "Web application",
+                         "Web API", "Web service", "Workbench", "Workflow"]
+OPERATING_SYSTEMS: List[str] = ["Mac", "Linux", "Windows"]
+LANGUAGES: List[str] = ["ActionScript", "Ada", "AppleScript", "Assembly language", "AWK", "Bash", "C", "C#", "C++",
+                        "COBOL", "ColdFusion", "CWL", "D", "Delphi", "Dylan", "Eiffel", "Elm", "Forth", "Fortran",
+                        "Groovy", "Haskell", "Icarus", "Java", "JavaScript", "JSP", "Julia", "LabVIEW", "Lisp",
+                        "Lua", "Maple", "Mathematica", "MATLAB", "MLXTRAN", "NMTRAN", "OCaml", "Pascal", "Perl",
+                        "PHP", "Prolog", "PyMOL", "Python", "R", "Racket", "REXX", "Ruby", "SAS", "Scala", "Scheme",
+                        "Shell", "Smalltalk", "SQL", "Turing", "Verilog", "VHDL", "Visual Basic", "XAML", "Other"]
+MATURITY: List[str] = ["Emerging", "Mature", "Legacy"]
+COSTS: List[str] = ["Free of charge", "Free of charge (with restrictions)", "Commercial"]
+ACCESSIBILITY: List[str] = ["Restricted access", "Open access", "Open access (with restrictions)"]
+PLATFORMS: List[str] = ["Data", "Tools", "Compute", "Interoperability", "Training"]
+NODES: List[str] = ["Belgium", "Czech Republic", "Denmark", "EMBL", "Estonia", "Finland", "France", "Germany",
+                    "Greece", "Hungary", "Ireland", "Israel", "Italy", "Luxembourg", "Netherlands", "Norway",
+                    "Portugal", "Slovenia", "Spain", "Sweden", "Switzerland", "UK"]
+COMMUNITY: List[str] = ["3D-BioInfo", "Federated Human Data", "Galaxy", "Human Copy Number Variation",
+                        "Intrinsically Disordered Proteins", "Marine Metagenomics", "Metabolomics",
+                        "Microbial Biotechnology", "Plant Sciences", "Proteomics", "Rare Diseases"]
+LINK_TYPES: List[str] = ["Discussion forum", "Galaxy service", "Helpdesk", "Issue tracker", "Mailing list",
+                         "Mirror", "Software catalogue", "Repository", "Social media", "Service",
+                         "Technical monitoring", "Other"]
+DOWNLOAD_TYPES: List[str] = ["API specification", "Biological data", "Binaries", "Command-line specification",
+                             "Container file", "Icon", "Screenshot", "Source code", "Software package", "Test data",
+                             "Test script", "Tool wrapper (CWL)", "Tool wrapper (Galaxy)", "Tool wrapper (Taverna)",
+                             "Tool wrapper (Other)", "VM image", "Downloads page", "Other"]
+DOCUMENTATION_TYPES: List[str] = ["API documentation", "Citation instructions", "Code of conduct",
+                                  "Command-line options", "Contributions policy", "FAQ", "General",
+                                  "Governance", "Installation instructions", "Quick start guide", "Release notes",
+                                  "Terms of use", "Training material", "User manual", "Other"]
+PUBLICATION_TYPES: List[str] = ["Primary", "Method", "Usage", "Benchmarking study", "Review", "Other"]
+CREDIT_ROLE_TYPES: List[str] = ["Developer", "Maintainer", "Provider", "Documentor", "Contributor", "Support",
+                                "Primary contact"]
+RELATION_TYPES: List[str] = ["isNewVersionOf", "hasNewVersion", "uses", "usedBy", "includes", "includedIn"]
+
+# The fields of a tool that are counted, in the order they appear in the statistics:
+# (tool field, "has" key, entry count key or None, value statistics key or None)
+COUNTED_FIELDS: List[Tuple[str, str, Optional[str], Optional[str]]] = [
+    ("toolType", "hasToolType", "toolTypeCount", "toolTypes"),
+    ("topic", "hasTopic", "topicCount", None),
+    ("operatingSystem", "hasOperatingSystem", "operatingSystemCount", "operatingSystem"),
+    ("language", "hasLanguage", "languageCount", "languages"),
+    ("license", "hasLicense", None, "licenses"),
+    ("maturity", "hasMaturity", None, "maturity"),
+    ("cost", "hasCost", None, "costs"),
+    ("collectionID", "hasCollection", "collectionCount", None),
+    ("accessibility", "hasCodeAccessibility", None, "accessibility"),
+    ("elixirPlatform", "hasElixirPlatform", "elixirPlatformCount", "elixirPlatform"),
+    ("elixirNode", "hasElixirNode", "elixirNodeCount", "elixirNodes"),
+    ("elixirCommunity", "hasElixirCommunity", "elixirCommunityCount", "elixirCommunity"),
+    ("link", "hasLinks", "linkCount", "linkTypes"),
+    ("download", "hasDownloads", "downloadCount", "downloadTypes"),
+    ("documentation", "hasDocumentation", "documentationCount", "documentationTypes"),
+    ("publication", "hasPublications", "publicationCount", "publicationTypes"),
+    ("credit", "hasCredit", "creditCount", "creditRoleTypes"),
+    ("relation", "hasRelation", "relationCount", "relations"),
+    ("community", "hasBiolib", "BiolibCount", None),
+]
+
+# The vocabulary and the function extracting the counted values from the field, for every field with value
+# statistics (except the license, which is classified against the SPDX license list).
+VALUE_FIELDS: Dict[str, Tuple[List[str], Callable[[Union[list, str]], Iterable[str]]]] = {
+    "toolType": (TOOL_TYPES, lambda tool_types: tool_types),
+    "operatingSystem": (OPERATING_SYSTEMS, lambda systems: systems),
+    "language": (LANGUAGES, lambda languages: languages),
+    "maturity": (MATURITY, lambda maturity: (maturity,)),
+    "cost": (COSTS, lambda cost: (cost,)),
+    "accessibility": (ACCESSIBILITY, lambda accessibility: (accessibility,)),
+    "elixirPlatform": (PLATFORMS, lambda platforms: platforms),
+    "elixirNode": (NODES, lambda nodes: nodes),
+    "elixirCommunity": (COMMUNITY, lambda communities: communities),
+    "link": (LINK_TYPES, lambda links: [t for link in links for t in link["type"]]),
+    "download": (DOWNLOAD_TYPES, lambda downloads: [download["type"] for download in downloads]),
+    "documentation": (DOCUMENTATION_TYPES,
+                      lambda documentations: [t for documentation in documentations for t in documentation["type"]]),
+    "publication": (PUBLICATION_TYPES,
+                    lambda publications: [t for publication in publications for t in publication.get("type", [])]),
+    "credit": (CREDIT_ROLE_TYPES, lambda credits: [t for credit in credits for t in credit.get("typeRole", [])]),
+    "relation": (RELATION_TYPES, lambda relations: [relation["type"] for relation in relations]),
+}
+
+
+def calculate_general_statistics(tools: Iterable[dict], upper_time_limit: datetime = datetime.today(),
+                                 offline: bool = False, cleaning: str = "copy",
+                                 profiler: Optional[StageProfiler] = None):
     """
     Calculate the general statistics for a list of tools.
 
-    :param tools: The list of tools.
+    :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
     :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
         Default: datetime.datetime.today()
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :param profiler: The profiler recording the time of the stages of the calculation. Default: None (no timing).
     :return: The dictionary with the statistics.
     """
-    # Clean the list of tools
-    tools = clean_and_filter_tool_list(raw_tools=tools, upper_time_limit=upper_time_limit)
-
-    # Create the dictionary to hold the statistics and calculate the statistics
-    stats: Dict[str, Union[str, int, Dict[str, int]]] = {}
-    stats["date"] = upper_time_limit.isoformat(timespec="seconds")
-    stats["toolCount"] = len(tools)
-
-    stats["hasToolType"] = len([tool for tool in tools if "toolType" in tool])
-    stats["toolTypeCount"] = sum([len(tool["toolType"]) for tool in tools if "toolType" in tool])
-    stats["toolTypes"] = _calculate_tool_type_statistics(tools=tools)
-
-    stats["hasTopic"] = len([tool for tool in tools if "topic" in tool])
-    stats["topicCount"] = sum([len(tool["topic"]) for tool in tools if "topic" in tool])
-
-    stats["hasOperatingSystem"] = len([tool for tool in tools if "operatingSystem" in tool])
-    stats["operatingSystemCount"] = sum([len(tool["operatingSystem"]) for tool in tools if "operatingSystem" in tool])
-    stats["operatingSystem"] = _calculate_os_statistics(tools=tools)
-
-    stats["hasLanguage"] = len([tool for tool in tools if "language" in tool])
-    stats["languageCount"] = sum([len(tool["language"]) for tool in tools if "language" in tool])
-    stats["languages"] = _calculate_language_statistics(tools=tools)
-
-    stats["hasLicense"] = len([tool for tool in tools if "license" in tool])
-    stats["licenses"] = _calculate_license_statistics(tools=tools)
-
-    stats["hasMaturity"] = len([tool for tool in tools if "maturity" in tool])
-    stats["maturity"] = _calculate_maturity_statistics(tools=tools)
-
-    stats["hasCost"] = len([tool for tool in tools if "cost" in tool])
-    stats["costs"] = _calculate_cost_statistics(tools=tools)
-
-    stats["hasCollection"] = len([tool for tool in tools if "collectionID" in tool])
-    stats["collectionCount"] = sum([len(tool["collectionID"]) for tool in tools if "collectionID" in tool])
-
-    stats["hasCodeAccessibility"] = len([tool for tool in tools if "accessibility" in tool])
-    stats["accessibility"] = _calculate_code_accessibility_statistics(tools=tools)
-
-    stats["hasElixirPlatform"] = len([tool for tool in tools if "elixirPlatform" in tool])
-    stats["elixirPlatformCount"] = sum([len(tool["elixirPlatform"]) for tool in tools if "elixirPlatform" in tool])
-    stats["elixirPlatform"] = _calculate_elixir_platform_statistics(tools=tools)
-
-    stats["hasElixirNode"] = len([tool for tool in tools if "elixirNode" in tool])
-    stats["elixirNodeCount"] = sum([len(tool["elixirNode"]) for tool in tools if "elixirNode" in tool])
-    stats["elixirNodes"] = _calculate_elixir_node_statistics(tools=tools)
-
-    stats["hasElixirCommunity"] = len([tool for tool in tools if "elixirCommunity" in tool])
-    stats["elixirCommunityCount"] = sum([len(tool["elixirCommunity"]) for tool in tools if "elixirCommunity" in tool])
-    stats["elixirCommunity"] = _calculate_elixir_community_statistics(tools=tools)
-
-    stats["hasLinks"] = len([tool for tool in tools if "link" in tool])
-    stats["linkCount"] = sum([len(tool["link"]) for tool in tools if "link" in tool])
-    stats["linkTypes"] = _calculate_link_type_statistics(tools=tools)
+    profiler = profiler or DISABLED_PROFILER
+    # Clean the tools lazily, so only one cleaned tool is held in memory at a time
+    tools = profiler.iterate(name="clean_and_filter_tools",
+                             iterable=iter_clean_and_filter_tools(raw_tools=tools, upper_time_limit=upper_time_limit,
+                                                                  cleaning=cleaning))
 
-    stats["hasDownloads"] = len([tool for tool in tools if "download" in tool])
-    stats["downloadCount"] = sum([len(tool["download"]) for tool in tools if "download" in tool])
-    stats["downloadTypes"] = _calculate_download_type_statistics(tools=tools)
+    with profiler.stage(name="parse_license_list"):
+        license_info: LicensesData = parse_license_list(offline=offline)
+        aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
+    with profiler.stage(name="count_tools") as stage:
+        aggregator.add_tools(tools=tools)
+        stage.items += aggregator.tool_count
 
-    stats["hasDocumentation"] = len([tool for tool in tools if "documentation" in tool])
-    stats["documentationCount"] = sum([len(tool["documentation"]) for tool in tools if "documentation" in tool])
-    stats["documentationTypes"] = _calculate_documentation_type_statistics(tools=tools)
+    with profiler.stage(name="create_statistics"):
+        return aggregator.to_dict(date=upper_time_limit)
 
-    stats["hasPublications"] = len([tool for tool in tools if "publication" in tool])
-    stats["publicationCount"] = sum([len(tool["publication"]) for tool in tools if "publication" in tool])
-    stats["publicationTypes"] = _calculate_publication_type_statistics(tools=tools)
 
-    stats["hasCredit"] = len([tool for tool in tools if "credit" in tool])
-    stats["hasCreditRole"] = len([tool for tool in tools if ("credit" in tool and
-                                                             len([role for role in tool["credit"] if
-                                                                  "credit" in tool]) > 0)])
-    stats["creditCount"] = sum([len(tool["credit"]) for tool in tools if "credit" in tool])
-    stats["creditRoleTypes"] = _calculate_credit_role_type_statistics(tools=tools)
-
-    stats["hasRelation"] = len([tool for tool in tools if "relation" in tool])
-    stats["relationCount"] = sum([len(tool["relation"]) for tool in tools if "relation" in tool])
-    stats["relations"] = _calculate_relation_statistics(tools=tools)
-
-    stats["hasBiolib"] = len([tool for tool in tools if "community" in tool])
-    stats["BiolibCount"] = sum([len(tool["community"]) for tool in tools if "community" in tool])
-
-    return stats
-
-
-def _calculate_tool_type_statistics(tools: list) -> dict:
+def calculate_general_statistics_over_time(tools: Iterable[dict], upper_time_limits: List[datetime],
+                                           offline: bool = False, cleaning: str = "copy") -> List[dict]:
     """
-    Calculate the tool type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The tool type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    TOOL_TYPES: List[str] = ["Bioinformatics portal", "Command-line tool", "Database portal", "Desktop application",
-                             "Library", "Ontology", "Plug-in", "Script", "SPARQL endpoint", "Suite", "Web application",
-                             "Web API", "Web service", "Workbench", "Workflow"]
-    tool_type_stats: Dict[str, int] = {key: 0 for key in TOOL_TYPES}
-
-    for tool_types in [tool["toolType"] for tool in tools if "toolType" in tool]:
-        for tool_type in tool_types:
-            tool_type_stats[tool_type] += 1
+    Calculate the general statistics for several upper time limits at once.
 
-    return tool_type_stats
-
-
-def _calculate_os_statistics(tools: list) -> dict:
-    """
-    Calculate the Operating system statistics for the tools.
+    The tools are cleaned and sorted by addition date once, and the counters are advanced from one time limit to
+    the next, instead of recounting all tools for every time limit.
 
     :param tools: The list of tools.
-    :return: The OS statistics.
+    :param upper_time_limits: The upper time limits to calculate the statistics for.
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :return: The statistics for each upper time limit, in the same order as the time limits. Each is identical to
+        the result of calculate_general_statistics for that time limit.
     """
-    # TODO: Consider non-hardcoded approach
-    OPERATING_SYSTEMS: List[str] = ["Mac", "Linux", "Windows"]
-    os_stats: Dict[str, int] = {key: 0 for key in OPERATING_SYSTEMS}
-
-    for systems in [tool["operatingSystem"] for tool in tools if "operatingSystem" in tool]:
-        for system in systems:
-            os_stats[system] += 1
+    dated_tools: DatedTools = DatedTools(raw_tools=iter_clean_tools(raw_tools=tools, cleaning=cleaning))
 
-    return os_stats
+    license_info: LicensesData = parse_license_list(offline=offline)
+    aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
 
+    statistics: List[Optional[dict]] = [None] * len(upper_time_limits)
+    position: int = 0
+    for index in sorted(range(len(upper_time_limits)), key=lambda i: upper_time_limits[i]):
+        # Add the tools added before this time limit, but not before the previous time limit
+        end: int = dated_tools.count_until(time_limit=upper_time_limits[index])
+        aggregator.add_tools(tools=dated_tools.tools[position:end])
+        position = end
+        statistics[index] = aggregator.to_dict(date=upper_time_limits[index])
 
-def _calculate_language_statistics(tools: list) -> dict:
-    """
-    Calculate the language statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The language statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    LANGUAGES: List[str] = ["ActionScript", "Ada", "AppleScript", "Assembly language", "AWK", "Bash", "C", "C#", "C++",
-                            "COBOL", "ColdFusion", "CWL", "D", "Delphi", "Dylan", "Eiffel", "Elm", "Forth", "Fortran",
-                            "Groovy", "Haskell", "Icarus", "Java", "JavaScript", "JSP", "Julia", "LabVIEW", "Lisp",
-                            "Lua", "Maple", "Mathematica", "MATLAB", "MLXTRAN", "NMTRAN", "OCaml", "Pascal", "Perl",
-                            "PHP", "Prolog", "PyMOL", "Python", "R", "Racket", "REXX", "Ruby", "SAS", "Scala", "Scheme",
-                            "Shell", "Smalltalk", "SQL", "Turing", "Verilog", "VHDL", "Visual Basic", "XAML", "Other"]
-    language_stats: Dict[str, int] = {key: 0 for key in LANGUAGES}
+    return statistics
 
-    for languages in [tool["language"] for tool in tools if "language" in tool]:
-        for language in languages:
-            language_stats[language] += 1
 
-    return language_stats
-
-
-def _calculate_license_statistics(tools: list) -> dict:
-    """
-    Calculate the license statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The license statistics.
-    """
-    license_info: LicensesData = parse_license_list()
-
-    LICENSE_TYPES: List[str] = ["OSIApproved", "FSFApproved", "Freeware", "Proprietary", "Other", "NoLicense",
-                                "DeprecatedIdentifier"] + license_info.licenses_list
-    OSI_APPROVED_LICENSES: List[str] = license_info.osi_approved_licenses
-    FSF_APPROVED_LICENSES: List[str] = license_info.fsf_approved_licenses
-    DEPRECATED_LICENSE_IDENTIFIERS: List[str] = license_info.deprecated_licenses
-
-    license_stats: Dict[str, int] = {key: 0 for key in LICENSE_TYPES}
-
-    for licens in [tool["license"] for tool in tools if "license" in tool]:
-        if licens in LICENSE_TYPES:
-            license_stats[licens] += 1
-        elif licens == "Not licensed":
-            license_stats["NoLicense"] += 1
-        if licens in OSI_APPROVED_LICENSES:
-            # Check if it is an OSI approved license
-            license_stats["OSIApproved"] += 1
-        if licens in FSF_APPROVED_LICENSES:
-            # Check if it is an FSF approved license
-            license_stats["FSFApproved"] += 1
-        if licens in DEPRECATED_LICENSE_IDENTIFIERS:
-            # Check if the license has a deprecated license identifier
-            license_stats["DeprecatedIdentifier"] += 1
-    return license_stats
-
-
-def _calculate_maturity_statistics(tools: list) -> dict:
-    """
-    Calculate the code accessibility statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The code accessibility language statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    MATURITY: List[str] = ["Emerging", "Mature", "Legacy"]
-    maturity_stats: Dict[str, int] = {key: 0 for key in MATURITY}
-
-    for maturity in [tool["maturity"] for tool in tools if "maturity" in tool]:
-        maturity_stats[maturity] += 1
-
-    return maturity_stats
-
-
-def _calculate_cost_statistics(tools: list) -> dict:
-    """
-    Calculate the cost statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The cost statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    COSTS: List[str] = ["Free of charge", "Free of charge (with restrictions)", "Commercial"]
-    cost_stats: Dict[str, int] = {key: 0 for key in COSTS}
-
-    for cost in [tool["cost"] for tool in tools if "cost" in tool]:
-        cost_stats[cost] += 1
-
-    return cost_stats
-
-
-def _calculate_code_accessibility_statistics(tools: list) -> dict:
-    """
-    Calculate the code accessibility statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The code accessibility language statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    ACCESSIBILITY: List[str] = ["Restricted access", "Open access", "Open access (with restrictions)"]
-    accessibility_stats: Dict[str, int] = {key: 0 for key in ACCESSIBILITY}
-
-    for accessibility in [tool["accessibility"] for tool in tools if "accessibility" in tool]:
-        accessibility_stats[accessibility] += 1
-
-    return accessibility_stats
-
-
-def _calculate_elixir_platform_statistics(tools: list) -> dict:
-    """
-    Calculate the ELIXIR platform statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The ELIXIR platform statistics.
+def calculate_grouped_general_statistics(tools: Iterable[dict], group_by: Union[str, Callable[[dict], Any]],
+                                         upper_time_limit: datetime = datetime.today(), offline: bool = False,
+                                         cleaning: str = "copy") -> dict:
     """
-    # TODO: Consider non-hardcoded approach
-    PLATFORMS: List[str] = ["Data", "Tools", "Compute", "Interoperability", "Training"]
-    platform_stats: Dict[str, int] = {key: 0 for key in PLATFORMS}
+    Calculate the general statistics for every group of tools (e.g. every collection) and for all tools, in a
+    single traversal of the tools.
 
-    for platforms in [tool["elixirPlatform"] for tool in tools if "elixirPlatform" in tool]:
-        for platform in platforms:
-            platform_stats[platform] += 1
-
-    return platform_stats
-
-
-def _calculate_elixir_node_statistics(tools: list) -> dict:
-    """
-    Calculate the ELIXIR node statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The ELIXIR node statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    NODES: List[str] = ["Belgium", "Czech Republic", "Denmark", "EMBL", "Estonia", "Finland", "France", "Germany",
-                        "Greece", "Hungary", "Ireland", "Israel", "Italy", "Luxembourg", "Netherlands", "Norway",
-                        "Portugal", "Slovenia", "Spain", "Sweden", "Switzerland", "UK"]
-    node_stats: Dict[str, int] = {key: 0 for key in NODES}
-
-    for nodes in [tool["elixirNode"] for tool in tools if "elixirNode" in tool]:
-        for node in nodes:
-            node_stats[node] += 1
-
-    return node_stats
-
-
-def _calculate_elixir_community_statistics(tools: list) -> dict:
-    """
-    Calculate the ELIXIR community statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The ELIXIR community statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    COMMUNITY: List[str] = ["3D-BioInfo", "Federated Human Data", "Galaxy", "Human Copy Number Variation",
-                            "Intrinsically Disordered Proteins", "Marine Metagenomics", "Metabolomics",
-                            "Microbial Biotechnology", "Plant Sciences", "Proteomics", "Rare Diseases"]
-    community_stats: Dict[str, int] = {key: 0 for key in COMMUNITY}
-
-    for communities in [tool["elixirCommunity"] for tool in tools if "elixirCommunity" in tool]:
-        for community in communities:
-            community_stats[community] += 1
-
-    return community_stats
-
-
-def _calculate_link_type_statistics(tools: list) -> dict:
-    """
-    Calculate the link type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The link type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    LINK_TYPES: List[str] = ["Discussion forum", "Galaxy service", "Helpdesk", "Issue tracker", "Mailing list",
-                             "Mirror", "Software catalogue", "Repository", "Social media", "Service",
-                             "Technical monitoring", "Other"]
-    link_type_stats: Dict[str, int] = {key: 0 for key in LINK_TYPES}
-
-    for links in [tool["link"] for tool in tools if "link" in tool]:
-        for link in links:
-            for link_type in [t for t in link["type"]]:
-                link_type_stats[link_type] += 1
-
-    return link_type_stats
-
-
-def _calculate_download_type_statistics(tools: list) -> dict:
-    """
-    Calculate the download type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The download type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    DOWNLOAD_TYPES: List[str] = ["API specification", "Biological data", "Binaries", "Command-line specification",
-                                 "Container file", "Icon", "Screenshot", "Source code", "Software package", "Test data",
-                                 "Test script", "Tool wrapper (CWL)", "Tool wrapper (Galaxy)", "Tool wrapper (Taverna)",
-                                 "Tool wrapper (Other)", "VM image", "Downloads page", "Other"]
-    download_type_stats: Dict[str, int] = {key: 0 for key in DOWNLOAD_TYPES}
-
-    for downloads in [tool["download"] for tool in tools if "download" in tool]:
-        for download in downloads:
-            download_type_stats[download["type"]] += 1
-
-    return download_type_stats
-
-
-def _calculate_documentation_type_statistics(tools: list) -> dict:
-    """
-    Calculate the documentation type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The documentation type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    DOCUMENTATION_TYPES: List[str] = ["API documentation", "Citation instructions", "Code of conduct",
-                                      "Command-line options", "Contributions policy", "FAQ", "General",
-                                      "Governance", "Installation instructions", "Quick start guide", "Release notes",
-                                      "Terms of use", "Training material", "User manual", "Other"]
-    documentation_type_stats: Dict[str, int] = {key: 0 for key in DOCUMENTATION_TYPES}
-
-    for documentations in [tool["documentation"] for tool in tools if "documentation" in tool]:
-        for documentation in documentations:
-            for link_type in [t for t in documentation["type"]]:
-                documentation_type_stats[link_type] += 1
-
-    return documentation_type_stats
-
-
-def _calculate_publication_type_statistics(tools: list) -> dict:
-    """
-    Calculate the publication type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The publication type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    PUBLICATION_TYPES: List[str] = ["Primary", "Method", "Usage", "Benchmarking study", "Review", "Other"]
-    publication_type_stats: Dict[str, int] = {key: 0 for key in PUBLICATION_TYPES}
-
-    for publications in [tool["publication"] for tool in tools if "publication" in tool]:
-        for publication in [pub for pub in publications if "type" in pub]:
-            for pub_type in [t for t in publication["type"]]:
-                publication_type_stats[pub_type] += 1
-
-    return publication_type_stats
-
-
-def _calculate_credit_role_type_statistics(tools: list) -> dict:
-    """
-    Calculate the credit role type statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The credit role type statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    CREDIT_ROLE_TYPES: List[str] = ["Developer", "Maintainer", "Provider", "Documentor", "Contributor", "Support",
-                                    "Primary contact"]
-    credit_role_type_stats: Dict[str, int] = {key: 0 for key in CREDIT_ROLE_TYPES}
-
-    for creds in [tool["credit"] for tool in tools if "credit" in tool]:
-        for credit in creds:
-            for credit_type in [t for t in credit["typeRole"] if "typeRole" in credit]:
-                credit_role_type_stats[credit_type] += 1
-    return credit_role_type_stats
-
-
-def _calculate_relation_statistics(tools: list) -> dict:
-    """
-    Calculate the relation statistics for the tools.
-
-    :param tools: The list of tools.
-    :return: The relation statistics.
-    """
-    # TODO: Consider non-hardcoded approach
-    RELATION_TYPES: List[str] = ["isNewVersionOf", "hasNewVersion", "uses", "usedBy", "includes", "includedIn"]
-    relation_stats: Dict[str, int] = {key: 0 for key in RELATION_TYPES}
-
-    for relations in [tool["relation"] for tool in tools if "relation" in tool]:
-        for relation in relations:
-            relation_stats[relation["type"]] += 1
-
-    return relation_stats
+    :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at a time.
+    :param group_by: The tool field to group by (e.g. "collectionID", "elixirCommunity" or "elixirNode"), or a
+        function giving the group (or an iterable of groups, or None) of a cleaned tool. A tool with several values
+        in the field (or several groups) is counted in every group.
+    :param upper_time_limit: Calculate the statistics for tools added up to the time limit.
+        Default: datetime.datetime.today()
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :return: The dictionary with the statistics of all tools ("total") and the statistics of every group, sorted by
+        the group ("groups"). Each is identical to the result of calculate_general_statistics on the group's tools.
+    """
+    get_groups: Callable[[dict], Any] = group_by if callable(group_by) else lambda tool: tool.get(group_by)
+
+    license_info: LicensesData = parse_license_list(offline=offline)
+    total: GeneralStatisticsAggregator = GeneralStatisticsAggregator(license_info=license_info)
+    groups: Dict[str, GeneralStatisticsAggregator] = {}
+
+    for tool in iter_clean_and_filter_tools(raw_tools=tools, upper_time_limit=upper_time_limit, cleaning=cleaning):
+        total.add_tool(tool=tool)
+        tool_groups = get_groups(tool)
+        if tool_groups is None:
+            continue
+        # A single group, or several (duplicates only count once)
+        for group in ([tool_groups] if isinstance(tool_groups, str) else dict.fromkeys(tool_groups)):
+            if group not in groups:
+                groups[group] = GeneralStatisticsAggregator(license_info=license_info)
+            groups[group].add_tool(tool=tool)
+
+    return {"total": total.to_dict(date=upper_time_limit),
+            "groups": {group: groups[group].to_dict(date=upper_time_limit) for group in sorted(groups)}}
+
+
+def update_general_statistics(statistics: dict, added: Iterable[dict] = (), removed: Iterable[dict] = (),
+                              modified: Iterable[Tuple[dict, dict]] = (), upper_time_limit: Optional[datetime] = None,
+                              offline: bool = False, cleaning: str = "copy") -> dict:
+    """
+    Update already calculated general statistics with the tools that changed since, instead of recalculating them.
+
+    All counters in the statistics are sums over the tools, so the statistics are their own state: the removed tools
+    (and the old versions of the modified tools) are subtracted, and the added tools (and the new versions of the
+    modified tools) are added. The result is identical to calculate_general_statistics on the changed tool list, as
+    long as the same license list is used (e.g. offline=True).
+
+    :param statistics: The previous statistics (from calculate_general_statistics), e.g. loaded from a JSON file.
+    :param added: The tools added since the previous statistics.
+    :param removed: The tools removed since the previous statistics, as they were then.
+    :param modified: The (old version, new version) pairs of the tools modified since the previous statistics.
+    :param upper_time_limit: The new upper time limit. All tools added before it, but not before the previous
+        time limit, must be in the added tools. Default: The time limit of the previous statistics.
+    :param offline: Use the cached or bundled SPDX license list instead of downloading it. Default: False.
+    :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools are
+        already clean). Default: "copy".
+    :return: The dictionary with the updated statistics.
+    """
+    previous_time_limit: datetime = statistics_time_limit(statistics=statistics)
+    upper_time_limit = upper_time_limit or previous_time_limit
+    modified = list(modified)
+
+    license_info: LicensesData = parse_license_list(offline=offline)
+    aggregator: GeneralStatisticsAggregator = GeneralStatisticsAggregator.from_dict(statistics=statistics,
+                                                                                   license_info=license_info)
+    # The old versions only count if they were added before the previous time limit, the new ones before the new
+    old_tools: List[dict] = list(removed) + [old_tool for old_tool, _ in modified]
+    for tool in iter_clean_and_filter_tools(raw_tools=old_tools, upper_time_limit=previous_time_limit,
+                                            cleaning=cleaning):
+        aggregator.remove_tool(tool=tool)
+    new_tools: List[dict] = list(added) + [new_tool for _, new_tool in modified]
+    aggregator.add_tools(tools=iter_clean_and_filter_tools(raw_tools=new_tools, upper_time_limit=upper_time_limit,
+                                                           cleaning=cleaning))
+
+    return aggregator.to_dict(date=upper_time_limit)
+
+
+class GeneralStatisticsAggregator:
+    """
+    Aggregator for the general statistics, which visits every (cleaned) tool once and updates all counters.
+    """
+
+    def __init__(self, license_info: LicensesData):
+        """
+        Create an empty aggregator.
+
+        :param license_info: The license data used for classifying the licenses.
+        """
+        self.license_info: LicensesData = license_info
+        self._license_types: List[str] = ["OSIApproved", "FSFApproved", "Freeware", "Proprietary", "Other",
+                                          "NoLicense", "DeprecatedIdentifier"] + license_info.licenses_list
+        self._license_keys: Dict[str, Tuple[str, ...]] = _classify_licenses(license_types=self._license_types,
+                                                                           license_info=license_info)
+
+        self.tool_count: int = 0
+        self.has: Dict[str, int] = {field: 0 for field, _, _, _ in COUNTED_FIELDS}
+        self.counts: Dict[str, int] = {field: 0 for field, _, count_key, _ in COUNTED_FIELDS if count_key is not None}
+        self.values: Dict[str, Dict[str, int]] = {field: {key: 0 for key in vocabulary}
+                                                  for field, (vocabulary, _) in VALUE_FIELDS.items()}
+        self.values["license"] = {key: 0 for key in self._license_types}
+
+    def add_tools(self, tools: Iterable[dict]):
+        """
+        Add the tools to the statistics.
+
+        :param tools: The cleaned tools.
+        """
+        for tool in tools:
+            self.add_tool(tool=tool)
+
+    @classmethod
+    def from_dict(cls, statistics: dict, license_info: LicensesData) -> "GeneralStatisticsAggregator":
+        """
+        Create an aggregator with the counters of already calculated statistics.
+
+        :param statistics: The statistics dictionary (from to_dict or calculate_general_statistics).
+        :param license_info: The license data used for classifying the licenses.
+        :return: The aggregator.
+        """
+        aggregator: GeneralStatisticsAggregator = cls(license_info=license_info)
+        aggregator.tool_count = statistics["toolCount"]
+        for field, has_key, count_key, values_key in COUNTED_FIELDS:
+            aggregator.has[field] = statistics[has_key]
+            if count_key is not None:
+                aggregator.counts[field] = statistics[count_key]
+            if values_key is not None:
+                aggregator.values[field].update(statistics[values_key])
+        return aggregator
+
+    def add_tool(self, tool: dict):
+        """
+        Add a single tool to the statistics.
+
+        :param tool: The cleaned tool.
+        """
+        self._count_tool(tool=tool, sign=1)
+
+    def remove_tool(self, tool: dict):
+        """
+        Remove a single tool, which was added before, from the statistics.
+
+        :param tool: The cleaned tool, as it was when it was added.
+        """
+        self._count_tool(tool=tool, sign=-1)
+
+    def _count_tool(self, tool: dict, sign: int):
+        """
+        Add the contribution of a tool to the counters.
+
+        :param tool: The cleaned tool.
+        :param sign: 1 to add the tool, -1 to remove it.
+        """
+        self.tool_count += sign
+        for field, _, count_key, _ in COUNTED_FIELDS:
+            if field not in tool:
+                continue
+            value = tool[field]
+            self.has[field] += sign
+            if count_key is not None:
+                self.counts[field] += sign * len(value)
+            if field in VALUE_FIELDS:
+                field_stats: Dict[str, int] = self.values[field]
+                for key in VALUE_FIELDS[field][1](value):
+                    field_stats[key] += sign
+            elif field == "license":
+                self._add_license(licens=value, count=sign)
+
+    def merge(self, other: "GeneralStatisticsAggregator"):
+        """
+        Add the counters of another aggregator (e.g. of another shard of the tools).
+
+        :param other: The other aggregator, using the same license data.
+        """
+        self.tool_count += other.tool_count
+        for field, count in other.has.items():
+            self.has[field] += count
+        for field, count in other.counts.items():
+            self.counts[field] += count
+        # The value counters (including the classified licenses) have the same keys in both aggregators
+        for field, value_counts in other.values.items():
+            field_stats: Dict[str, int] = self.values[field]
+            for key, count in value_counts.items():
+                field_stats[key] += count
+
+    def add_value_counts(self, field: str, value_counts: Iterable[Tuple[str, int]]):
+        """
+        Add already counted values of a field, e.g. from the columnar registry.
+
+        :param field: The tool field.
+        :param value_counts: The values and the number of times they occur.
+        """
+        field_stats: Dict[str, int] = self.values[field]
+        for value, count in value_counts:
+            if field == "license":
+                for key in self._license_keys.get(value, ()):
+                    field_stats[key] += count
+            else:
+                field_stats[value] += count
+
+    def _add_license(self, licens: str, count: int = 1):
+        """
+        Add a license to the license statistics.
+
+        :param licens: The license of the tool.
+        :param count: The number to add (negative to remove the license). Default: 1.
+        """
+        license_stats: Dict[str, int] = self.values["license"]
+        for key in self._license_keys.get(licens, ()):
+            license_stats[key] += count
+
+    def to_dict(self, date: datetime) -> dict:
+        """
+        Create the statistics dictionary.
+
+        :param date: The upper time limit the statistics are calculated for.
+        :return: The dictionary with the statistics.
+        """
+        stats: Dict[str, Union[str, int, Dict[str, int]]] = {}
+        stats["date"] = date.isoformat(timespec="seconds")
+        # The exact time limit, for updating the statistics
+        stats["timestamp"] = to_timestamp(date=date)
+        stats["toolCount"] = self.tool_count
+
+        for field, has_key, count_key, values_key in COUNTED_FIELDS:
+            stats[has_key] = self.has[field]
+            if field == "credit":
+                stats["hasCreditRole"] = self.has[field]
+            if count_key is not None:
+                stats[count_key] = self.counts[field]
+            if values_key is not None:
+                stats[values_key] = dict(self.values[field])
+
+        return stats
+
+
+def _classify_licenses(license_types: List[str], license_info: LicensesData) -> Dict[str, Tuple[str, ...]]:
+    """
+    Precompute the license statistics keys each known license is counted under.
+
+    :param license_types: The license statistics keys.
+    :param license_info: The license data.
+    :return: The dictionary with the license and the keys to count it under.
+    """
+    license_keys: Dict[str, Tuple[str, ...]] = {}
+    for licens in license_types + ["Not licensed"]:
+        keys: List[str] = [licens] if licens in license_types else ["NoLicense"]
+        flags = license_info.license_flags.get(licens)
+        if flags is not None:
+            if flags.osi_approved:
+                keys.append("OSIApproved")
+            if flags.fsf_approved:
+                keys.append("FSFApproved")
+            if flags.deprecated:
+                keys.append("DeprecatedIdentifier")
+        license_keys[licens] = tuple(keys)
+    return license_keys
@@ -0,0 +1,192 @@
+"""
+Inverted index from the EDAM terms to the tools annotated with them.
+
+The index is built once per dump, and distinguishes where a term is used: as a topic, an operation, or the data or
+format of an input or an output. With the EDAM indexes, a term also finds the tools annotated with its descendants,
+e.g. all tools under topic_0121 (Proteomics).
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from ._utilities import SLOTS, extract_tool_terms, iter_clean_tools
+from .edam_index import EdamIndex
+from .edam_stats import compile_index
+
+
+class ToolTermIndex:
+    """
+    The inverted index, with the tools of every term of every slot as sorted arrays of tool codes.
+    """
+
+    def __init__(self, tool_ids: List[str], postings: Dict[str, Dict[str, np.ndarray]],
+                 expanded_postings: Optional[Dict[str, Dict[str, np.ndarray]]] = None):
+        """
+        Create the index from the postings. Use ToolTermIndex.from_tools or ToolTermIndex.load instead.
+
+        :param tool_ids: The bio.tools IDs, indexed by tool code.
+        :param postings: The sorted tool codes of every term, for every slot.
+        :param expanded_postings: The sorted tool codes of every term, including the tools of its descendants, for
+            every slot. Default: None (not expanded).
+        """
+        self.tool_ids: List[str] = tool_ids
+        self.postings: Dict[str, Dict[str, np.ndarray]] = postings
+        self.expanded_postings: Optional[Dict[str, Dict[str, np.ndarray]]] = expanded_postings
+
+    @classmethod
+    def from_tools(cls, tools: Iterable[dict], index_lists: Optional[Dict[str, Union[dict, EdamIndex]]] = None,
+                   cleaning: str = "copy") -> "ToolTermIndex":
+        """
+        Build the index from a tool list.
+
+        :param tools: The list of tools. Any iterable (e.g. biotools_statistics.load_tools) is consumed one tool at
+            a time.
+        :param index_lists: The index list (or compiled EdamIndex) of every term type ("topic", "operation",
+            "format" and "data"), for also finding the tools of the descendants of the terms. Default: None.
+        :param cleaning: How to clean the tools. "copy", "in_place" (modifies the given tools) or "none" (the tools
+            are already clean). Default: "copy".
+        :return: The index.
+        """
+        indexes: Optional[Dict[str, EdamIndex]] = None
+        if index_lists is not None:
+            indexes = {term_type.lower(): compile_index(index_list=index_list)
+                       for term_type, index_list in index_lists.items()}
+
+        tool_ids: List[str] = []
+        pairs: Dict[str, Dict[str, array]] = {slot: {} for slot in SLOTS}
+        expanded_pairs: Dict[str, Dict[str, array]] = {slot: {} for slot in SLOTS}
+
+        for tool in iter_clean_tools(raw_tools=tools, cleaning=cleaning):
+            tool_code: int = len(tool_ids)
+            tool_ids.append(tool["biotoolsID"])
+            for slot, term_ids in extract_tool_terms(tool=tool).items():
+                for term_id in term_ids:
+                    pairs[slot].setdefault(term_id, array("i")).append(tool_code)
+                    if indexes is None or SLOTS[slot] not in indexes:
+                        continue
+                    index: EdamIndex = indexes[SLOTS[slot]]
+                    code: Optional[int] = index.code(term_id)
+                    # The ancestors include the term itself. A term that is not in the index only finds itself.
+                    branch_codes: List[int] = index.ancestors(code) if code is not None else []
+                    for branch_term_id in [index.term_ids[branch_code] for branch_code in branch_codes] or [term_id]:
+                        expanded_pairs[slot].setdefault(branch_term_id, array("i")).append(tool_code)
+
+        return cls(tool_ids=tool_ids, postings=_to_postings(pairs=pairs),
+                   expanded_postings=_to_postings(pairs=expanded_pairs) if indexes is not None else None)
+
+    def tool_codes(self, slot: str, term_ids: Union[str, Iterable[str]], expand: bool = False) -> np.ndarray:
+        """
+        Get the tools annotated with any of the terms in a slot.
+
+        :param slot: The slot ("topic", "operation", "input_data", "input_format", "output_data" or
+            "output_format").
+        :param term_ids: The term ID, or several term IDs.
+        :param expand: Also find the tools annotated with the descendants of the terms. Default: False.
+        :return: The sorted tool codes.
+        """
+        if slot not in SLOTS:
+            raise ValueError(f"The slot '{slot}' is not valid. Must be one of {', '.join(SLOTS)}.")
+        if expand and self.expanded_postings is None:
+            raise ValueError("The index is not expanded. Build it with the index lists.")
+        slot_postings: Dict[str, np.ndarray] = (self.expanded_postings if expand else self.postings)[slot]
+
+        term_ids = [term_ids] if isinstance(term_ids, str) else list(term_ids)
+        codes: List[np.ndarray] = [slot_postings[term_id] for term_id in term_ids if term_id in slot_postings]
+        if not codes:
+            return np.empty(0, dtype=np.int32)
+        return codes[0] if len(codes) == 1 else np.unique(np.concatenate(codes))
+
+    def select(self, expand: bool = False, **slot_terms: Union[str, Iterable[str]]) -> List[str]:
+        """
+        Select the tools annotated with the terms in all the given slots (with any of the terms of a slot), e.g.
+        index.select(expand=True, topic="topic_0121", output_format="format_3244").
+
+        :param expand: Also find the tools annotated with the descendants of the terms. Default: False.
+        :param slot_terms: The term ID (or several term IDs) of every slot.
+        :return: The bio.tools IDs of the tools, in the order of the tools.
+        """
+        return self.decode(codes=self.select_codes(expand=expand, **slot_terms))
+
+    def select_codes(self, expand: bool = False, **slot_terms: Union[str, Iterable[str]]) -> np.ndarray:
+        """
+        Select the tools like select, but return the tool codes.
+
+        :param expand: Also find the tools annotated with the descendants of the terms. Default: False.
+        :param slot_terms: The term ID (or several term IDs) of every slot.
+        :return: The sorted tool codes.
+        """
+        codes: Optional[np.ndarray] = None
+        # Intersect the shortest arrays first
+        for slot_codes in sorted((self.tool_codes(slot=slot, term_ids=term_ids, expand=expand)
+                                  for slot, term_ids in slot_terms.items()), key=len):
+            codes = slot_codes if codes is None else np.intersect1d(codes, slot_codes, assume_unique=True)
+        return np.arange(len(self.tool_ids), dtype=np.int32) if codes is None else codes
+
+    def decode(self, codes: np.ndarray) -> List[str]:
+        """
+        Get the bio.tools IDs of tool codes.
+
+        :param codes: The tool codes.
+        :return: The bio.tools IDs.
+        """
+        return [self.tool_ids[code] for code in codes.tolist()]
+
+    def save(self, path: str):
+        """
+        Save the index to disk as a .npz file.
+
+        :param path: The path to save the index to.
+        """
+        arrays: Dict[str, np.ndarray] = {"tool_ids": np.array(self.tool_ids, dtype=str)}
+        for name, postings in (("strict", self.postings), ("expanded", self.expanded_postings)):
+            for slot, slot_postings in (postings or {}).items():
+                arrays[f"{name}.{slot}.terms"] = np.array(list(slot_postings), dtype=str)
+                arrays[f"{name}.{slot}.offsets"] = np.cumsum([0] + [len(codes) for codes in slot_postings.values()],
+                                                             dtype=np.int64)
+                arrays[f"{name}.{slot}.codes"] = np.concatenate([np.empty(0, dtype=np.int32)]
+                                                                + list(slot_postings.values()))
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ToolTermIndex":
+        """
+        Load an index saved with save.
+
+        :param path: The path to the saved index.
+        :return: The index.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            postings: Dict[str, Optional[Dict[str, Dict[str, np.ndarray]]]] = {}
+            for name in ("strict", "expanded"):
+                if f"{name}.topic.terms" not in data:
+                    postings[name] = None
+                    continue
+                postings[name] = {}
+                for slot in SLOTS:
+                    offsets: np.ndarray = data[f"{name}.{slot}.offsets"]
+                    codes: np.ndarray = data[f"{name}.{slot}.codes"]
+                    postings[name][slot] = {term_id: codes[start:end] for term_id, start, end
+                                            in zip(data[f"{name}.{slot}.terms"].tolist(), offsets[:-1], offsets[1:])}
+            return cls(tool_ids=data["tool_ids"].tolist(), postings=postings["strict"],
+                       expanded_postings=postings["expanded"])
+
+    def __len__(self) -> int:
+        return len(self.tool_ids)
+
+
+def _to_postings(pairs: Dict[str, Dict[str, array]]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Convert the collected tool codes of the terms into sorted arrays without duplicates.
+
+    :param pairs: The tool codes of every term, for every slot.
+    :return: The postings.
+    """
+    # The tool codes are added in ascending order, so removing the repeated codes is enough
+    postings: Dict[str, Dict[str, np.ndarray]] = {}
+    for slot, slot_pairs in pairs.items():
+        postings[slot] = {}
+        for term_id, codes in slot_pairs.items():
+            term_codes: np.ndarray = np.frombuffer(codes, dtype=np.int32)
+            postings[slot][term_id] = term_codes[np.concatenate(([True], term_codes[1:] != term_codes[:-1]))]
+    return postings
@@ -0,0 +1,137 @@
+"""
+Loading bio.tools dumps one tool at a time.
+
+Supports dumps stored as a JSON array (as returned by json.dumps of the tool list) or as NDJSON (one tool per line),
+optionally compressed with gzip (.gz) or zstandard (.zst, requires the zstandard package).
+"""
+import gzip
+import io
+import json
+from typing import IO, Iterator
+
+_CHUNK_SIZE: int = 1 << 20  # Read 1 MiB of text at a time
+
+
+def load_tools(path: str) -> Iterator[dict]:
+    """
+    Iterate over the tools in a bio.tools dump without loading the whole file.
+
+    :param path: The path to the dump. JSON array or NDJSON, optionally gzip or zstandard compressed.
+    :return: The generator yielding the tools.
+    """
+    with _open_text(path=path) as f:
+        prefix: str = _read_prefix(f=f)
+        first_char: str = prefix.lstrip()[:1]
+        if first_char == "[":
+            yield from _iter_json_array(chunks=_read_chunks(f=f, prefix=prefix))
+        elif first_char == "{":
+            yield from _iter_ndjson(chunks=_read_chunks(f=f, prefix=prefix))
+        elif first_char != "":
+            raise ValueError(f"The file '{path}' is neither a JSON array nor NDJSON.")
+
+
+def _open_text(path: str) -> IO[str]:
+    """
+    Open a (possibly compressed) dump as a text stream.
+
+    :param path: The path to the dump.
+    :return: The text stream.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst dumps requires the 'zstandard' package.") from e
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+                                encoding="utf8")
+    return open(path, "r", encoding="utf8")
+
+
+def _read_prefix(f: IO[str]) -> str:
+    """
+    Read the start of the stream up to the first non-whitespace character.
+
+    Compressed streams cannot always seek back, so the prefix is handed on to _read_chunks instead.
+
+    :param f: The text stream, positioned at the start.
+    :return: The prefix, or "" for an empty file.
+    """
+    prefix: str = ""
+    while not prefix.strip():
+        chunk: str = f.read(64)
+        if chunk == "":
+            break
+        prefix += chunk
+    return prefix
+
+
+def _read_chunks(f: IO[str], prefix: str) -> Iterator[str]:
+    """
+    Read the stream in chunks, starting with the already read prefix.
+
+    :param f: The text stream.
+    :param prefix: The already read prefix.
+    :return: The generator yielding the chunks.
+    """
+    yield prefix
+    while True:
+        chunk: str = f.read(_CHUNK_SIZE)
+        if chunk == "":
+            return
+        yield chunk
+
+
+def _iter_ndjson(chunks: Iterator[str]) -> Iterator[dict]:
+    """
+    Iterate over the tools in an NDJSON stream.
+
+    :param chunks: The text chunks of the stream.
+    :return: The generator yielding the tools.
+    """
+    remainder: str = ""
+    for chunk in chunks:
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if remainder.strip():
+        yield json.loads(remainder)
+
+
+def _iter_json_array(chunks: Iterator[str]) -> Iterator[dict]:
+    """
+    Iterate over the elements of a JSON array stream, decoding one element at a time.
+
+    :param chunks: The text chunks of the stream.
+    :return: The generator yielding the tools.
+    """
+    decoder: json.JSONDecoder = json.JSONDecoder()
+    buffer: str = ""
+    position: int = 0
+    started: bool = False
+    for chunk in chunks:
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            # Skip whitespace, the opening bracket and the separators between the elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,[":
+                if buffer[position] == "[":
+                    if started:
+                        break
+                    started = True
+                position += 1
+            if position >= len(buffer) or buffer[position] == "]":
+                break
+            try:
+                tool, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element continues in the next chunk
+                break
+            yield tool
+        if position < len(buffer) and buffer[position] == "]":
+            return
+    if buffer[position:].strip():
+        raise ValueError("The JSON array is truncated.")
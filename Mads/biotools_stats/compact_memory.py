@@ -0,0 +1,94 @@
+"""
+Script for measuring the resident memory of a dump kept in memory as dicts and as compact records.
+
+Every representation is loaded in a separate process, which reports the growth of its resident set size (RSS):
+- json: the dump loaded with json.load,
+- compact: the dump loaded with load_compact_tools.
+The statistics of both are then checked to be identical.
+
+Usage: python compact_memory.py [dump path]
+    Without a dump, a synthetic dump with 50 000 tools is written (see synthetic_tools.py).
+"""
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from biotools_statistics import calculate_general_statistics, load_compact_tools, load_tools
+from synthetic_tools import write_tools
+
+SYNTHETIC_TOOL_COUNT: int = 50_000
+
+
+def _resident_bytes() -> int:
+    """
+    Get the resident set size of this process.
+
+    :return: The current RSS in bytes, or the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _measure(representation: str, path: str):
+    """
+    Load the dump in a representation and print the growth of the RSS and the load time as JSON.
+
+    :param representation: "json" or "compact".
+    :param path: The path to the dump.
+    """
+    gc.collect()
+    before: int = _resident_bytes()
+    start: float = time.perf_counter()
+    if representation == "json":
+        tools = list(load_tools(path))
+    else:
+        tools = load_compact_tools(path)
+    duration: float = time.perf_counter() - start
+    gc.collect()
+    print(json.dumps({"tools": len(tools), "bytes": _resident_bytes() - before, "seconds": duration}))
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        _measure(representation=sys.argv[2], path=sys.argv[3])
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path: str = sys.argv[1] if len(sys.argv) > 1 else os.path.join(temp_dir, "tools.json")
+        if len(sys.argv) == 1:
+            write_tools(path=path, tool_count=SYNTHETIC_TOOL_COUNT)
+        print(f"{path}: {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+
+        results: dict = {}
+        for representation in ("json", "compact"):
+            output: str = subprocess.run([sys.executable, __file__, "--measure", representation, path],
+                                         check=True, capture_output=True, text=True).stdout
+            results[representation] = json.loads(output.splitlines()[-1])
+            print(f"{representation:<8} {results[representation]['tools']} tools   "
+                  f"RSS: {results[representation]['bytes'] / 2 ** 20:8.1f} MiB   "
+                  f"load time: {results[representation]['seconds']:6.2f} s")
+        print(f"Reduction: {1 - results['compact']['bytes'] / results['json']['bytes']:.0%}")
+
+        upper_time_limit: datetime = datetime.today()
+        identical: bool = (calculate_general_statistics(tools=load_tools(path), upper_time_limit=upper_time_limit,
+                                                        offline=True)
+                           == calculate_general_statistics(tools=load_compact_tools(path),
+                                                           upper_time_limit=upper_time_limit, offline=True,
+                                                           cleaning="none"))
+        print(f"Identical statistics: {identical}")
+
+
+if __name__ == "__main__":
+    main()
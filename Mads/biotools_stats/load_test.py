@@ -0,0 +1,96 @@
+"""
+Measure the throughput and the latency of the statistics service (stats_service.py).
+
+Several connections (HTTP/1.1 with keep-alive) send the requests concurrently, cycling through the paths.
+
+Usage: python load_test.py [--url http://127.0.0.1:8080] [--connections 8] [--requests 5000] [--path <path> ...]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DEFAULT_PATHS: List[str] = ["/statistics/general", "/statistics/edam/topic", "/statistics/edam/operation",
+                            "/health"]
+
+
+async def _run_connection(host: str, port: int, paths: List[str], request_count: int, latencies: List[float]):
+    """
+    Send requests over one connection, one after another.
+
+    :param host: The host of the service.
+    :param port: The port of the service.
+    :param paths: The paths to request, in turn.
+    :param request_count: The number of requests to send.
+    :param latencies: The list to add the latency of every request to.
+    """
+    reader, writer = await asyncio.open_connection(host=host, port=port)
+    for i in range(request_count):
+        start: float = time.perf_counter()
+        writer.write(f"GET {paths[i % len(paths)]} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        status_line: bytes = await reader.readline()
+        content_length: int = 0
+        while True:
+            line: bytes = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                content_length = int(line.split(b":", 1)[1])
+        await reader.readexactly(content_length)
+        latencies.append(time.perf_counter() - start)
+        if b" 200 " not in status_line:
+            raise ValueError(f"{paths[i % len(paths)]}: {status_line.decode('latin-1').strip()}")
+    writer.close()
+
+
+async def run_load_test(url: str, paths: List[str], connections: int, requests: int) -> dict:
+    """
+    Run the load test.
+
+    :param url: The URL of the service.
+    :param paths: The paths to request.
+    :param connections: The number of concurrent connections.
+    :param requests: The total number of requests.
+    :return: The dictionary with the number of requests, the throughput and the latency percentiles.
+    """
+    address = urlsplit(url)
+    latencies: List[float] = []
+    start: float = time.perf_counter()
+    await asyncio.gather(*(_run_connection(host=address.hostname, port=address.port or 80, paths=paths,
+                                           request_count=requests // connections + (i < requests % connections),
+                                           latencies=latencies)
+                           for i in range(connections)))
+    seconds: float = time.perf_counter() - start
+
+    latencies_ms: np.ndarray = np.array(latencies) * 1000
+    return {"requests": len(latencies), "connections": connections, "seconds": round(seconds, 3),
+            "requests_per_second": round(len(latencies) / seconds, 1),
+            "latency_ms": {f"p{percentile}": round(float(np.percentile(latencies_ms, percentile)), 3)
+                           for percentile in (50, 90, 99)} | {"max": round(float(latencies_ms.max()), 3)}}
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    argument_parser = argparse.ArgumentParser(description="Load test the statistics service.")
+    argument_parser.add_argument("--url", default="http://127.0.0.1:8080")
+    argument_parser.add_argument("--connections", type=int, default=8)
+    argument_parser.add_argument("--requests", type=int, default=5000)
+    argument_parser.add_argument("--path", action="append", dest="paths",
+                                 help="A path to request (repeatable). Default: the precomputed statistics.")
+    arguments = argument_parser.parse_args()
+
+    result: dict = asyncio.run(run_load_test(url=arguments.url, paths=arguments.paths or DEFAULT_PATHS,
+                                             connections=arguments.connections, requests=arguments.requests))
+    print(f"{result['requests']} requests over {result['connections']} connections in {result['seconds']} s: "
+          f"{result['requests_per_second']} requests/s")
+    print("Latency (ms): " + ", ".join(f"{name} {value}" for name, value in result["latency_ms"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Script for measuring the peak memory use of the statistics on a large synthetic dump.
+
+Compares loading the whole dump with json.load against streaming it with load_tools.
+The synthetic dump is created by repeating the tools in Tools.json with new IDs.
+
+Usage: python memory_usage.py [number of tools]
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from biotools_statistics import calculate_general_statistics, load_tools
+
+
+def _write_synthetic_dump(path: str, tool_count: int):
+    """
+    Write a synthetic dump as gzip compressed NDJSON.
+
+    :param path: The path to the dump.
+    :param tool_count: The number of tools in the dump.
+    """
+    with open("Tools.json", "r") as f:
+        template_tools = json.load(f)
+
+    with gzip.open(path, "wt", encoding="utf8") as f:
+        for i in range(tool_count):
+            tool: dict = dict(template_tools[i % len(template_tools)])
+            tool["biotoolsID"] = f"{tool['biotoolsID']}_{i}"
+            f.write(json.dumps(tool) + "\n")
+
+
+def _measure(name: str, function):
+    """
+    Measure the run time and the peak traced memory of a function.
+
+    :param name: The name of the measurement.
+    :param function: The function to run.
+    """
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    function()
+    duration: float = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} time: {duration:8.2f} s   peak memory: {peak / 2 ** 20:10.1f} MiB")
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    tool_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    upper_time_limit: datetime = datetime.today()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path: str = os.path.join(temp_dir, "tools.ndjson.gz")
+        _write_synthetic_dump(path=path, tool_count=tool_count)
+        print(f"{tool_count} tools, {os.path.getsize(path) / 2 ** 20:.1f} MiB compressed")
+
+        def load_all():
+            with gzip.open(path, "rt", encoding="utf8") as f:
+                tools = [json.loads(line) for line in f]
+            calculate_general_statistics(tools=tools, upper_time_limit=upper_time_limit, offline=True)
+
+        def stream():
+            calculate_general_statistics(tools=load_tools(path), upper_time_limit=upper_time_limit, offline=True)
+
+        _measure(name="list", function=load_all)
+        _measure(name="streaming", function=stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Script for measuring how the sharded multi-process statistics scale with the number of processes.
+
+A synthetic dump (see synthetic_tools.py) is written as shard files, the statistics are calculated serially and with
+an increasing number of processes, and the results are checked to be identical to the serial results.
+
+Usage: python parallel_scaling.py [number of tools] [number of shards] [comma separated numbers of processes]
+"""
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List
+
+from biotools_statistics import calculate_general_statistics, calculate_all_edam_term_statistics, \
+    calculate_annotation_quality, calculate_general_statistics_parallel, calculate_all_edam_term_statistics_parallel, \
+    calculate_annotation_quality_parallel, load_tools
+from synthetic_tools import generate_tools, load_fixture_indexes
+
+
+def _measure(function: Callable[[], dict]) -> tuple:
+    """
+    Measure the run time of a function.
+
+    :param function: The function.
+    :return: The run time in seconds and the result.
+    """
+    start: float = time.perf_counter()
+    result: dict = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    tool_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    shard_count: int = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    process_counts: List[int] = ([int(count) for count in sys.argv[3].split(",")] if len(sys.argv) > 3
+                                 else sorted({1, 2, 4, os.cpu_count() or 1}))
+    upper_time_limit: datetime = datetime.today()
+    indexes = load_fixture_indexes()
+    print(f"{tool_count} tools in {shard_count} shards, {os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shard_paths: List[str] = [os.path.join(temp_dir, f"shard_{shard}.ndjson") for shard in range(shard_count)]
+        for shard, path in enumerate(shard_paths):
+            # Different seeds for the shards, so the biotoolsIDs are made unique across the shards
+            with open(path, "w", encoding="utf8") as f:
+                for tool in generate_tools(tool_count=tool_count // shard_count, seed=shard, indexes=indexes):
+                    tool["biotoolsID"] = f"{tool['biotoolsID']}_{shard}"
+                    f.write(json.dumps(tool) + "\n")
+
+        serial_general_time, serial_general = _measure(lambda: calculate_general_statistics(
+            tools=itertools.chain.from_iterable(load_tools(path) for path in shard_paths),
+            upper_time_limit=upper_time_limit, offline=True))
+        serial_edam_time, serial_edam = _measure(lambda: calculate_all_edam_term_statistics(
+            tools=itertools.chain.from_iterable(load_tools(path) for path in shard_paths), index_lists=indexes,
+            upper_time_limit=upper_time_limit, output_ids=True))
+        serial_quality_time, serial_quality = _measure(lambda: calculate_annotation_quality(
+            tools=itertools.chain.from_iterable(load_tools(path) for path in shard_paths), index_lists=indexes))
+        print(f"{'serial':<12} general: {serial_general_time:7.2f} s   EDAM: {serial_edam_time:7.2f} s   "
+              f"quality: {serial_quality_time:7.2f} s")
+
+        for process_count in process_counts:
+            general_time, general = _measure(lambda: calculate_general_statistics_parallel(
+                shards=shard_paths, upper_time_limit=upper_time_limit, offline=True, max_workers=process_count))
+            edam_time, edam = _measure(lambda: calculate_all_edam_term_statistics_parallel(
+                shards=shard_paths, index_lists=indexes, upper_time_limit=upper_time_limit, output_ids=True,
+                max_workers=process_count))
+            quality_time, quality = _measure(lambda: calculate_annotation_quality_parallel(
+                shards=shard_paths, index_lists=indexes, max_workers=process_count))
+            identical: bool = (json.dumps(general) == json.dumps(serial_general)
+                               and json.dumps(edam) == json.dumps(serial_edam)
+                               and json.dumps(quality) == json.dumps(serial_quality))
+            print(f"{process_count:>2} processes general: {general_time:7.2f} s "
+                  f"({serial_general_time / general_time:4.1f}x)   EDAM: {edam_time:7.2f} s "
+                  f"({serial_edam_time / edam_time:4.1f}x)   quality: {quality_time:7.2f} s "
+                  f"({serial_quality_time / quality_time:4.1f}x)   identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Script for checking the hot reload of the statistics service (stats_service.py).
+
+The service is started on a synthetic dump, and the dump is then replaced:
+- by a dump which can not be loaded (a tool without addition date): the old dump must still be served,
+- by a valid dump: the new dump must be served, so the reload keeps watching after a failed load.
+
+Usage: python reload_check.py
+    Exits with status 1 if a check fails.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from stats_service import StatsService
+from synthetic_tools import generate_tools, write_tools
+
+RELOAD_INTERVAL: float = 0.1
+
+
+async def _health(service: StatsService) -> dict:
+    """
+    Request the health of the service.
+
+    :param service: The service.
+    :return: The health response.
+    """
+    _, body = await service._respond(method="GET", target="/health")
+    return json.loads(body)
+
+
+async def _wait_for_tools(service: StatsService, tool_count: int, timeout: float = 30.0) -> bool:
+    """
+    Wait until the service serves a number of tools.
+
+    :param service: The service.
+    :param tool_count: The number of tools.
+    :param timeout: The maximum seconds to wait.
+    :return: Whether the service served the tools in time.
+    """
+    for _ in range(int(timeout / RELOAD_INTERVAL)):
+        if (await _health(service=service))["tools"] == tool_count:
+            return True
+        await asyncio.sleep(RELOAD_INTERVAL)
+    return False
+
+
+async def _check(path: str) -> bool:
+    """
+    Run the checks.
+
+    :param path: The path to write the dumps to.
+    :return: Whether all checks passed.
+    """
+    write_tools(path=path, tool_count=100)
+    service: StatsService = StatsService(dump_path=path, indexes=None, reload_interval=RELOAD_INTERVAL)
+    server = await service.start(host="127.0.0.1", port=0)
+    passed: bool = True
+    async with server:
+        bad_tools: list = list(generate_tools(tool_count=150, seed=1))
+        del bad_tools[0]["additionDate"]
+        with open(path, "w") as f:
+            json.dump(bad_tools, f)
+        # Give the service several polls to (fail to) load the bad dump
+        await asyncio.sleep(10 * RELOAD_INTERVAL)
+        kept: bool = (await _health(service=service))["tools"] == 100
+        print(f"Old dump kept after a bad dump: {kept}")
+
+        write_tools(path=path, tool_count=200, seed=2)
+        reloaded: bool = await _wait_for_tools(service=service, tool_count=200)
+        print(f"New dump loaded after a bad dump: {reloaded}")
+        passed = kept and reloaded
+    return passed
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        passed: bool = asyncio.run(_check(path=os.path.join(temp_dir, "tools.json")))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
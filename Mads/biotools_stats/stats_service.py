@@ -0,0 +1,385 @@
+"""
+A small HTTP service answering statistics requests from a dump loaded once.
+
+At startup (and whenever the dump file changes) the tools are loaded and cleaned once, and the general and the EDAM
+term statistics of all tools and of every collection are precomputed for the load time and the configured dates
+(--precompute-dates, --month-ends). The responses are kept as serialized JSON, so they are answered without touching
+the tools. Other requests (other dates) are calculated in a thread and then kept in an LRU cache, which never evicts
+the precomputed responses.
+
+Endpoints (GET, JSON):
+    /health
+    /collections
+    /statistics/general?collection=<collectionID>&date=<YYYY-MM-DD>
+    /statistics/edam/<topic|operation|format|data>?collection=<collectionID>&date=<YYYY-MM-DD>&ids=<true|false>
+
+Usage: python stats_service.py <dump path> [--host 127.0.0.1] [--port 8080] [--owl <EDAM OWL path>]
+    [--precompute-dates YYYY-MM-DD ...] [--month-ends <count>]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from biotools_statistics import calculate_general_statistics, calculate_grouped_general_statistics, \
+    calculate_all_edam_term_statistics, load_tools, load_edam_index, DatedTools, EdamIndex, ToolRegistry, field_in
+from biotools_statistics._utilities import iter_clean_tools
+
+# The EDAM ontology shipped with the repository
+EDAM_OWL_PATH: str = "../../JavaVedran/biotoolsAnnotations/res/edam.owl"
+TERM_TYPES: Tuple[str, ...] = ("topic", "operation", "format", "data")
+_REASONS: Dict[int, str] = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class LRUCache:
+    """
+    The least recently used cache of the serialized responses.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size: int = max_size
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        value: Optional[bytes] = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: bytes):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _Dump:
+    """
+    A loaded dump: the cleaned tools sorted by addition date, the index of the collections, and the precomputed
+    responses.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.signature: Tuple[int, int] = _file_signature(path=path)
+        # The tools are cleaned once, so the statistics can skip the cleaning
+        self.tools: DatedTools = DatedTools(raw_tools=iter_clean_tools(raw_tools=load_tools(path)))
+        self.registry: ToolRegistry = ToolRegistry(tools=self.tools, fields=["collectionID"])
+        self.loaded_at: datetime = datetime.today().replace(microsecond=0)
+        # The precomputed responses are kept for as long as the dump, outside of the LRU cache
+        self.precomputed: Dict[tuple, bytes] = {}
+
+    def collection_tools(self, collection: Optional[str]) -> Iterable[dict]:
+        return self.tools if collection is None else self.registry.tools(field_in("collectionID", collection))
+
+
+class StatsService:
+    """
+    The statistics service.
+    """
+
+    def __init__(self, dump_path: str, indexes: Optional[Dict[str, EdamIndex]], cache_size: int = 4096,
+                 reload_interval: float = 5.0, offline: bool = True, precompute_dates: Iterable[datetime] = (),
+                 month_ends: int = 0):
+        """
+        Create the service. The dump is loaded by start.
+
+        :param dump_path: The path to the dump (see load_tools).
+        :param indexes: The compiled EDAM index of every term type, or None to disable the EDAM statistics.
+        :param cache_size: The maximum number of cached responses, besides the precomputed ones. Default: 4096.
+        :param reload_interval: The seconds between the checks for a new dump. Default: 5.
+        :param offline: Use the cached or bundled SPDX license list. Default: True.
+        :param precompute_dates: The dates to precompute the statistics for, besides the load time. Default: none.
+        :param month_ends: Also precompute the statistics at the ends of this many months before the load time, i.e.
+            for the first days of the following months (the dates are exclusive). Default: 0.
+        """
+        if month_ends < 0:
+            raise ValueError("The number of month ends must not be negative.")
+        self.dump_path: str = dump_path
+        self.indexes: Optional[Dict[str, EdamIndex]] = indexes
+        self.precompute_dates: List[datetime] = list(precompute_dates)
+        self.month_ends: int = month_ends
+        self.cache_size: int = cache_size
+        self.reload_interval: float = reload_interval
+        self.offline: bool = offline
+        self._dump: Optional[_Dump] = None
+        self._cache: LRUCache = LRUCache(max_size=cache_size)
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        """
+        Load the dump, precompute the statistics and start serving.
+
+        :param host: The host to listen on.
+        :param port: The port to listen on.
+        :return: The server.
+        """
+        self._dump, self._cache = await asyncio.get_running_loop().run_in_executor(None, self._load)
+        self._watcher = asyncio.get_running_loop().create_task(self._watch())
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    def _load(self) -> Tuple[_Dump, LRUCache]:
+        """
+        Load the dump and precompute the statistics.
+
+        :return: The dump, with the precomputed responses, and a new cache for the other responses.
+        """
+        dump: _Dump = _Dump(path=self.dump_path)
+        dates: List[datetime] = sorted({dump.loaded_at, *self.precompute_dates,
+                                        *_month_ends(date=dump.loaded_at, count=self.month_ends)})
+        for date in dates:
+            self._precompute(dump=dump, date=date)
+        print(f"Loaded {len(dump.tools)} tools from {dump.path}, {len(dump.precomputed)} precomputed responses for "
+              f"{len(dates)} dates")
+        return dump, LRUCache(max_size=self.cache_size)
+
+    def _precompute(self, dump: _Dump, date: datetime):
+        """
+        Precompute the general and the EDAM term statistics of all tools and of every collection for a date.
+
+        :param dump: The dump to keep the responses in.
+        :param date: The date.
+        """
+        grouped: dict = calculate_grouped_general_statistics(tools=dump.tools, group_by="collectionID",
+                                                             upper_time_limit=date, offline=self.offline,
+                                                             cleaning="none")
+        dump.precomputed[("general", None, date)] = _to_json(grouped["total"])
+        for collection, statistics in grouped["groups"].items():
+            dump.precomputed[("general", collection, date)] = _to_json(statistics)
+
+        if self.indexes is not None:
+            for collection in [None] + dump.registry.values(field="collectionID"):
+                statistics = self._edam_statistics(dump=dump, term_types=TERM_TYPES, collection=collection, date=date,
+                                                   output_ids=False)
+                for term_type in TERM_TYPES:
+                    dump.precomputed[("edam", term_type, collection, date, False)] = _to_json(
+                        {key: value for key, value in statistics.items() if key not in TERM_TYPES or key == term_type})
+
+    def _general_statistics(self, dump: _Dump, collection: Optional[str], date: datetime) -> dict:
+        """
+        Calculate the general statistics of a collection.
+
+        :param dump: The dump.
+        :param collection: The collection, or None for all tools.
+        :param date: The upper time limit.
+        :return: The statistics.
+        """
+        return calculate_general_statistics(tools=dump.collection_tools(collection=collection), upper_time_limit=date,
+                                            offline=self.offline, cleaning="none")
+
+    def _edam_statistics(self, dump: _Dump, term_types: Iterable[str], collection: Optional[str], date: datetime,
+                         output_ids: bool) -> dict:
+        """
+        Calculate the EDAM term statistics of a collection.
+
+        :param dump: The dump.
+        :param term_types: The term types.
+        :param collection: The collection, or None for all tools.
+        :param date: The upper time limit.
+        :param output_ids: Whether to include the tool IDs.
+        :return: The statistics.
+        """
+        return calculate_all_edam_term_statistics(tools=dump.collection_tools(collection=collection),
+                                                  index_lists={term_type: self.indexes[term_type]
+                                                               for term_type in term_types},
+                                                  upper_time_limit=date, output_ids=output_ids, cleaning="none")
+
+    async def _watch(self):
+        """
+        Reload the dump when the file changes. The old dump is used until the new one is ready, and is kept if the new
+        one can not be loaded.
+        """
+        # A version of the file which could not be loaded is not loaded again
+        failed_signature: Optional[Tuple[int, int]] = None
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            signature: Optional[Tuple[int, int]] = None
+            try:
+                signature = _file_signature(path=self.dump_path)
+                if signature in (self._dump.signature, failed_signature):
+                    continue
+                self._dump, self._cache = await asyncio.get_running_loop().run_in_executor(None, self._load)
+            except Exception as error:
+                failed_signature = signature
+                print(f"Could not reload {self.dump_path}: {error!r}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Answer the requests of a connection (HTTP/1.1 with keep-alive).
+        """
+        try:
+            while True:
+                try:
+                    request_line: bytes = await reader.readline()
+                    if not request_line:
+                        break
+                    headers: Dict[str, str] = {}
+                    while True:
+                        line: bytes = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    # A line longer than the limit of the stream, the rest of the request can not be read
+                    writer.write(_response(version="HTTP/1.1", status=400, keep_alive=False,
+                                           body=_to_json({"error": "The request line or a header is too long."})))
+                    await writer.drain()
+                    break
+
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                status, body = await self._respond(method=method, target=target)
+                keep_alive: bool = (headers.get("connection", "").lower() != "close"
+                                    and version == "HTTP/1.1")
+                writer.write(_response(version=version or "HTTP/1.1", status=status, body=body,
+                                       keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str) -> Tuple[int, bytes]:
+        """
+        Create the response to a request.
+
+        :param method: The HTTP method.
+        :param target: The request target (path and query).
+        :return: The status code and the JSON body.
+        """
+        if method != "GET":
+            return 405, _to_json({"error": "Only GET requests are supported."})
+        url = urlsplit(target)
+        query: Dict[str, str] = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts: list = [part for part in url.path.split("/") if part]
+        dump: _Dump = self._dump
+
+        try:
+            if parts == ["health"]:
+                return 200, _to_json({"status": "ok", "tools": len(dump.tools), "loadedAt": dump.loaded_at.isoformat(),
+                                      "precomputedResponses": len(dump.precomputed),
+                                      "cachedResponses": len(self._cache)})
+            if parts == ["collections"]:
+                return 200, _to_json(dump.registry.values(field="collectionID"))
+
+            date: datetime = datetime.fromisoformat(query["date"]) if "date" in query else dump.loaded_at
+            collection: Optional[str] = query.get("collection")
+            if parts == ["statistics", "general"]:
+                key: tuple = ("general", collection, date)
+                compute: Callable[[], dict] = functools.partial(self._general_statistics, dump=dump,
+                                                                collection=collection, date=date)
+            elif len(parts) == 3 and parts[:2] == ["statistics", "edam"] and parts[2] in TERM_TYPES:
+                if self.indexes is None:
+                    return 503, _to_json({"error": "The EDAM statistics are not available (no EDAM ontology)."})
+                term_type: str = parts[2]
+                output_ids: bool = query.get("ids", "false").lower() == "true"
+                key = ("edam", term_type, collection, date, output_ids)
+                compute = functools.partial(self._edam_statistics, dump=dump, term_types=[term_type],
+                                            collection=collection, date=date, output_ids=output_ids)
+            else:
+                return 404, _to_json({"error": f"Unknown path '{url.path}'."})
+        except ValueError as error:
+            return 400, _to_json({"error": str(error)})
+
+        body: Optional[bytes] = dump.precomputed.get(key) or self._cache.get(key)
+        if body is None:
+            try:
+                body = _to_json(await asyncio.get_running_loop().run_in_executor(None, compute))
+            except Exception as error:
+                print(f"Could not answer {target}: {error!r}")
+                return 500, _to_json({"error": "The statistics could not be calculated."})
+            if dump is self._dump:
+                self._cache.put(key, body)
+        return 200, body
+
+
+def _to_json(value) -> bytes:
+    return json.dumps(value).encode("utf8")
+
+
+def _response(version: str, status: int, body: bytes, keep_alive: bool) -> bytes:
+    """
+    Serialize an HTTP response.
+
+    :param version: The HTTP version of the request.
+    :param status: The status code.
+    :param body: The JSON body.
+    :param keep_alive: Whether the connection is kept open.
+    :return: The response.
+    """
+    return (b"%s %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n%s"
+            % (version.encode(), status, _REASONS[status].encode(), len(body),
+               b"keep-alive" if keep_alive else b"close", body))
+
+
+def _month_ends(date: datetime, count: int) -> List[datetime]:
+    """
+    Get the ends of the months before a date, as the first days of the following months.
+
+    :param date: The date.
+    :param count: The number of months.
+    :return: The first days of the count months up to the month of the date.
+    """
+    month: int = date.year * 12 + date.month - 1
+    return [datetime(year=(month - offset) // 12, month=(month - offset) % 12 + 1, day=1) for offset in range(count)]
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    """
+    Get what identifies a version of a file.
+
+    :param path: The path to the file.
+    :return: The modification time and the size of the file.
+    """
+    stat: os.stat_result = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    argument_parser = argparse.ArgumentParser(description="Serve bio.tools statistics.")
+    argument_parser.add_argument("dump", help="The path to the dump (JSON array or NDJSON, optionally compressed).")
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=8080)
+    argument_parser.add_argument("--owl", default=EDAM_OWL_PATH, help="The path to the EDAM OWL file.")
+    argument_parser.add_argument("--cache-size", type=int, default=4096)
+    argument_parser.add_argument("--reload-interval", type=float, default=5.0)
+    argument_parser.add_argument("--precompute-dates", nargs="*", type=datetime.fromisoformat, default=[],
+                                 help="The dates (YYYY-MM-DD) to precompute the statistics for, besides the load time.")
+    argument_parser.add_argument("--month-ends", type=int, default=0,
+                                 help="Also precompute the statistics at the ends of this many past months.")
+    arguments = argument_parser.parse_args()
+
+    indexes: Optional[Dict[str, EdamIndex]] = None
+    if os.path.isfile(arguments.owl):
+        indexes = {term_type: load_edam_index(owl_path=arguments.owl, term_type=term_type) for term_type in TERM_TYPES}
+
+    async def serve():
+        service: StatsService = StatsService(dump_path=arguments.dump, indexes=indexes,
+                                             cache_size=arguments.cache_size,
+                                             reload_interval=arguments.reload_interval,
+                                             precompute_dates=arguments.precompute_dates,
+                                             month_ends=arguments.month_ends)
+        server: asyncio.AbstractServer = await service.start(host=arguments.host, port=arguments.port)
+        print(f"Serving on http://{arguments.host}:{arguments.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Generator of synthetic bio.tools registries, for benchmarking the statistics on registries of any size.
+
+The tools have the same fields as the tools from https://bio.tools/api/t/ (including the empty values), with the
+values drawn from the vocabularies of the statistics and realistic EDAM annotations: the terms are drawn from the
+EDAM index fixture with a skewed popularity, like the real registry where a few terms are used by most tools.
+The same seed always gives the same tools.
+
+The EDAM index fixture (benchmark_data/edam_{term_type}.npz) is built from the EDAM ontology in the repository.
+
+Usage: python synthetic_tools.py <number of tools> <output path (.ndjson, .ndjson.gz or .json)> [seed]
+       python synthetic_tools.py --build-fixture
+"""
+import gzip
+import itertools
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from biotools_statistics import EdamIndex, load_edam_index
+from biotools_statistics.stats import (TOOL_TYPES, OPERATING_SYSTEMS, LANGUAGES, MATURITY, COSTS, ACCESSIBILITY,
+                                       PLATFORMS, NODES, COMMUNITY, LINK_TYPES, DOWNLOAD_TYPES, DOCUMENTATION_TYPES,
+                                       PUBLICATION_TYPES, CREDIT_ROLE_TYPES, RELATION_TYPES)
+
+FIXTURE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_data")
+EDAM_OWL_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "../../JavaVedran/biotoolsAnnotations/res/edam.owl")
+TERM_TYPES: List[str] = ["topic", "operation", "format", "data"]
+
+# The licenses and their relative frequency, roughly as in bio.tools
+LICENSES: Dict[str, int] = {"GPL-3.0": 30, "MIT": 15, "GPL-2.0": 10, "Apache-2.0": 10, "BSD-3-Clause": 5,
+                            "Artistic-2.0": 5, "LGPL-3.0": 3, "AGPL-3.0": 2, "CC-BY-4.0": 2, "GPL-3.0-only": 2,
+                            "Not licensed": 5, "Proprietary": 3, "Freeware": 3, "Other": 5}
+COLLECTIONS: List[str] = ["Proteomics", "BioConductor", "ms-utils", "Rare Disease", "de.NBI", "ELIXIR-CZ",
+                          "galaxyproject", "elixir-fr-sdp-2019", "EBI Tools", "Animal and Crop Genomics",
+                          "BioContainers", "CWL", "ELIXIR-EE", "RD-Connect", "Structural Bioinformatics"]
+_FIRST_ADDITION_DATE: datetime = datetime(2015, 1, 1)
+_ADDITION_PERIOD: timedelta = timedelta(days=8 * 365)
+# The date of the initial bulk import of the registry, which a large share of the tools have
+_BULK_IMPORT_DATE: datetime = datetime(2015, 2, 16, 10, 7)
+
+
+def load_fixture_indexes() -> Dict[str, EdamIndex]:
+    """
+    Load the EDAM index fixture.
+
+    :return: The compiled EDAM index of every term type.
+    """
+    return {term_type: EdamIndex.load(os.path.join(FIXTURE_DIR, f"edam_{term_type}.npz")) for term_type in TERM_TYPES}
+
+
+def build_fixture_indexes(owl_path: str = EDAM_OWL_PATH):
+    """
+    Build the EDAM index fixture from an EDAM OWL file.
+
+    :param owl_path: The path to the EDAM OWL file. Default: The EDAM ontology in the repository.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for term_type in TERM_TYPES:
+        index: EdamIndex = load_edam_index(owl_path=owl_path, term_type=term_type)
+        index.save(os.path.join(FIXTURE_DIR, f"edam_{term_type}.npz"))
+
+
+def generate_tools(tool_count: int, seed: int = 0, indexes: Optional[Dict[str, EdamIndex]] = None) -> Iterator[dict]:
+    """
+    Generate synthetic tools, one at a time.
+
+    :param tool_count: The number of tools.
+    :param seed: The seed of the random generator. Default: 0.
+    :param indexes: The EDAM indexes to draw the terms from. Default: The EDAM index fixture.
+    :return: The generator yielding the tools, with unique biotoolsIDs.
+    """
+    return _ToolGenerator(seed=seed, indexes=indexes or load_fixture_indexes()).generate(tool_count=tool_count)
+
+
+def write_tools(path: str, tool_count: int, seed: int = 0):
+    """
+    Write a synthetic registry to disk, as a JSON array (.json) or as NDJSON (.ndjson), optionally gzip compressed.
+
+    :param path: The path to the file.
+    :param tool_count: The number of tools.
+    :param seed: The seed of the random generator. Default: 0.
+    """
+    is_array: bool = path.endswith(".json") or path.endswith(".json.gz")
+    with (gzip.open(path, "wt", encoding="utf8") if path.endswith(".gz") else open(path, "w", encoding="utf8")) as f:
+        f.write("[" if is_array else "")
+        for i, tool in enumerate(generate_tools(tool_count=tool_count, seed=seed)):
+            if is_array:
+                f.write(("," if i else "") + json.dumps(tool))
+            else:
+                f.write(json.dumps(tool) + "\n")
+        f.write("]" if is_array else "")
+
+
+class _ToolGenerator:
+    """
+    The seeded generator of the tools.
+    """
+
+    def __init__(self, seed: int, indexes: Dict[str, EdamIndex]):
+        self._random: random.Random = random.Random(seed)
+        self._terms: Dict[str, List[dict]] = {}
+        self._term_weights: Dict[str, List[float]] = {}
+        for term_type, index in indexes.items():
+            # The roots are never used for annotations. The popularity of the terms follows a Zipf distribution.
+            terms: List[dict] = [{"uri": f"http://edamontology.org/{term_id}", "term": name}
+                                 for term_id, name, depth in zip(index.term_ids, index.names, index.depths)
+                                 if depth > 0]
+            self._random.shuffle(terms)
+            self._terms[term_type] = terms
+            self._term_weights[term_type] = list(itertools.accumulate(1 / rank for rank in range(1, len(terms) + 1)))
+        self._licenses: List[str] = list(LICENSES)
+        self._license_weights: List[int] = list(itertools.accumulate(LICENSES.values()))
+
+    def generate(self, tool_count: int) -> Iterator[dict]:
+        for i in range(tool_count):
+            yield self._tool(number=i)
+
+    def _tool(self, number: int) -> dict:
+        rand: random.Random = self._random
+        biotools_id: str = f"synthetic_tool_{number}"
+        addition_date: datetime = (_BULK_IMPORT_DATE + timedelta(seconds=rand.randrange(3600))
+                                   if rand.random() < 0.2 else
+                                   _FIRST_ADDITION_DATE + _ADDITION_PERIOD * rand.random())
+        last_update: datetime = addition_date + timedelta(days=rand.randrange(2000))
+
+        return {
+            "name": f"Synthetic tool {number}",
+            "description": f"A synthetic tool for benchmarking ({number}).",
+            "homepage": f"https://example.org/{biotools_id}",
+            "biotoolsID": biotools_id,
+            "biotoolsCURIE": f"biotools:{biotools_id}",
+            "version": self._some([f"{rand.randint(0, 3)}.{rand.randint(0, 9)}"], probability=0.5),
+            "otherID": [],
+            "relation": [{"biotoolsID": f"synthetic_tool_{rand.randrange(number + 1)}",
+                          "type": rand.choice(RELATION_TYPES)} for _ in range(self._count(0.1, 2))],
+            "function": [self._function() for _ in range(self._count(0.9, 3, minimum=1))],
+            "toolType": self._sample(TOOL_TYPES, self._count(0.95, 2)),
+            "topic": self._terms_of(term_type="topic", count=self._count(0.9, 4)),
+            "operatingSystem": self._sample(OPERATING_SYSTEMS, self._count(0.7, 3)),
+            "language": self._sample(LANGUAGES[:-1], self._count(0.7, 2)),
+            "license": self._random.choices(self._licenses, cum_weights=self._license_weights)[0]
+            if rand.random() < 0.6 else None,
+            "collectionID": self._sample(COLLECTIONS, self._count(0.3, 2)),
+            "maturity": rand.choice(MATURITY) if rand.random() < 0.2 else None,
+            "cost": rand.choice(COSTS) if rand.random() < 0.3 else None,
+            "accessibility": rand.choice(ACCESSIBILITY) if rand.random() < 0.2 else None,
+            "elixirPlatform": self._sample(PLATFORMS, self._count(0.05, 2)),
+            "elixirNode": self._sample(NODES, self._count(0.1, 2)),
+            "elixirCommunity": self._sample(COMMUNITY, self._count(0.05, 2)),
+            "link": [{"url": f"https://example.org/{biotools_id}/link", "type": self._sample(LINK_TYPES, 1),
+                      "note": None} for _ in range(self._count(0.5, 3))],
+            "download": [{"url": f"https://example.org/{biotools_id}/download", "type": rand.choice(DOWNLOAD_TYPES),
+                          "note": None, "version": None} for _ in range(self._count(0.3, 3))],
+            "documentation": [{"url": f"https://example.org/{biotools_id}/docs",
+                               "type": self._sample(DOCUMENTATION_TYPES, 1), "note": None}
+                              for _ in range(self._count(0.8, 3))],
+            "publication": [{"doi": f"10.1000/synthetic.{number}.{i}", "pmid": None, "pmcid": None,
+                             "type": self._sample(PUBLICATION_TYPES[:2], self._count(0.7, 1)), "version": None,
+                             "note": None, "metadata": None} for i in range(self._count(0.85, 3))],
+            "credit": [{"name": f"Person {rand.randrange(10000)}", "email": None, "url": None, "orcidid": None,
+                        "gridid": None, "rorid": None, "fundrefid": None, "typeEntity": "Person",
+                        "typeRole": self._sample(CREDIT_ROLE_TYPES, self._count(0.6, 2)), "note": None}
+                       for _ in range(self._count(0.7, 4))],
+            "community": {"biolib": {"app_name": biotools_id, "function_name": "run", "username": "synthetic"}}
+            if rand.random() < 0.02 else None,
+            "owner": "synthetic",
+            "additionDate": addition_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "lastUpdate": last_update.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "editPermission": {"type": "private", "authors": []},
+            "validated": rand.randint(0, 1),
+            "homepage_status": 0,
+            "elixir_badge": 0,
+            "confidence_flag": None,
+        }
+
+    def _function(self) -> dict:
+        return {"operation": self._terms_of(term_type="operation", count=self._count(1, 3, minimum=1)),
+                "input": [self._data() for _ in range(self._count(0.4, 2))],
+                "output": [self._data() for _ in range(self._count(0.4, 2))],
+                "note": None,
+                "cmd": None}
+
+    def _data(self) -> dict:
+        return {"data": self._terms_of(term_type="data", count=1)[0],
+                "format": self._terms_of(term_type="format", count=self._count(0.8, 3))}
+
+    def _terms_of(self, term_type: str, count: int) -> List[dict]:
+        terms: List[dict] = self._random.choices(self._terms[term_type], cum_weights=self._term_weights[term_type],
+                                                 k=count)
+        # Copies, since the tools may be cleaned in place
+        return [dict(term) for term in {term["uri"]: term for term in terms}.values()]
+
+    def _count(self, probability: float, maximum: int, minimum: int = 0) -> int:
+        """
+        Draw the number of entries of a field: 0 (or the minimum) with the probability 1 - probability, otherwise
+        between 1 and the maximum, with fewer entries being more likely.
+        """
+        if self._random.random() >= probability:
+            return minimum
+        return max(minimum, min(maximum, int(self._random.expovariate(1.0)) + 1))
+
+    def _sample(self, values: List[str], count: int) -> List[str]:
+        return self._random.sample(values, min(count, len(values)))
+
+    def _some(self, values: list, probability: float) -> list:
+        return values if self._random.random() < probability else []
+
+
+def main():
+    """
+    The main entry point of the script.
+    """
+    if sys.argv[1:] == ["--build-fixture"]:
+        build_fixture_indexes()
+        return
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    write_tools(path=sys.argv[2], tool_count=int(sys.argv[1]), seed=int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+
+
+if __name__ == "__main__":
+    main()
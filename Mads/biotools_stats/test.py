@@ -4,13 +4,20 @@ Used for showing plots etc.
 
 If script is to run on other machines, please be aware of the file path.
 """
+import os
+
 import requests
 import json
 
 from requests import Response
 
 from biotools_statistics import calculate_general_statistics
-from biotools_statistics import calculate_edam_term_statistics
+from biotools_statistics import calculate_all_edam_term_statistics
+from biotools_statistics import load_tools
+from biotools_statistics import load_edam_index
+
+# The EDAM ontology shipped with the repository, used instead of the bio.tools index lists when it exists
+EDAM_OWL_PATH: str = "../../JavaVedran/biotoolsAnnotations/res/edam.owl"
 
 
 def _get_index_list(term_type: str):
@@ -24,6 +31,9 @@ def _get_index_list(term_type: str):
         raise ValueError(f"The term type '{term_type}' is not valid. Must be 'Topic', 'Operation', 'Format', or"
                          f"'Data'.")
 
+    if os.path.isfile(EDAM_OWL_PATH):
+        return load_edam_index(owl_path=EDAM_OWL_PATH, term_type=term_type)
+
     resp: Response = requests.get(f"https://bio.tools/api/o/index_EDAM_{term_type}?format=json")
     resp.raise_for_status()
     index_list: dict = resp.json()["data"]
@@ -34,28 +44,16 @@ def main():
     """
     The main entry point of the script.
     """
-    with open("Tools.json", "r") as f:
-        tools = json.load(f)
-
-    stats = calculate_general_statistics(tools=tools)
+    # The tools are streamed from the file for every calculation, so the whole list is never held in memory
+    stats = calculate_general_statistics(tools=load_tools("Tools.json"))
 
     # print(json.dumps(stats, indent=4))
 
-    term_stats = calculate_edam_term_statistics(tools=tools, term_type="topic", index_list=_get_index_list("topic"))
-    print(json.dumps(term_stats, indent=4))
-    print("\n" * 2)
-
-    exit()
-    term_stats = calculate_edam_term_statistics(tools=tools, term_type="operation",
-                                                index_list=_get_index_list("operation"))
-    print(json.dumps(term_stats, indent=4))
-    print("\n" * 2)
-
-    term_stats = calculate_edam_term_statistics(tools=tools, term_type="format", index_list=_get_index_list("format"))
-    print(json.dumps(term_stats, indent=4))
-    print("\n" * 2)
-
-    term_stats = calculate_edam_term_statistics(tools=tools, term_type="data", index_list=_get_index_list("data"))
+    # All the term types are calculated in one walk over the tools
+    term_stats = calculate_all_edam_term_statistics(
+        tools=load_tools("Tools.json"),
+        index_lists={term_type: _get_index_list(term_type) for term_type in ["topic", "operation", "format", "data"]},
+        max_workers=4)
     print(json.dumps(term_stats, indent=4))
 
 
@@ -34,19 +34,18 @@ def calculate_statistics(raw_tools: list, collection_name: str, ):
     # Clean the list
 
 
-    #stats_dict: dict = calculate_total_entries_over_time(tools=tools)
+    #stats_df: pd.DataFrame = calculate_total_entries_over_time(tools=tools, granularity="day")
 
 
-    # _create_total_entries_plot(stats_dict=stats_dict, collection_name=collection_name)
+    # _create_total_entries_plot(stats_df=stats_df, collection_name=collection_name)
 
 
-def _create_total_entries_plot(stats_dict, collection_name):
+def _create_total_entries_plot(stats_df: pd.DataFrame, collection_name):
     """
 
-    :param stats_dict: The stats dictionary
+    :param stats_df: The total entries over time (from calculate_total_entries_over_time).
     :param collection_name: The name of the collection.
     """
-    stats_df: pd.DataFrame = pd.DataFrame.from_dict(stats_dict, orient="index", columns=["Count"])
     # Format the axis
     fig, ax = plt.subplots()
     ax = sns.lineplot(data=stats_df, x=stats_df.index, y="Count")
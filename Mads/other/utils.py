@@ -1,26 +1,131 @@
 import json
+import math
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+BIOTOOLS_API_URL: str = "https://bio.tools/api/t/"
+# A fixed order, so a tool updated during the download (or between resumed runs) does not move to another page. The
+# default order of the API is by lastUpdate.
+PAGE_PARAMS: dict = {"format": "json", "sort": "additionDate", "ord": "asc"}
 
-def download_whole_biotools():
-    url: str = "https://bio.tools/api/t/?format=json"
-    tools: list = []
-    next_page: str = ""
-    page_number: int = 1
-    while next_page is not None:
-        print(f"Page number: {page_number}")
-        resp = requests.get(url + next_page.replace("?", "&"))
-        resp.raise_for_status()
-        data = resp.json()
-        tools.extend(data["list"])
-        next_page = data["next"]
-        page_number += 1
 
-    print(len(tools))
+def download_whole_biotools(output_path: str = "Resources/FullTools.ndjson", api_url: str = BIOTOOLS_API_URL,
+                            max_workers: int = 8):
+    """
+    Download all tools from bio.tools into an NDJSON file (one tool per line).
 
-    with open("Resources/FullTools.json", "w") as f:
-        f.write(json.dumps(tools))
+    The pages are fetched concurrently, in the order of the addition dates, and every finished page is written to disk
+    at once, in the directory "<output_path>.parts". If the download fails, running it again only fetches the missing
+    pages, unless the number of tools has changed in the meantime, which discards the downloaded pages. When all pages
+    are downloaded, they are combined into the output file in page order, without repeated tools.
+
+    :param output_path: The path to the NDJSON file.
+    :param api_url: The URL of the tool list API.
+    :param max_workers: The maximum number of pages fetched at the same time.
+    """
+    parts_dir: str = f"{output_path}.parts"
+    session_factory = _SessionFactory(pool_size=max_workers)
+
+    # The first page tells the number of tools and the page size
+    data: dict = _get_page(session=session_factory.get(), api_url=api_url, page_number=1)
+    info: dict = {"count": data["count"], "pageCount": max(1, math.ceil(data["count"] / max(1, len(data["list"]))))}
+    info_path: str = os.path.join(parts_dir, "info.json")
+    if os.path.isfile(info_path):
+        with open(info_path, "r") as f:
+            stored_info: dict = json.load(f)
+        if stored_info != info:
+            # The tools have moved between the pages since the last run
+            print(f"bio.tools has changed since the last run ({stored_info} -> {info}), downloading all pages again")
+            shutil.rmtree(parts_dir)
+    os.makedirs(parts_dir, exist_ok=True)
+    page_count: int = info["pageCount"]
+    _write_page(parts_dir=parts_dir, page_number=1, tools=data["list"])
+    _write_atomically(path=info_path, text=json.dumps(info))
+
+    missing_pages: list = [page_number for page_number in range(1, page_count + 1)
+                           if not os.path.isfile(_page_path(parts_dir=parts_dir, page_number=page_number))]
+    print(f"Pages: {page_count}, missing: {len(missing_pages)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_download_page, session_factory=session_factory, api_url=api_url,
+                                   parts_dir=parts_dir, page_number=page_number): page_number
+                   for page_number in missing_pages}
+        for done, future in enumerate(as_completed(futures), start=1):
+            # Raise the first error, the finished pages are kept for the next run
+            future.result()
+            if done % 100 == 0 or done == len(futures):
+                print(f"Downloaded {done}/{len(futures)} pages")
+
+    # Combine the pages in page order. A tool can still be on two pages if tools were removed during the download.
+    tool_ids: set = set()
+    temp_path: str = f"{output_path}.tmp"
+    with open(temp_path, "w", encoding="utf8") as output:
+        for page_number in range(1, page_count + 1):
+            with open(_page_path(parts_dir=parts_dir, page_number=page_number), "r", encoding="utf8") as f:
+                for line in f:
+                    tool_id: str = json.loads(line)["biotoolsID"]
+                    if tool_id not in tool_ids:
+                        tool_ids.add(tool_id)
+                        output.write(line)
+    tool_count: int = len(tool_ids)
+    os.replace(temp_path, output_path)
+    shutil.rmtree(parts_dir)
+
+    print(tool_count)
+
+
+class _SessionFactory:
+    """
+    Pooled requests sessions (one per thread), retrying failed requests with a backoff.
+    """
+
+    def __init__(self, pool_size: int):
+        self._pool_size: int = pool_size
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            retry: Retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+            adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size, max_retries=retry)
+            session: requests.Session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return self._local.session
+
+
+def _download_page(session_factory: _SessionFactory, api_url: str, parts_dir: str, page_number: int):
+    data: dict = _get_page(session=session_factory.get(), api_url=api_url, page_number=page_number)
+    _write_page(parts_dir=parts_dir, page_number=page_number, tools=data["list"])
+
+
+def _get_page(session: requests.Session, api_url: str, page_number: int) -> dict:
+    resp = session.get(api_url, params={**PAGE_PARAMS, "page": page_number}, timeout=60)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _page_path(parts_dir: str, page_number: int) -> str:
+    return os.path.join(parts_dir, f"page_{page_number:06d}.ndjson")
+
+
+def _write_page(parts_dir: str, page_number: int, tools: list):
+    _write_atomically(path=_page_path(parts_dir=parts_dir, page_number=page_number),
+                      text="".join(json.dumps(tool) + "\n" for tool in tools))
+
+
+def _write_atomically(path: str, text: str):
+    # A page file only exists when it is complete, so it doubles as the checkpoint
+    temp_path: str = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
 
 
 def get_certain_tools():
@@ -28,7 +133,7 @@ def get_certain_tools():
         tools = json.load(f)
 
     with open("Resources/electron_microscopy_domain.txt", "r") as f:
-        tools_ids = [tool_id.lower().strip() for tool_id in f.readlines()]
+        tools_ids = {tool_id.lower().strip() for tool_id in f.readlines()}
     tool_collection = [tool for tool in tools if tool["biotoolsID"].lower() in tools_ids]
 
     with open("Resources/ElectronMicroscopyTools.json", "w") as f: